@@ -1,5 +1,6 @@
 from .base import BaseFilter, BaseSorter, SupportsOrFilter
 from .filter_ import (
+    AsyncManualFilter,
     FilterField,
     ManualFilter,
     RelationshipInfo,
@@ -9,6 +10,7 @@ from .unset import UNSET, Unset, or_unset
 
 __all__ = [
     "UNSET",
+    "AsyncManualFilter",
     "BaseFilter",
     "BaseSorter",
     "FilterField",
@@ -0,0 +1,31 @@
+from typing import Any, cast
+
+from sqlalchemy import Column, ColumnElement, Join, Select
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.elements import NamedColumn
+
+
+def as_column(column: InstrumentedAttribute[Any] | ColumnElement[Any]) -> Column[Any]:
+    """Table column behind `column`, resolved through aliases"""
+    column_ = coercions.expect(roles.ExpressionElementRole, column)
+    if not isinstance(column_, Column):
+        msg = f"Expected a table column, got {column!r}"
+        raise TypeError(msg)
+
+    (base_column,) = column_.base_columns
+    return cast("Column[Any]", base_column)
+
+
+def statement_primary_key(stmt: Select[Any]) -> list[NamedColumn[Any]]:
+    """Primary key of the first table in the statement FROM clause"""
+    from_ = stmt.get_final_froms()[0]
+    while isinstance(from_, Join):
+        from_ = from_.left
+
+    primary_key = list(from_.primary_key)
+    if not primary_key:
+        msg = f"Expected a table with a primary key, got {from_}"
+        raise ValueError(msg)
+
+    return primary_key
@@ -0,0 +1,249 @@
+import dataclasses
+import functools
+from collections.abc import Iterable, Iterator
+from typing import Any, cast
+
+from sqlalchemy import (
+    BinaryExpression,
+    BooleanClauseList,
+    Column,
+    ColumnElement,
+    FromClause,
+    Join,
+    Select,
+)
+from sqlalchemy.orm import (
+    MANYTOMANY,
+    MANYTOONE,
+    InstrumentedAttribute,
+    Mapper,
+    RelationshipProperty,
+    configure_mappers,
+)
+from sqlalchemy.sql import operators
+
+from ._columns import as_column
+from .filter_ import FilterField
+from .ordering import OrderingField
+from .relationship import RelationshipInfo
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class JoinPlan:
+    relationships: tuple[RelationshipInfo, ...]
+    field: InstrumentedAttribute[Any] | ColumnElement[Any]
+    """Column the operator is applied to"""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Reduction:
+    secondary: RelationshipInfo | None
+    """Join of the association table replacing a many-to-many join, `None` if the join is dropped"""
+
+    field: Column[Any]
+
+
+def iter_relationships(
+    field: FilterField | OrderingField,
+) -> Iterator[RelationshipInfo]:
+    if field.relationship:
+        yield field.relationship
+
+    yield from field.relationships or ()
+
+
+def is_joined(stmt: Select[Any], target: FromClause) -> bool:
+    return any(
+        isinstance(from_, Join) and from_.is_derived_from(target)
+        for from_ in stmt.get_final_froms()
+    )
+
+
+def plan_join(
+    stmt: Select[Any] | None,
+    field: FilterField,
+    *,
+    eliminate: bool,
+) -> JoinPlan:
+    """
+    Joins and filtered column of `field` applied to `stmt`
+
+    With `eliminate`, a filter on the column a foreign key refers to is moved onto the foreign key
+    and the join of its table is dropped, see `_reduce`.
+    """
+    path = tuple(iter_relationships(field))
+    reduction = _reduce(field) if eliminate and path else None
+    if reduction is None:
+        return JoinPlan(relationships=path, field=field.field)
+
+    if reduction.secondary is None:
+        return JoinPlan(relationships=path[:-1], field=reduction.field)
+
+    # An aliased association table joined by the relationship can't be referred to
+    secondary = cast("FromClause", reduction.secondary.field)
+    if (
+        stmt is not None
+        and is_joined(stmt, secondary)
+        and not has_table(stmt, secondary)
+    ):
+        return JoinPlan(relationships=path, field=field.field)
+
+    return JoinPlan(
+        relationships=(*path[:-1], reduction.secondary),
+        field=reduction.field,
+    )
+
+
+def association_join(
+    stmt: Select[Any],
+    relationship: RelationshipInfo,
+) -> tuple[Mapper[Any], ColumnElement[bool]] | None:
+    """
+    Target and `secondaryjoin` of a many-to-many `relationship` if `stmt` already joins its association table
+
+    Joining the target on that table keeps the conditions of both joins on the same related row.
+    """
+    if (
+        not isinstance(relationship.field, InstrumentedAttribute)
+        or relationship.onclause is not None
+    ):
+        return None
+
+    prop = relationship.field.property
+    if not isinstance(prop, RelationshipProperty) or prop.secondaryjoin is None:
+        return None
+
+    if prop.secondary is None or not has_table(stmt, prop.secondary):
+        return None
+
+    return prop.mapper, prop.secondaryjoin
+
+
+def has_table(stmt: Select[Any], table: FromClause) -> bool:
+    """`table` itself, not an alias of it, is in the FROM clause of `stmt`"""
+    return any(_contains(from_, table) for from_ in stmt.get_final_froms())
+
+
+def join_conditions(stmt: Select[Any], table: FromClause) -> list[ColumnElement[bool]]:
+    """ON clauses of the joins of `table` in `stmt`, innermost first"""
+    return [
+        onclause
+        for from_ in stmt.get_final_froms()
+        for onclause in _join_conditions(from_, table)
+    ]
+
+
+def _join_conditions(from_: FromClause, table: FromClause) -> list[ColumnElement[bool]]:
+    if not isinstance(from_, Join):
+        return []
+
+    conditions = [
+        *_join_conditions(from_.left, table),
+        *_join_conditions(from_.right, table),
+    ]
+    if from_.right is table and from_.onclause is not None:
+        conditions.append(from_.onclause)
+
+    return conditions
+
+
+def _contains(from_: FromClause, table: FromClause) -> bool:
+    if isinstance(from_, Join):
+        return _contains(from_.left, table) or _contains(from_.right, table)
+
+    return from_ is table
+
+
+@functools.lru_cache(maxsize=1024)
+def _reduce(field: FilterField) -> _Reduction | None:
+    """
+    Foreign key equal to the filtered column on the table before the last join of `field`
+
+    Relies on the foreign key constraint: a non-null foreign key always has a row to join,
+    so comparing it gives the same rows as comparing the column it refers to.
+    Outer, custom and `contains_eager` joins are kept.
+    """
+    prop = _last_relationship(field)
+    try:
+        column = as_column(field.field)
+    except TypeError:
+        return None
+
+    if prop is None:
+        return None
+
+    configure_mappers()
+    if prop.direction is MANYTOONE and prop.secondary is None:
+        local = _foreign_key(prop.primaryjoin, prop.local_remote_pairs or (), column)
+        return None if local is None else _Reduction(secondary=None, field=local)
+
+    secondary, secondaryjoin = prop.secondary, prop.secondaryjoin
+    if prop.direction is not MANYTOMANY or secondary is None or secondaryjoin is None:
+        return None
+
+    pairs = [
+        (foreign, referred)
+        for referred, foreign in prop.secondary_synchronize_pairs or ()
+    ]
+    local = _foreign_key(secondaryjoin, pairs, column)
+    if local is None:
+        return None
+
+    return _Reduction(
+        secondary=RelationshipInfo(field=secondary, onclause=prop.primaryjoin),
+        field=local,
+    )
+
+
+def _last_relationship(field: FilterField) -> RelationshipProperty[Any] | None:
+    """ORM relationship of the last join of `field` if it's an inner join on its own condition"""
+    path = tuple(iter_relationships(field))
+    if not path:
+        return None
+
+    relationship = path[-1]
+    if (
+        not isinstance(relationship.field, InstrumentedAttribute)
+        or relationship.onclause is not None
+        or relationship.isouter
+        or relationship.full
+        or relationship.contains_eager
+    ):
+        return None
+
+    prop = relationship.field.property
+    return prop if isinstance(prop, RelationshipProperty) else None
+
+
+def _foreign_key(
+    onclause: ColumnElement[bool],
+    pairs: Iterable[tuple[Any, Any]],
+    column: Column[Any],
+) -> Column[Any] | None:
+    """Foreign key of the `(foreign key, referred column)` pairs referring to `column`"""
+    pairs = list(pairs)
+    if not _is_equijoin(onclause) or any(foreign.nullable for foreign, _ in pairs):
+        return None
+
+    for foreign, referred in pairs:
+        if referred is column and foreign.references(column):
+            return cast("Column[Any]", foreign)
+
+    return None
+
+
+def _is_equijoin(onclause: ColumnElement[bool]) -> bool:
+    """Only `column = column` conditions, extra criteria would be lost with the join"""
+    clauses = (
+        onclause.clauses
+        if isinstance(onclause, BooleanClauseList)
+        and onclause.operator is operators.and_
+        else (onclause,)
+    )
+    return all(
+        isinstance(clause, BinaryExpression)
+        and clause.operator is operators.eq
+        and isinstance(clause.left, Column)
+        and isinstance(clause.right, Column)
+        for clause in clauses
+    )
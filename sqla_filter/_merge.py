@@ -0,0 +1,165 @@
+import dataclasses
+import heapq
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator, Sequence
+from typing import Any, Literal
+
+from sqlalchemy import Dialect, Select, String
+
+from .base import BaseSorter
+from .ordering import OrderingEnum, OrderingField
+
+_SORT_KEY_LABEL = "_sqla_filter_sort_key_{}"
+_NULLS_ARE_LARGE = frozenset(("postgresql", "oracle"))
+_BINARY_COLLATIONS = frozenset(("C", "POSIX", "BINARY", "UCS_BASIC"))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SortKeySpec:
+    ordering: OrderingEnum
+    nulls: Literal["first", "last"]
+    key: Callable[[Any], Any] | None = None
+    """Applied to non-null values before comparing them"""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SortedStatement:
+    stmt: Select[Any]
+    """Sorted statement with the sort key appended to the selected columns"""
+
+    specs: tuple[SortKeySpec, ...]
+
+
+def with_sort_key(
+    stmt: Select[Any],
+    *,
+    sorter: BaseSorter,
+    fields_priority: Iterable[OrderingField] | None,
+    dialect: Dialect,
+) -> SortedStatement:
+    fields_priority = tuple(fields_priority or ())
+    active_fields = sorter.get_active_fields(fields_priority)
+    for field, _ in active_fields:
+        if field.collation_key is None and not _is_binary_sorted(field, dialect):
+            msg = f"Merging rows sorted by the string field {field.name} requires OrderingField(collation_key=...) matching the database collation"
+            raise ValueError(msg)
+
+    stmt = sorter.apply(stmt, fields_priority).add_columns(
+        *(
+            field.field.label(_SORT_KEY_LABEL.format(index))
+            for index, (field, _) in enumerate(active_fields)
+        ),
+    )
+    specs = tuple(
+        SortKeySpec(
+            ordering=ordering,
+            nulls=field.nulls or _default_nulls(ordering, dialect=dialect),
+            key=field.collation_key,
+        )
+        for field, ordering in active_fields
+    )
+    return SortedStatement(stmt=stmt, specs=specs)
+
+
+def merge_sorted(
+    results: Iterable[Iterable[Sequence[Any]]],
+    *,
+    specs: Sequence[SortKeySpec],
+) -> Iterator[tuple[Any, ...]]:
+    """k-way merge of rows of a `SortedStatement`, each iterable already sorted"""
+    for row in heapq.merge(*results, key=lambda row: _sort_key(row, specs)):
+        yield _strip_sort_key(row, specs)
+
+
+async def merge_sorted_async(
+    results: Sequence[AsyncIterator[Sequence[Any]]],
+    *,
+    specs: Sequence[SortKeySpec],
+) -> AsyncIterator[tuple[Any, ...]]:
+    """Same as `merge_sorted` for async iterables"""
+    heap: list[tuple[_SortKey, int, Sequence[Any]]] = []
+    for index, result in enumerate(results):
+        async for row in result:
+            heap.append((_sort_key(row, specs), index, row))
+            break
+
+    heapq.heapify(heap)
+    while heap:
+        _, index, row = heap[0]
+        yield _strip_sort_key(row, specs)
+
+        async for next_row in results[index]:
+            heapq.heapreplace(heap, (_sort_key(next_row, specs), index, next_row))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+def _sort_key(row: Sequence[Any], specs: Sequence[SortKeySpec]) -> "_SortKey":
+    values = [
+        value if spec.key is None or value is None else spec.key(value)
+        for value, spec in zip(row[len(row) - len(specs) :], specs, strict=True)
+    ]
+    return _SortKey(values, specs)
+
+
+def _is_binary_sorted(field: OrderingField, dialect: Dialect) -> bool:
+    """Python compares values like the database, strings only with a binary collation"""
+    type_ = field.field.type
+    if not isinstance(type_, String):
+        return True
+
+    if type_.collation is None:
+        return dialect.name == "sqlite"
+
+    collation = type_.collation.upper()
+    return collation in _BINARY_COLLATIONS or collation.endswith("_BIN")
+
+
+def _strip_sort_key(
+    row: Sequence[Any],
+    specs: Sequence[SortKeySpec],
+) -> tuple[Any, ...]:
+    return tuple(row[: len(row) - len(specs)])
+
+
+def _default_nulls(
+    ordering: OrderingEnum,
+    *,
+    dialect: Dialect,
+) -> Literal["first", "last"]:
+    nulls_are_large = dialect.name in _NULLS_ARE_LARGE
+    if nulls_are_large is (ordering is OrderingEnum.asc):
+        return "last"
+
+    return "first"
+
+
+class _SortKey:
+    __slots__ = ("specs", "values")
+
+    def __init__(self, values: Sequence[Any], specs: Sequence[SortKeySpec]) -> None:
+        self.values = values
+        self.specs = specs
+
+    def __lt__(self, other: "_SortKey") -> bool:
+        for left, right, spec in zip(
+            self.values,
+            other.values,
+            self.specs,
+            strict=True,
+        ):
+            if left == right:
+                continue
+
+            if left is None:
+                return spec.nulls == "first"
+
+            if right is None:
+                return spec.nulls == "last"
+
+            if spec.ordering is OrderingEnum.asc:
+                return bool(left < right)
+
+            return bool(left > right)
+
+        return False
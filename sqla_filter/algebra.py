@@ -0,0 +1,353 @@
+import asyncio
+import dataclasses
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, TypeAlias
+
+from sqlalchemy import ColumnElement, Select, and_, false, not_, or_, select, tuple_
+
+from ._columns import statement_primary_key
+from .cte import cte_scope
+from .selectivity import any_selectivity, filter_selectivity
+from .slow_query import filter_signature, with_signature
+from .types_ import SelectClause
+
+if TYPE_CHECKING:
+    from .base import BaseFilter, _Prefetched
+
+Operand: TypeAlias = "FilterExpression | BaseFilter"
+
+
+class FilterExpression(ABC):
+    """
+    Filters combined with `&`, `|` and `~`, built into one statement by `apply`
+
+    Joins of all filters are added once, equal filters and sub-expressions are built once.
+    """
+
+    __slots__ = ()
+
+    def __and__(self, other: Operand) -> "FilterExpression":
+        return And.of(self, other)
+
+    def __or__(self, other: Operand) -> "FilterExpression":
+        return Or.of(self, other)
+
+    def __invert__(self) -> "FilterExpression":
+        return Not(self)
+
+    def apply(self, stmt: Select[SelectClause]) -> Select[SelectClause]:
+        return _Compiler(stmt).build(self)
+
+    async def apply_async(self, stmt: Select[SelectClause]) -> Select[SelectClause]:
+        """Same as `apply`, runs `prefetch` of all active `AsyncManualFilter`s concurrently first"""
+        pending = [
+            item
+            for leaf in _leaves(self)
+            for item in leaf._iter_async_manual_filters()  # noqa: SLF001
+        ]
+        results = await asyncio.gather(
+            *(
+                manual_filter.prefetch(value=value, filter_=owner)
+                for owner, _, manual_filter, value in pending
+            ),
+        )
+        prefetched = {
+            (id(owner), field_name): result
+            for (owner, field_name, _, _), result in zip(pending, results, strict=True)
+        }
+        return _Compiler(stmt, prefetched=prefetched).build(self)
+
+    @property
+    @abstractmethod
+    def operands(self) -> tuple[Operand, ...]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _combine(
+        self, conditions: list[ColumnElement[bool] | None]
+    ) -> ColumnElement[bool] | None:
+        """Condition of the expression from the conditions of its operands, `None` matches all rows"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def signature(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def selectivity(self) -> float | None:
+        """Expected fraction of rows matched, `None` if no operand has a known selectivity"""
+        raise NotImplementedError
+
+
+@dataclasses.dataclass(frozen=True, slots=True, eq=True)
+class And(FilterExpression):
+    items: tuple[Operand, ...]
+
+    @classmethod
+    def of(cls, *operands: Operand) -> "And":
+        return cls(items=_flatten(cls, operands))
+
+    @property
+    def operands(self) -> tuple[Operand, ...]:
+        return self.items
+
+    def _combine(
+        self, conditions: list[ColumnElement[bool] | None]
+    ) -> ColumnElement[bool] | None:
+        active = _distinct(
+            condition for condition in conditions if condition is not None
+        )
+        return and_(*active) if active else None
+
+    def signature(self) -> str:
+        return " & ".join(_signature(operand, parent=self) for operand in self.items)
+
+    def selectivity(self) -> float | None:
+        selectivities = [_selectivity(operand) for operand in self.items]
+        if all(selectivity is None for selectivity in selectivities):
+            return None
+
+        return math.prod(_or_one(selectivity) for selectivity in selectivities)
+
+
+@dataclasses.dataclass(frozen=True, slots=True, eq=True)
+class Or(FilterExpression):
+    items: tuple[Operand, ...]
+
+    @classmethod
+    def of(cls, *operands: Operand) -> "Or":
+        return cls(items=_flatten(cls, operands))
+
+    @property
+    def operands(self) -> tuple[Operand, ...]:
+        return self.items
+
+    def _combine(
+        self, conditions: list[ColumnElement[bool] | None]
+    ) -> ColumnElement[bool] | None:
+        active = []
+        for condition in conditions:
+            if condition is None:
+                return None
+
+            active.append(condition)
+
+        return or_(*_distinct(active))
+
+    def signature(self) -> str:
+        return " | ".join(_signature(operand, parent=self) for operand in self.items)
+
+    def selectivity(self) -> float | None:
+        selectivities = [_selectivity(operand) for operand in self.items]
+        if all(selectivity is None for selectivity in selectivities):
+            return None
+
+        return any_selectivity(_or_one(selectivity) for selectivity in selectivities)
+
+
+@dataclasses.dataclass(frozen=True, slots=True, eq=True)
+class Not(FilterExpression):
+    item: Operand
+
+    @property
+    def operands(self) -> tuple[Operand, ...]:
+        return (self.item,)
+
+    def _combine(
+        self, conditions: list[ColumnElement[bool] | None]
+    ) -> ColumnElement[bool] | None:
+        (condition,) = conditions
+        return false() if condition is None else not_(condition)
+
+    def signature(self) -> str:
+        return f"~{_signature(self.item, parent=self)}"
+
+    def selectivity(self) -> float | None:
+        selectivity = _selectivity(self.item)
+        return None if selectivity is None else 1 - selectivity
+
+
+class _Compiler:
+    def __init__(
+        self,
+        stmt: Select[Any],
+        *,
+        prefetched: "_Prefetched | None" = None,
+    ) -> None:
+        self.stmt = stmt
+        self.prefetched = prefetched
+        self._built: list[tuple[Operand, bool, ColumnElement[bool] | None]] = []
+
+    def build(self, expression: FilterExpression) -> Select[Any]:
+        # One scope for all filters, so they share their `shared_cte`s
+        with cte_scope(self.stmt):
+            condition = self._condition(expression, isolated=False)
+
+        stmt = self.stmt if condition is None else self.stmt.where(condition)
+        for leaf in _leaves(expression):
+            stmt = leaf._check_budget(stmt)  # noqa: SLF001
+
+        return with_signature(stmt, expression.signature())
+
+    def _condition(
+        self,
+        operand: Operand,
+        *,
+        isolated: bool,
+    ) -> ColumnElement[bool] | None:
+        """
+        Condition of `operand`, `isolated` under `|` or `~`
+
+        Isolated filters can't add joins to the statement: an inner join would drop
+        the rows other branches match, so they are matched by primary key instead.
+        """
+        for built, built_isolated, condition in self._built:
+            if built_isolated is isolated and _same(built, operand):
+                return condition
+
+        if isinstance(operand, FilterExpression):
+            isolate = isolated or isinstance(operand, Or | Not)
+            conditions = [
+                self._condition(item, isolated=isolate) for item in operand.operands
+            ]
+            condition = operand._combine(  # noqa: SLF001
+                _by_selectivity(operand, conditions),
+            )
+        else:
+            condition = self._leaf_condition(operand, isolated=isolated)
+
+        self._built.append((operand, isolated, condition))
+        return condition
+
+    def _leaf_condition(
+        self,
+        leaf: "BaseFilter",
+        *,
+        isolated: bool,
+    ) -> ColumnElement[bool] | None:
+        """Adds the joins of `leaf` to the statement and returns its conditions"""
+        keep = len(self.stmt._where_criteria)  # noqa: SLF001
+        applied = self._apply(leaf, self.stmt, with_loader=True)
+        if isolated and _adds_joins(self.stmt, applied):
+            return self._primary_key_condition(leaf)
+
+        criteria = applied._where_criteria  # noqa: SLF001
+        if len(criteria) == keep:
+            self.stmt = applied
+            return None
+
+        # Keep the joins of the filter, its conditions go to the expression
+        joined = applied._generate()  # noqa: SLF001
+        joined._where_criteria = criteria[:keep]  # noqa: SLF001
+        self.stmt = joined
+        conditions = criteria[keep:]
+        return conditions[0] if len(conditions) == 1 else and_(*conditions)
+
+    def _primary_key_condition(self, leaf: "BaseFilter") -> ColumnElement[bool] | None:
+        """`pk IN (SELECT pk ... JOIN ...)` like `BaseFilter.apply_dml`, a semi-join on the rows `leaf` matches"""
+        primary_key = statement_primary_key(self.stmt)
+        pk_stmt = self._apply(leaf, select(*primary_key), with_loader=False)
+        if pk_stmt.whereclause is None:
+            return None
+
+        pk_subquery = pk_stmt.correlate(None)
+        if len(primary_key) == 1:
+            return primary_key[0].in_(pk_subquery)
+
+        return tuple_(*primary_key).in_(pk_subquery)
+
+    def _apply(
+        self,
+        leaf: "BaseFilter",
+        stmt: Select[Any],
+        *,
+        with_loader: bool,
+    ) -> Select[Any]:
+        if self.prefetched is None:
+            return leaf._apply(stmt, with_loader=with_loader)  # noqa: SLF001
+
+        return leaf._apply(  # noqa: SLF001
+            stmt,
+            with_loader=with_loader,
+            prefetched=self.prefetched,
+        )
+
+
+def _adds_joins(stmt: Select[Any], applied: Select[Any]) -> bool:
+    froms = stmt.get_final_froms()
+    applied_froms = applied.get_final_froms()
+    return len(froms) != len(applied_froms) or any(
+        from_ is not applied_from
+        for from_, applied_from in zip(froms, applied_froms, strict=True)
+    )
+
+
+def _flatten(
+    cls: type[And | Or],
+    operands: tuple[Operand, ...],
+) -> tuple[Operand, ...]:
+    flat: list[Operand] = []
+    for operand in operands:
+        if isinstance(operand, And | Or) and type(operand) is cls:
+            flat.extend(operand.items)
+        else:
+            flat.append(operand)
+
+    return tuple(flat)
+
+
+def _leaves(expression: FilterExpression) -> list["BaseFilter"]:
+    """Distinct filters of `expression` in the order they are built"""
+    leaves: list[BaseFilter] = []
+    for operand in expression.operands:
+        found = _leaves(operand) if isinstance(operand, FilterExpression) else [operand]
+        leaves.extend(
+            leaf for leaf in found if not any(_same(leaf, other) for other in leaves)
+        )
+
+    return leaves
+
+
+def _distinct(conditions: Iterable[ColumnElement[bool]]) -> list[ColumnElement[bool]]:
+    """Conditions of shared sub-expressions are the same object"""
+    return list({id(condition): condition for condition in conditions}.values())
+
+
+def _same(operand: Operand, other: Operand) -> bool:
+    return operand is other or (type(operand) is type(other) and operand == other)
+
+
+def _by_selectivity(
+    expression: FilterExpression,
+    conditions: list[ColumnElement[bool] | None],
+) -> list[ColumnElement[bool] | None]:
+    """Conditions of `And` most selective first, of `Or` most likely to match first"""
+    if not isinstance(expression, And | Or):
+        return conditions
+
+    selectivities = [_or_one(_selectivity(item)) for item in expression.operands]
+    sign = 1 if isinstance(expression, And) else -1
+    order = sorted(range(len(conditions)), key=lambda i: sign * selectivities[i])
+    return [conditions[i] for i in order]
+
+
+def _selectivity(operand: Operand) -> float | None:
+    if isinstance(operand, FilterExpression):
+        return operand.selectivity()
+
+    return filter_selectivity(operand)
+
+
+def _or_one(selectivity: float | None) -> float:
+    return 1.0 if selectivity is None else selectivity
+
+
+def _signature(operand: Operand, *, parent: FilterExpression) -> str:
+    if not isinstance(operand, FilterExpression):
+        signature = filter_signature(operand)
+        return f"({signature})" if " | " in signature else signature
+
+    signature = operand.signature()
+    return signature if isinstance(operand, Not | type(parent)) else f"({signature})"
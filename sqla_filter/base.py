@@ -1,10 +1,15 @@
+import asyncio
+import copy
 import dataclasses
-from collections.abc import Iterable, Mapping
+import functools
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from types import MappingProxyType
 from typing import (
     Any,
     ClassVar,
     Literal,
     Self,
+    TypeAlias,
     TypeVar,
     cast,
     dataclass_transform,
@@ -12,16 +17,63 @@ from typing import (
     get_type_hints,
 )
 
-from sqlalchemy import ColumnElement, Select, UnaryExpression, or_
-from sqlalchemy.orm import InstrumentedAttribute
-from sqlalchemy.sql.functions import coalesce
-
-from .filter_ import FilterField, ManualFilter, RelationshipInfo
+from sqlalchemy import (
+    ColumnElement,
+    CompoundSelect,
+    Delete,
+    Dialect,
+    FromClause,
+    Join,
+    Label,
+    Row,
+    Select,
+    UnaryExpression,
+    Update,
+    case,
+    distinct,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.orm import InstrumentedAttribute, contains_eager
+from sqlalchemy.sql.util import find_tables
+
+from ._columns import statement_primary_key
+from ._joins import (
+    association_join,
+    is_joined,
+    iter_relationships,
+    join_conditions,
+    plan_join,
+)
+from .algebra import And, FilterExpression, Not, Or
+from .cost import (
+    QueryBudget,
+    QueryCost,
+    check_budget,
+    estimate_filter_cost,
+    estimate_sorter_cost,
+)
+from .cte import cte_scope
+from .filter_ import AsyncManualFilter, FilterField, ManualFilter, RelationshipInfo
 from .ordering import OrderingEnum, OrderingField
+from .selectivity import SelectivityStats, order_or_chain, ordered_fields
+from .slow_query import filter_signature, sorter_signature, with_signature
+from .template import SqlTemplate, compile_template
 from .types_ import SelectClause
 from .unset import Unset
 
 T = TypeVar("T")
+_TDML = TypeVar("_TDML", Update, Delete)
+
+_Prefetched: TypeAlias = Mapping[tuple[int, str], Any]
+"""`AsyncManualFilter.prefetch` results by `(id(filter), field name)`"""
+
+_NOT_PREFETCHED: _Prefetched = MappingProxyType({})
 
 
 def _get_sqla_filter_field(
@@ -62,44 +114,167 @@ def _init_subclass(cls: type[Any]) -> None:
         if sqla_filter_field is None:
             continue
 
-        sqla_filter_field.name = field_name
-        filter_fields[field_name] = sqla_filter_field
-        setattr(wrapped_cls, field_name, sqla_filter_field)
+        bound_field = _bind_field(sqla_filter_field, name=field_name)
+        filter_fields[field_name] = bound_field
+        setattr(wrapped_cls, field_name, bound_field)
+
+    wrapped_cls.__sqla_filter_fields__ = MappingProxyType(filter_fields)
 
-    wrapped_cls.__sqla_filter_fields__ = filter_fields
+
+def _bind_field(
+    field: FilterField | OrderingField | ManualFilter[Any, Any],
+    *,
+    name: str,
+) -> FilterField | OrderingField | ManualFilter[Any, Any]:
+    """Named copy of `field`, a field object may be shared by several classes"""
+    if isinstance(field, ManualFilter):
+        bound_field = copy.copy(field)
+        bound_field.name = name
+        return bound_field
+
+    return dataclasses.replace(field, _name=name)
 
 
 @dataclass_transform(kw_only_default=True)
 class BaseFilter:
     __sqla_filter_fields__: ClassVar[Mapping[str, FilterField | ManualFilter[Any, Any]]]
+    __sqla_filter_budget__: ClassVar[QueryBudget | None] = None
+    __sqla_filter_eliminate_joins__: ClassVar[bool] = True
+    """Filter on foreign keys instead of joining the tables they refer to, see `plan_join`"""
+    __sqla_filter_selectivity__: ClassVar[SelectivityStats | None] = None
+    """Learned selectivity of the fields, used before `FilterField.selectivity` hints"""
 
     def __init_subclass__(cls) -> None:
         _init_subclass(cls)
 
-    def apply(  # noqa: C901
+    def apply(
         self,
         stmt: Select[SelectClause],
     ) -> Select[SelectClause]:
-        origin_stmt = stmt.where()
+        return self._finalize(self._apply(stmt, with_loader=True))
+
+    def estimate_cost(self) -> QueryCost:
+        return estimate_filter_cost(self)
+
+    def compile_template(
+        self,
+        stmt: Select[Any],
+        *,
+        dialect: Dialect,
+        sorter: "BaseSorter | None" = None,
+        fields_priority: Iterable[OrderingField] | None = None,
+    ) -> SqlTemplate:
+        """Cached SQL of `stmt` for filters with the same set fields, bind values with `SqlTemplate.bind`"""
+        return compile_template(
+            stmt,
+            dialect=dialect,
+            filter_=self,
+            sorter=sorter,
+            fields_priority=fields_priority,
+        )
+
+    def __and__(self, other: "BaseFilter | FilterExpression") -> FilterExpression:
+        return And.of(self, other)
+
+    def __or__(self, other: "BaseFilter | FilterExpression") -> FilterExpression:
+        return Or.of(self, other)
+
+    def __invert__(self) -> FilterExpression:
+        return Not(self)
+
+    def _finalize(self, stmt: Select[SelectClause]) -> Select[SelectClause]:
+        return self._check_budget(with_signature(stmt, filter_signature(self)))
+
+    def _check_budget(self, stmt: Select[SelectClause]) -> Select[SelectClause]:
+        budget = self.__sqla_filter_budget__
+        if budget is None:
+            return stmt
+
+        return check_budget(self, stmt, cost=self.estimate_cost(), budget=budget)
+
+    async def apply_async(
+        self,
+        stmt: Select[SelectClause],
+    ) -> Select[SelectClause]:
+        """Same as `apply`, runs `prefetch` of active `AsyncManualFilter`s concurrently first"""
+        pending = list(self._iter_async_manual_filters())
+        results = await asyncio.gather(
+            *(
+                manual_filter.prefetch(value=value, filter_=owner)
+                for owner, _, manual_filter, value in pending
+            ),
+        )
+        prefetched = {
+            (id(owner), field_name): result
+            for (owner, field_name, _, _), result in zip(pending, results, strict=True)
+        }
+        return self._finalize(
+            self._apply(stmt, with_loader=True, prefetched=prefetched),
+        )
+
+    def _iter_async_manual_filters(
+        self,
+    ) -> Iterator[tuple[Self, str, AsyncManualFilter[Any, Any, Any], Any]]:
         for field_name, filter_ in self.__sqla_filter_fields__.items():
             value = getattr(self, field_name)
+            if isinstance(filter_, AsyncManualFilter) and value is not Unset.v:
+                yield self, field_name, filter_, value
 
-            if value is Unset.v:
+        if (or_filter := getattr(self, "or_", None)) is not None:
+            yield from or_filter._iter_async_manual_filters()  # noqa: SLF001
+
+    def _apply(
+        self,
+        stmt: Select[SelectClause],
+        *,
+        with_loader: bool,
+        prefetched: _Prefetched = _NOT_PREFETCHED,
+    ) -> Select[SelectClause]:
+        filter_, prefetched = order_or_chain(self, prefetched)
+        with cte_scope(stmt):
+            return filter_._apply_fields(  # noqa: SLF001
+                stmt,
+                with_loader=with_loader,
+                prefetched=prefetched,
+            )
+
+    def _apply_fields(
+        self,
+        stmt: Select[SelectClause],
+        *,
+        with_loader: bool,
+        prefetched: _Prefetched,
+    ) -> Select[SelectClause]:
+        origin_stmt = stmt.where()
+        for field_name, filter_ in ordered_fields(self):
+            value = getattr(self, field_name)
+            if isinstance(filter_, AsyncManualFilter):
+                stmt = filter_.apply_prefetched(
+                    stmt,
+                    value=value,
+                    prefetched=self._get_prefetched(field_name, prefetched),
+                    filter_=self,
+                )
                 continue
 
             if isinstance(filter_, ManualFilter):
                 stmt = filter_.apply(stmt, value=value, filter_=self)
                 continue
 
-            if filter_.relationship:
-                stmt = _apply_join(stmt, relationship=filter_.relationship)
-
-            for relationship in filter_.relationships or ():
-                stmt = _apply_join(stmt, relationship=relationship)
-
+            plan = plan_join(
+                stmt,
+                filter_,
+                eliminate=self.__sqla_filter_eliminate_joins__,
+            )
+            stmt = _apply_joins(
+                stmt,
+                relationships=plan.relationships,
+                is_filter=True,
+                with_loader=with_loader,
+            )
             stmt = stmt.where(
                 filter_.operator(
-                    filter_.field,
+                    plan.field,
                     value,
                 ),  # pyright:ignore[reportArgumentType]
             )
@@ -107,19 +282,153 @@ class BaseFilter:
         if stmt.whereclause is None:
             return stmt
 
-        return self._process_or_filter(origin_stmt=origin_stmt, stmt=stmt)
+        return self._process_or_filter(
+            origin_stmt=origin_stmt,
+            stmt=stmt,
+            prefetched=prefetched,
+        )
+
+    def _get_prefetched(self, field_name: str, prefetched: _Prefetched) -> Any:  # noqa: ANN401
+        try:
+            return prefetched[id(self), field_name]
+        except KeyError:
+            msg = f"{field_name} is an AsyncManualFilter, use apply_async"
+            raise TypeError(msg) from None
+
+    def apply_dml(self, stmt: _TDML) -> _TDML:
+        """
+        Apply filter to an UPDATE or DELETE statement
+
+        Without joins the conditions are added to its WHERE clause,
+        otherwise rows are matched by primary key: `WHERE pk IN (SELECT pk ... JOIN ...)`
+        """
+        primary_key = list(stmt.table.primary_key)
+        pk_stmt = self._apply(select(*primary_key), with_loader=False)
+        if pk_stmt.whereclause is None:
+            return stmt
+
+        froms = pk_stmt.get_final_froms()
+        if len(froms) == 1 and not isinstance(froms[0], Join):
+            return stmt.where(pk_stmt.whereclause)
+
+        pk_subquery = pk_stmt.correlate(None)
+        if len(primary_key) == 1:
+            return stmt.where(primary_key[0].in_(pk_subquery))
+
+        return stmt.where(tuple_(*primary_key).in_(pk_subquery))
+
+    def facet_counts(
+        self,
+        stmt: Select[Any],
+        *,
+        facets: Sequence[str],
+        grouping_sets: bool = False,
+    ) -> Select[Any] | CompoundSelect[Any]:
+        """
+        Count `stmt` rows per value of every facet field in one statement
+
+        Each facet is counted with the conditions of the other fields only.
+        Rows are `(facet, <one column per facet>, count)`, see `collect_facet_counts`.
+        `grouping_sets` uses `GROUPING SETS` instead of `UNION ALL` when no facet field is set,
+        SQLite and MySQL don't support it.
+        """
+        with cte_scope(stmt):
+            return self._facet_counts(
+                stmt,
+                facets=facets,
+                grouping_sets=grouping_sets,
+            )
+
+    def _facet_counts(
+        self,
+        stmt: Select[Any],
+        *,
+        facets: Sequence[str],
+        grouping_sets: bool,
+    ) -> Select[Any] | CompoundSelect[Any]:
+        facet_fields = {name: self._get_facet_field(name) for name in facets}
+        primary_key = statement_primary_key(stmt)
+        count = (
+            func.count(distinct(primary_key[0]))
+            if len(primary_key) == 1
+            else func.count()
+        )
+        stmt = stmt.order_by(None)
+
+        if grouping_sets and all(getattr(self, name) is Unset.v for name in facets):
+            for field in facet_fields.values():
+                stmt = _apply_joins(
+                    stmt,
+                    relationships=iter_relationships(field),
+                    is_filter=True,
+                    with_loader=False,
+                )
+
+            facet = case(
+                *(
+                    (func.grouping(field.field) == 0, name)
+                    for name, field in facet_fields.items()
+                ),
+            )
+            return (
+                self._apply(stmt, with_loader=False)
+                .with_only_columns(
+                    facet.label("facet"),
+                    *(field.field.label(name) for name, field in facet_fields.items()),
+                    count.label("count"),
+                    maintain_column_froms=True,
+                )
+                .group_by(
+                    func.grouping_sets(
+                        *(field.field for field in facet_fields.values())
+                    )
+                )
+            )
+
+        facet_stmts = []
+        for name, field in facet_fields.items():
+            facet_filter = dataclasses.replace(self, **{name: Unset.v})  # type:ignore[type-var]
+            facet_stmt = _apply_joins(
+                facet_filter._apply(stmt, with_loader=False),  # noqa: SLF001
+                relationships=iter_relationships(field),
+                is_filter=True,
+                with_loader=False,
+            )
+            facet_stmts.append(
+                facet_stmt.with_only_columns(
+                    literal(name).label("facet"),
+                    *_facet_columns(facet_fields, name=name),
+                    count.label("count"),
+                    maintain_column_froms=True,
+                ).group_by(field.field),
+            )
+
+        return union_all(*facet_stmts)
+
+    def _get_facet_field(self, name: str) -> FilterField:
+        field = self.__sqla_filter_fields__.get(name)
+        if not isinstance(field, FilterField):
+            msg = f"{name!r} is not a FilterField of {type(self).__name__}"
+            raise ValueError(msg)  # noqa: TRY004
+
+        return field
 
     def _process_or_filter(
         self,
         origin_stmt: Select[SelectClause],
         stmt: Select[SelectClause],
+        prefetched: _Prefetched,
     ) -> Select[SelectClause]:
         or_filter: Self | None
         if (or_filter := getattr(self, "or_", None)) is None:
             return stmt
 
         or_stmt = origin_stmt.where()
-        or_stmt = or_filter.apply(origin_stmt)
+        or_stmt = or_filter._apply(  # noqa: SLF001
+            origin_stmt,
+            with_loader=True,
+            prefetched=prefetched,
+        )
 
         if or_stmt.whereclause is None:
             return stmt
@@ -132,9 +441,35 @@ class SupportsOrFilter(BaseFilter):
     or_: Self | None = None
 
 
+def collect_facet_counts(rows: Iterable[Row[Any]]) -> dict[str, dict[Any, int]]:
+    """Group rows of `BaseFilter.facet_counts` as `{facet: {value: count}}`"""
+    counts: dict[str, dict[Any, int]] = {}
+    for row in rows:
+        mapping = row._mapping  # noqa: SLF001
+        facet = mapping["facet"]
+        counts.setdefault(facet, {})[mapping[facet]] = mapping["count"]
+
+    return counts
+
+
+def _facet_columns(
+    facet_fields: Mapping[str, FilterField],
+    *,
+    name: str,
+) -> list[Label[Any]]:
+    """Value of the `name` facet, typed NULL for other facets"""
+    return [
+        (field.field if field_name == name else null().cast(field.field.type)).label(
+            field_name
+        )
+        for field_name, field in facet_fields.items()
+    ]
+
+
 @dataclass_transform(kw_only_default=True)
 class BaseSorter:
     __sqla_filter_fields__: ClassVar[Mapping[str, OrderingField]]
+    __sqla_filter_budget__: ClassVar[QueryBudget | None] = None
 
     def __init_subclass__(cls) -> None:
         _init_subclass(cls)
@@ -144,48 +479,223 @@ class BaseSorter:
         stmt: Select[SelectClause],
         fields_priority: Iterable[OrderingField] | None = None,
     ) -> Select[SelectClause]:
-        all_fields = self.__sqla_filter_fields__
-        if fields_priority:
-            sorted_fields = {
-                field.name: all_fields[field.name]
-                for field in fields_priority
-                if field.name in all_fields
-            }
-            remaining_fields = {
-                field.name: all_fields[field.name]
-                for field in all_fields.values()
-                if field not in fields_priority
-            }
-            sorted_fields.update(remaining_fields)
-            all_fields = sorted_fields
-
-        for field_name, sorter in all_fields.items():
+        active_fields = self.get_active_fields(fields_priority)
+        for sorter, value in active_fields:
+            stmt = _apply_joins(
+                stmt,
+                relationships=iter_relationships(sorter),
+                is_filter=False,
+                with_loader=True,
+            )
+            expr = _get_ordering_method(
+                sorter.field,
+                ordering=value,
+                nulls=sorter.nulls,
+            )
+            stmt = stmt.order_by(expr)
+
+        stmt = with_signature(stmt, sorter_signature(self, active_fields))
+        budget = self.__sqla_filter_budget__
+        if budget is None:
+            return stmt
+
+        cost = estimate_sorter_cost(active_fields)
+        return check_budget(self, stmt, cost=cost, budget=budget)
+
+    def estimate_cost(
+        self,
+        fields_priority: Iterable[OrderingField] | None = None,
+    ) -> QueryCost:
+        return estimate_sorter_cost(self.get_active_fields(fields_priority))
+
+    def compile_template(
+        self,
+        stmt: Select[Any],
+        *,
+        dialect: Dialect,
+        fields_priority: Iterable[OrderingField] | None = None,
+    ) -> SqlTemplate:
+        """Cached SQL of `stmt` sorted by the set fields, see `BaseFilter.compile_template`"""
+        return compile_template(
+            stmt,
+            dialect=dialect,
+            sorter=self,
+            fields_priority=fields_priority,
+        )
+
+    def get_active_fields(
+        self,
+        fields_priority: Iterable[OrderingField] | None = None,
+    ) -> list[tuple[OrderingField, OrderingEnum]]:
+        """Set ordering fields with their direction, in the order `apply` emits them"""
+        priority = tuple(field.name for field in fields_priority or ())
+        active_fields = []
+        plan = _ordering_plan(type(self), priority)  # type:ignore[arg-type]
+        for field_name, sorter in plan:
             value = getattr(self, field_name)
 
             if value is Unset.v:
                 continue
 
-            if sorter.relationship:
-                stmt = _apply_join(stmt, relationship=sorter.relationship)
+            active_fields.append((sorter, value))
 
-            for relationship in sorter.relationships or ():
-                stmt = _apply_join(stmt, relationship=relationship)
+        return active_fields
 
-            expr = _get_ordering_method(
-                sorter.field,
-                ordering=value,
-                nulls=sorter.nulls,
+    @classmethod
+    def from_spec(cls, spec: str) -> tuple[Self, tuple[OrderingField, ...]]:
+        """
+        Parse a sort spec like `-created_at,author_user_last_name`
+
+        Comma-separated field names, `-` prefix for descending order.
+        Returns the sorter and the fields priority in spec order, pass both to `apply`.
+        """
+        values: dict[str, OrderingEnum] = {}
+        for raw_item in spec.split(","):
+            item = raw_item.strip()
+            if not item:
+                continue
+
+            field_name, ordering = _parse_spec_item(item)
+            if field_name not in cls.__sqla_filter_fields__:
+                msg = f"Unknown ordering field {field_name!r}"
+                raise ValueError(msg)
+
+            if field_name in values:
+                msg = f"Duplicate ordering field {field_name!r}"
+                raise ValueError(msg)
+
+            values[field_name] = ordering
+
+        priority = tuple(cls.__sqla_filter_fields__[name] for name in values)
+        return cls(**values), priority
+
+
+def _parse_spec_item(item: str) -> tuple[str, OrderingEnum]:
+    if item.startswith("-"):
+        return item[1:], OrderingEnum.desc
+
+    return item.removeprefix("+"), OrderingEnum.asc
+
+
+@functools.lru_cache(maxsize=1024)
+def _ordering_plan(
+    sorter_cls: type[BaseSorter],
+    priority: tuple[str, ...],
+) -> tuple[tuple[str, OrderingField], ...]:
+    """Sorter fields, `priority` names first, then the rest in declaration order"""
+    all_fields = sorter_cls.__sqla_filter_fields__
+    names = dict.fromkeys(name for name in priority if name in all_fields)
+    names.update(dict.fromkeys(all_fields))
+    return tuple((name, all_fields[name]) for name in names)
+
+
+def _apply_joins(
+    stmt: Select[SelectClause],
+    *,
+    relationships: Iterable[RelationshipInfo],
+    is_filter: bool,
+    with_loader: bool,
+) -> Select[SelectClause]:
+    eager_fields: list[InstrumentedAttribute[Any]] = []
+    is_eager_path = True
+
+    for relationship in relationships:
+        if relationship.contains_eager:
+            _check_contains_eager(
+                stmt,
+                relationship,
+                is_eager_path=is_eager_path,
+                is_filter=is_filter,
             )
-            stmt = stmt.order_by(expr)
 
+        stmt = _apply_join(stmt, relationship=relationship)
+
+        if not relationship.contains_eager:
+            is_eager_path = False
+            continue
+
+        eager_fields.append(cast("InstrumentedAttribute[Any]", relationship.field))
+
+    if not eager_fields or not with_loader:
         return stmt
 
+    first_field, *other_fields = eager_fields
+    loader = contains_eager(first_field)
+    for field in other_fields:
+        loader = loader.contains_eager(field)
+
+    return stmt.options(loader)
+
+
+def _check_contains_eager(
+    stmt: Select[Any],
+    relationship: RelationshipInfo,
+    *,
+    is_eager_path: bool,
+    is_filter: bool,
+) -> None:
+    if isinstance(relationship.field, FromClause):
+        msg = f"contains_eager requires an ORM relationship, got {relationship.field}"
+        raise TypeError(msg)
+
+    if not is_eager_path:
+        msg = f"contains_eager on {relationship.field} requires all preceding relationships to use contains_eager"
+        raise ValueError(msg)
+
+    if relationship.onclause is not None:
+        msg = f"contains_eager on {relationship.field} is not allowed with a custom onclause: the join may not match the relationship"
+        raise ValueError(msg)
+
+    if is_filter and relationship.field.property.uselist:
+        msg = f"contains_eager on {relationship.field} is not allowed in a filter: the filtered join would load an incomplete collection"
+        raise ValueError(msg)
+
+    if relationship.field.property.uselist and _is_filtered_join(
+        stmt,
+        relationship.field.property,
+    ):
+        msg = f"contains_eager on {relationship.field} is not allowed: the statement already filters this join, it would load an incomplete collection"
+        raise ValueError(msg)
+
+
+def _is_filtered_join(stmt: Select[Any], prop: Any) -> bool:  # noqa: ANN401
+    """`stmt` joins the target or association table of `prop` and has conditions on it"""
+    if stmt.whereclause is None:
+        return False
+
+    tables = [*prop.mapper.tables]
+    if prop.secondary is not None:
+        tables.append(prop.secondary)
+
+    return any(is_joined(stmt, table) for table in tables) and any(
+        table in tables for table in find_tables(stmt.whereclause, check_columns=True)
+    )
+
 
 def _apply_join(
     stmt: Select[SelectClause],
     *,
     relationship: RelationshipInfo,
 ) -> Select[SelectClause]:
+    # ORM relationship joins are deduplicated by SQLAlchemy, Core table joins are not
+    if isinstance(relationship.field, FromClause) and is_joined(
+        stmt,
+        relationship.field,
+    ):
+        return _reuse_table_join(stmt, relationship=relationship)
+
+    if (reused := association_join(stmt, relationship)) is not None:
+        target, onclause = reused
+        if is_joined(stmt, target.local_table):
+            return stmt
+
+        return stmt.join(
+            target.class_,
+            onclause,
+            isouter=relationship.isouter,
+            full=relationship.full,
+        )
+
     return stmt.join(
         relationship.field,
         relationship.onclause,
@@ -194,8 +704,33 @@ def _apply_join(
     )
 
 
+def _reuse_table_join(
+    stmt: Select[SelectClause],
+    *,
+    relationship: RelationshipInfo,
+) -> Select[SelectClause]:
+    """`stmt` if it already joins the table of `relationship` on the same condition"""
+    table = cast("FromClause", relationship.field)
+    existing = join_conditions(stmt, table)
+    if not existing:
+        return stmt
+
+    joined = stmt.join(
+        table,
+        relationship.onclause,
+        isouter=relationship.isouter,
+        full=relationship.full,
+    )
+    onclause = join_conditions(joined, table)[-1]
+    if any(onclause.compare(condition) for condition in existing):
+        return stmt
+
+    msg = f"{table} is already joined on another condition, join an alias of it instead"
+    raise ValueError(msg)
+
+
 def _get_ordering_method(
-    model_field: InstrumentedAttribute[Any] | coalesce[Any],
+    model_field: InstrumentedAttribute[Any] | ColumnElement[Any],
     *,
     ordering: OrderingEnum,
     nulls: Literal["first", "last"] | None = None,
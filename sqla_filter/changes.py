@@ -0,0 +1,117 @@
+import base64
+import binascii
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import coercions, roles
+
+from ._columns import statement_primary_key
+from .base import BaseFilter
+from .ordering import OrderingEnum, keyset_after
+from .types_ import SelectClause
+
+_WATERMARK_LABEL = "_sqla_filter_watermark_{}"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ChangesQuery:
+    stmt: Select[Any]
+    """Filtered rows after the watermark in watermark order, with the watermark columns appended"""
+
+    watermark: str | None
+    """Watermark the query was built from"""
+
+    keys: tuple[ColumnElement[Any], ...]
+
+    def split(
+        self,
+        rows: Sequence[Sequence[Any]],
+    ) -> tuple[list[tuple[Any, ...]], str | None]:
+        """Rows without the watermark columns and the watermark to pass on the next poll"""
+        if not rows:
+            return [], self.watermark
+
+        size = len(self.keys)
+        watermark = encode_watermark(rows[-1][len(rows[-1]) - size :])
+        return [tuple(row[: len(row) - size]) for row in rows], watermark
+
+
+def changed_since(
+    stmt: Select[SelectClause],
+    *,
+    filter_: BaseFilter,
+    watermark_column: InstrumentedAttribute[Any] | ColumnElement[Any],
+    watermark: str | None,
+    limit: int | None = None,
+) -> ChangesQuery:
+    """
+    Rows matching `filter_` changed after `watermark`, `None` to start from the beginning
+
+    Rows are ordered by `watermark_column`, then by the primary key of the statement first table,
+    and compared with the watermark as a keyset, so batches of `limit` rows don't skip or repeat rows.
+    """
+    keys = (
+        coercions.expect(roles.ExpressionElementRole, watermark_column),
+        *statement_primary_key(stmt),
+    )
+    stmt = filter_.apply(stmt)
+    if watermark is not None:
+        values = decode_watermark(watermark, keys=keys)
+        stmt = stmt.where(
+            keyset_after([(key, OrderingEnum.asc) for key in keys], values)
+        )
+
+    changes_stmt = stmt.add_columns(
+        *(key.label(_WATERMARK_LABEL.format(index)) for index, key in enumerate(keys)),
+    ).order_by(*keys)
+    if limit is not None:
+        changes_stmt = changes_stmt.limit(limit)
+
+    return ChangesQuery(stmt=changes_stmt, watermark=watermark, keys=keys)
+
+
+def encode_watermark(values: Sequence[Any]) -> str:
+    """Opaque watermark of the key values of the last row"""
+    payload = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_watermark(
+    watermark: str,
+    *,
+    keys: Sequence[ColumnElement[Any]],
+) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(watermark.encode()))
+        return [_from_json(value, key) for value, key in zip(values, keys, strict=True)]
+    except (binascii.Error, TypeError, ValueError) as e:
+        msg = f"Invalid watermark {watermark!r}"
+        raise ValueError(msg) from e
+
+
+def _to_json(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, datetime.date | datetime.time):
+        return value.isoformat()
+
+    if isinstance(value, uuid.UUID | decimal.Decimal):
+        return str(value)
+
+    return value
+
+
+def _from_json(value: Any, key: ColumnElement[Any]) -> Any:  # noqa: ANN401
+    python_type = key.type.python_type
+    if value is None or isinstance(value, python_type):
+        return value
+
+    if issubclass(python_type, datetime.date | datetime.time):
+        return python_type.fromisoformat(value)
+
+    return python_type(value)
@@ -0,0 +1,221 @@
+import json
+from collections.abc import Collection, Mapping
+from typing import Any
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    ColumnElement,
+    String,
+    and_,
+    bindparam,
+    exists,
+    func,
+    select,
+    true,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.visitors import InternalTraversal
+
+_ROOT_PATH = "$"
+
+
+def json_contains_op(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: Mapping[str, Any] | list[Any],
+) -> ColumnElement[bool]:
+    """
+    `field @> :value` on a PostgreSQL JSONB column, served by a GIN index
+
+    On SQLite nested objects and arrays of scalars are matched with `json_extract`/`json_each`.
+    """
+    return _PerDialect(
+        name="json_contains_op",
+        postgresql=field.op("@>", return_type=Boolean)(
+            bindparam(None, value, type_=postgresql.JSONB, unique=True),
+        ),
+        sqlite=_sqlite_contains(field, _ROOT_PATH, value),
+    )
+
+
+def json_has_key_op(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: str,
+) -> ColumnElement[bool]:
+    """`field ? :value` on a PostgreSQL JSONB column, served by a GIN index"""
+    return _PerDialect(
+        name="json_has_key_op",
+        postgresql=field.op("?", return_type=Boolean)(
+            bindparam(None, value, type_=String, unique=True),
+        ),
+        sqlite=func.json_type(field, _path_bind(_key_path(_ROOT_PATH, value))).is_not(
+            None
+        ),
+    )
+
+
+def array_overlap_op(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: Collection[Any],
+) -> ColumnElement[bool]:
+    """`field && :value` on a PostgreSQL ARRAY column, a JSON array on SQLite"""
+    return _PerDialect(
+        name="array_overlap_op",
+        postgresql=field.op("&&", return_type=Boolean)(_array_bind(field, value)),
+        sqlite=exists(
+            select(1)
+            .select_from(items := _json_each(field))
+            .where(items.c.value.in_(select(_json_each(_json_bind(value)).c.value))),
+        ),
+    )
+
+
+def array_contains_op(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: Collection[Any],
+) -> ColumnElement[bool]:
+    """`field @> :value` on a PostgreSQL ARRAY column, a JSON array on SQLite"""
+    return _PerDialect(
+        name="array_contains_op",
+        postgresql=field.op("@>", return_type=Boolean)(_array_bind(field, value)),
+        sqlite=~exists(
+            select(1)
+            .select_from(expected := _json_each(_json_bind(value)))
+            .where(expected.c.value.not_in(select(_json_each(field).c.value))),
+        ),
+    )
+
+
+class _PerDialect(ColumnElement[bool]):
+    """PostgreSQL operator and its SQLite equivalent, other dialects are not supported"""
+
+    inherit_cache = True
+    type = Boolean()
+    _is_implicitly_boolean = True
+
+    _traverse_internals = [  # noqa: RUF012
+        ("name", InternalTraversal.dp_string),
+        ("postgresql", InternalTraversal.dp_clauseelement),
+        ("sqlite", InternalTraversal.dp_clauseelement),
+    ]
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        postgresql: ColumnElement[bool],
+        sqlite: ColumnElement[bool] | None,
+    ) -> None:
+        self.name = name
+        self.postgresql = postgresql
+        self.sqlite = sqlite
+
+
+@compiles(_PerDialect)
+def _compile_per_dialect(
+    element: _PerDialect,
+    compiler: SQLCompiler,
+    **kw: Any,  # noqa: ANN401
+) -> str:
+    if compiler.dialect.name == "postgresql":
+        return compiler.process(element.postgresql, **kw)
+
+    if compiler.dialect.name != "sqlite":
+        msg = f"{element.name} requires PostgreSQL or SQLite"
+        raise CompileError(msg)
+
+    if element.sqlite is None:
+        msg = f"{element.name} value with arrays of objects or arrays is not supported on SQLite"
+        raise CompileError(msg)
+
+    return compiler.process(element.sqlite, **kw)
+
+
+def _sqlite_contains(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    path: str,
+    value: Any,  # noqa: ANN401
+) -> ColumnElement[bool] | None:
+    if isinstance(value, Mapping):
+        conditions = []
+        for key, item in value.items():
+            condition = _sqlite_contains(field, _key_path(path, key), item)
+            if condition is None:
+                return None
+
+            conditions.append(condition)
+
+        return and_(true(), *conditions)
+
+    if isinstance(value, list):
+        return _sqlite_array_contains(field, path, value)
+
+    path_bind = _path_bind(path)
+    return _scalar_matches(
+        func.json_extract(field, path_bind),
+        func.json_type(field, path_bind),
+        value,
+    )
+
+
+def _sqlite_array_contains(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    path: str,
+    value: list[Any],
+) -> ColumnElement[bool] | None:
+    if any(isinstance(item, Mapping | list) for item in value):
+        return None
+
+    conditions = []
+    for item in value:
+        items = _json_each(field, _path_bind(path))
+        conditions.append(
+            exists(
+                select(1)
+                .select_from(items)
+                .where(_scalar_matches(items.c.value, items.c.type, item)),
+            ),
+        )
+    return and_(func.json_type(field, _path_bind(path)) == "array", *conditions)
+
+
+def _scalar_matches(
+    value_expr: ColumnElement[Any],
+    type_expr: ColumnElement[Any],
+    value: Any,  # noqa: ANN401
+) -> ColumnElement[bool]:
+    if value is None:
+        return type_expr == "null"
+
+    if isinstance(value, bool):
+        return type_expr == ("true" if value else "false")
+
+    return and_(type_expr.not_in(["true", "false"]), value_expr == value)
+
+
+def _json_each(value: Any, path: ColumnElement[str] | None = None) -> Any:  # noqa: ANN401
+    arguments = (value,) if path is None else (value, path)
+    return func.json_each(*arguments).table_valued("value", "type")
+
+
+def _key_path(path: str, key: str) -> str:
+    return f"{path}.{json.dumps(key)}"
+
+
+def _path_bind(path: str) -> ColumnElement[str]:
+    return bindparam(None, path, type_=String, unique=True)
+
+
+def _json_bind(value: Collection[Any]) -> ColumnElement[Any]:
+    return bindparam(None, list(value), type_=JSON, unique=True)
+
+
+def _array_bind(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: Collection[Any],
+) -> ColumnElement[Any]:
+    return bindparam(None, list(value), type_=field.type, unique=True)
@@ -0,0 +1,274 @@
+import dataclasses
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Literal
+
+from sqlalchemy import Connection, ExecutionContext, Select, event
+from sqlalchemy.engine.interfaces import DBAPICursor
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import operators
+
+from ._joins import iter_relationships, plan_join
+from .filter_ import ManualFilter
+from .fulltext import FullTextOperator
+from .operators import _has_index, iprefix_op
+from .ordering import OrderingEnum, OrderingField
+from .relationship import RelationshipInfo
+from .selectivity import filter_selectivity
+from .types_ import SelectClause
+from .unset import Unset
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+    from .base import BaseFilter, BaseSorter
+
+TIMEOUT_OPTION = "sqla_filter_timeout_ms"
+"""Execution option `QueryBudget(action="timeout")` sets on queries above the budget"""
+
+_SUBSTRING_OPERATORS: frozenset[Any] = frozenset(
+    {
+        operators.contains_op,
+        operators.icontains_op,
+        operators.endswith_op,
+        operators.iendswith_op,
+        operators.istartswith_op,
+        operators.like_op,
+        operators.ilike_op,
+        operators.not_contains_op,
+        operators.not_icontains_op,
+        operators.not_like_op,
+        operators.not_ilike_op,
+        operators.regexp_match_op,
+    },
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class QueryCost:
+    """What the active fields of a filter or sorter add to a query"""
+
+    joins: int = 0
+    to_many_joins: int = 0
+    """Joins of collection relationships, they multiply rows"""
+
+    indexed_predicates: int = 0
+    unindexed_predicates: int = 0
+    substring_predicates: int = 0
+    """`contains`, `icontains`, `like`, ... that can't use a B-tree index"""
+
+    manual_filters: int = 0
+    or_depth: int = 0
+    unindexed_sort_keys: int = 0
+    selectivity: float = 1.0
+    """Expected fraction of rows matched, from selectivity hints and learned estimates"""
+
+    def score(self, weights: "CostWeights | None" = None) -> float:
+        weights = weights or CostWeights()
+        return float(
+            sum(
+                getattr(self, field.name) * getattr(weights, field.name)
+                for field in dataclasses.fields(weights)
+            ),
+        )
+
+    def __add__(self, other: "QueryCost") -> "QueryCost":
+        return QueryCost(
+            **{
+                field.name: getattr(self, field.name) + getattr(other, field.name)
+                for field in dataclasses.fields(self)
+                if field.name != "selectivity"
+            },
+            selectivity=self.selectivity * other.selectivity,
+        )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class CostWeights:
+    """Score of each unit of the matching `QueryCost` count"""
+
+    joins: float = 1
+    to_many_joins: float = 4
+    indexed_predicates: float = 0.5
+    unindexed_predicates: float = 3
+    substring_predicates: float = 8
+    manual_filters: float = 2
+    or_depth: float = 3
+    unindexed_sort_keys: float = 2
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class QueryBudget:
+    max_score: float
+
+    _: dataclasses.KW_ONLY
+    action: Literal["reject", "timeout"] = "reject"
+    """Raise `QueryBudgetExceededError` or set a statement timeout on queries above `max_score`"""
+
+    timeout_ms: int | None = None
+    weights: CostWeights = CostWeights()
+
+    def __post_init__(self) -> None:
+        if self.action == "timeout" and self.timeout_ms is None:
+            msg = 'timeout_ms is required for action="timeout"'
+            raise ValueError(msg)
+
+
+class QueryBudgetExceededError(Exception):
+    def __init__(self, owner: object, cost: QueryCost, budget: QueryBudget) -> None:
+        self.cost = cost
+        self.budget = budget
+        score = cost.score(budget.weights)
+        super().__init__(
+            f"{type(owner).__name__} query cost {score:g} exceeds budget {budget.max_score:g}: {cost}",
+        )
+
+
+def estimate_filter_cost(filter_: "BaseFilter") -> QueryCost:
+    """Cost of the active fields of `filter_` and its `or_` filters, from model metadata only"""
+    cost = QueryCost()
+    joined: set[Any] = set()
+    or_depth = 0
+    current: BaseFilter | None = filter_
+    while current is not None:
+        for field_name, field in current.__sqla_filter_fields__.items():
+            if getattr(current, field_name) is Unset.v:
+                continue
+
+            if isinstance(field, ManualFilter):
+                cost += QueryCost(manual_filters=1)
+                continue
+
+            plan = plan_join(
+                None,
+                field,
+                eliminate=current.__sqla_filter_eliminate_joins__,
+            )
+            cost += _joins_cost(plan.relationships, joined=joined)
+            cost += _predicate_cost(plan.field, field.operator)
+
+        current = getattr(current, "or_", None)
+        or_depth += current is not None
+
+    selectivity = filter_selectivity(filter_)
+    return cost + QueryCost(
+        or_depth=or_depth,
+        selectivity=1.0 if selectivity is None else selectivity,
+    )
+
+
+def estimate_sorter_cost(
+    active_fields: Iterable[tuple[OrderingField, OrderingEnum]],
+) -> QueryCost:
+    """Cost of `BaseSorter.get_active_fields`, from model metadata only"""
+    cost = QueryCost()
+    joined: set[Any] = set()
+    for field, _ in active_fields:
+        cost += _joins_cost(iter_relationships(field), joined=joined)
+        if not _is_indexed(field.field, lower=False):
+            cost += QueryCost(unindexed_sort_keys=1)
+
+    return cost
+
+
+def check_budget(
+    owner: "BaseFilter | BaseSorter",
+    stmt: Select[SelectClause],
+    *,
+    cost: QueryCost,
+    budget: QueryBudget,
+) -> Select[SelectClause]:
+    """Reject or tag `stmt` with a timeout if `cost` exceeds `budget`"""
+    if cost.score(budget.weights) <= budget.max_score:
+        return stmt
+
+    if budget.action == "reject":
+        raise QueryBudgetExceededError(owner, cost, budget)
+
+    return stmt.execution_options(**{TIMEOUT_OPTION: budget.timeout_ms}).prefix_with(
+        f"/*+ MAX_EXECUTION_TIME({budget.timeout_ms}) */",
+        dialect="mysql",
+    )
+
+
+def install_statement_timeout(engine: "Engine") -> None:
+    """
+    Apply `QueryBudget(action="timeout")` timeouts on PostgreSQL
+
+    MySQL reads the optimizer hint rendered into the statement, no listener needed.
+    """
+    event.listen(engine, "before_cursor_execute", _set_statement_timeout)
+    event.listen(engine, "after_cursor_execute", _reset_statement_timeout)
+
+
+def _set_statement_timeout(  # noqa: PLR0913
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,  # noqa: ARG001
+    parameters: Any,  # noqa: ANN401, ARG001
+    context: ExecutionContext | None,
+    executemany: bool,  # noqa: ARG001, FBT001
+) -> None:
+    timeout_ms = _timeout_ms(conn, context)
+    if timeout_ms is not None:
+        cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def _reset_statement_timeout(  # noqa: PLR0913
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,  # noqa: ARG001
+    parameters: Any,  # noqa: ANN401, ARG001
+    context: ExecutionContext | None,
+    executemany: bool,  # noqa: ARG001, FBT001
+) -> None:
+    if _timeout_ms(conn, context) is not None:
+        cursor.execute("SET LOCAL statement_timeout = DEFAULT")
+
+
+def _timeout_ms(conn: Connection, context: ExecutionContext | None) -> int | None:
+    if context is None or conn.dialect.name != "postgresql":
+        return None
+
+    return context.execution_options.get(TIMEOUT_OPTION)
+
+
+def _joins_cost(
+    relationships: Iterable[RelationshipInfo],
+    *,
+    joined: set[Any],
+) -> QueryCost:
+    cost = QueryCost()
+    for relationship in relationships:
+        if relationship.field in joined:
+            continue
+
+        joined.add(relationship.field)
+        if (
+            isinstance(relationship.field, InstrumentedAttribute)
+            and relationship.field.property.uselist
+        ):
+            cost += QueryCost(to_many_joins=1)
+        else:
+            cost += QueryCost(joins=1)
+
+    return cost
+
+
+def _predicate_cost(field: Any, operator: Any) -> QueryCost:  # noqa: ANN401
+    if operator in _SUBSTRING_OPERATORS:
+        return QueryCost(substring_predicates=1)
+
+    if isinstance(operator, FullTextOperator) or _is_indexed(
+        field,
+        lower=operator is iprefix_op,
+    ):
+        return QueryCost(indexed_predicates=1)
+
+    return QueryCost(unindexed_predicates=1)
+
+
+def _is_indexed(field: Any, *, lower: bool) -> bool:  # noqa: ANN401
+    try:
+        return _has_index(field, lower=lower)
+    except TypeError:
+        return False
@@ -0,0 +1,72 @@
+import contextlib
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import CTE, ClauseElement, Select
+from sqlalchemy.sql import visitors
+
+_MATERIALIZED_DIALECTS = ("postgresql", "sqlite")
+
+_registry: ContextVar[dict[str, CTE] | None] = ContextVar(
+    "sqla_filter_cte_registry",
+    default=None,
+)
+
+
+def shared_cte(
+    name: str,
+    factory: Callable[[], Select[Any]],
+    *,
+    materialized: bool = False,
+) -> CTE:
+    """
+    CTE `name` shared by every filter of one `BaseFilter.apply` call, `or_` filters included
+
+    `factory` is called once per `apply`, the statement renders the CTE once in its `WITH` clause.
+    A CTE `name` the statement passed to `apply` already has, e.g. from a previous `apply`, is reused.
+    `materialized` adds the `MATERIALIZED` hint on PostgreSQL and SQLite.
+    Outside `apply` a new CTE is returned on every call.
+    """
+    registry = _registry.get()
+    if registry is not None and name in registry:
+        return registry[name]
+
+    cte = factory().cte(name)
+    if materialized:
+        for dialect in _MATERIALIZED_DIALECTS:
+            cte = cte.prefix_with("MATERIALIZED", dialect=dialect)
+
+    if registry is not None:
+        registry[name] = cte
+
+    return cte
+
+
+@contextlib.contextmanager
+def cte_scope(stmt: ClauseElement | None = None) -> Iterator[None]:
+    """Share `shared_cte` CTEs, and the CTEs `stmt` already has, until exit, nested scopes reuse the outer one"""
+    registry = _registry.get()
+    if registry is not None:
+        for name, cte in _statement_ctes(stmt).items():
+            registry.setdefault(name, cte)
+
+        yield
+        return
+
+    token = _registry.set(_statement_ctes(stmt))
+    try:
+        yield
+    finally:
+        _registry.reset(token)
+
+
+def _statement_ctes(stmt: ClauseElement | None) -> dict[str, CTE]:
+    if stmt is None:
+        return {}
+
+    return {
+        str(element.name): element
+        for element in visitors.iterate(stmt)
+        if isinstance(element, CTE)
+    }
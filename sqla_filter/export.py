@@ -0,0 +1,100 @@
+import importlib
+from collections.abc import AsyncIterator, Iterator, Sequence
+from types import ModuleType
+from typing import Any, Literal, TypeAlias
+
+from sqlalchemy import ColumnElement, Connection, Row, Select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from .base import BaseFilter
+
+ArrayKind: TypeAlias = Literal["auto", "numpy", "list"]
+ColumnBatch: TypeAlias = dict[str, Any]
+"""Column name to a list or a NumPy array of its values"""
+
+
+def iter_column_batches(  # noqa: PLR0913
+    session: Session | Connection,
+    stmt: Select[Any],
+    *,
+    filter_: BaseFilter,
+    columns: Sequence[InstrumentedAttribute[Any] | ColumnElement[Any]] | None = None,
+    batch_size: int = 10_000,
+    arrays: ArrayKind = "auto",
+) -> Iterator[ColumnBatch]:
+    """
+    Filtered rows of `stmt` as column-oriented batches of up to `batch_size` rows
+
+    Only `columns`, or the columns of the selected models, are fetched, ORM objects are never built.
+    `arrays="auto"` returns NumPy arrays if NumPy is installed, lists otherwise.
+    """
+    projection = _projection(stmt, filter_=filter_, columns=columns)
+    numpy = _numpy(arrays)
+    result = session.execute(projection, execution_options={"yield_per": batch_size})
+    keys = list(result.keys())
+    for rows in result.partitions():
+        yield _to_columns(keys, rows, numpy=numpy)
+
+
+async def iter_column_batches_async(  # noqa: PLR0913
+    session: AsyncSession | AsyncConnection,
+    stmt: Select[Any],
+    *,
+    filter_: BaseFilter,
+    columns: Sequence[InstrumentedAttribute[Any] | ColumnElement[Any]] | None = None,
+    batch_size: int = 10_000,
+    arrays: ArrayKind = "auto",
+) -> AsyncIterator[ColumnBatch]:
+    """Same as `iter_column_batches`, rows are streamed with `AsyncSession.stream`"""
+    projection = _projection(stmt, filter_=filter_, columns=columns)
+    numpy = _numpy(arrays)
+    result = await session.stream(
+        projection, execution_options={"yield_per": batch_size}
+    )
+    keys = list(result.keys())
+    async for rows in result.partitions():
+        yield _to_columns(keys, rows, numpy=numpy)
+
+
+def _projection(
+    stmt: Select[Any],
+    *,
+    filter_: BaseFilter,
+    columns: Sequence[InstrumentedAttribute[Any] | ColumnElement[Any]] | None,
+) -> Select[Any]:
+    projection = stmt.with_only_columns(
+        *(columns if columns is not None else stmt.selected_columns),
+        maintain_column_froms=True,
+    )
+    # Loader options of `contains_eager` relationships don't apply to columns
+    return filter_._finalize(filter_._apply(projection, with_loader=False))  # noqa: SLF001
+
+
+def _numpy(arrays: ArrayKind) -> ModuleType | None:
+    if arrays == "list":
+        return None
+
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:
+        if arrays == "numpy":
+            msg = 'arrays="numpy" requires NumPy, install sqla-filter[numpy]'
+            raise ImportError(msg) from None
+
+        return None
+
+
+def _to_columns(
+    keys: Sequence[str],
+    rows: Sequence[Row[Any]],
+    *,
+    numpy: ModuleType | None,
+) -> ColumnBatch:
+    values = zip(*rows, strict=True)
+    if numpy is None:
+        return {key: list(column) for key, column in zip(keys, values, strict=True)}
+
+    return {
+        key: numpy.asarray(column) for key, column in zip(keys, values, strict=True)
+    }
@@ -20,12 +20,13 @@ if TYPE_CHECKING:
     from .base import BaseFilter
 
 _TFilter = TypeVar("_TFilter", bound="BaseFilter")
+_TPrefetched = TypeVar("_TPrefetched")
 
 
 class OperatorProtocol(Protocol):  # pragma: no cover
     def __call__(
         self,
-        field: InstrumentedAttribute[Any],
+        field: InstrumentedAttribute[Any] | ColumnElement[Any],
         value: Any,  # noqa: ANN401
     ) -> ColumnElement[bool]: ...
 
@@ -52,11 +53,56 @@ class ManualFilter(ABC, Generic[SelectClause, _TFilter]):
         self._name = value
 
 
-@dataclasses.dataclass(slots=True)
+class AsyncManualFilter(
+    ManualFilter[SelectClause, _TFilter],
+    Generic[SelectClause, _TFilter, _TPrefetched],
+):
+    """
+    Manual filter that needs data fetched asynchronously, e.g. resolved ACL IDs
+
+    `BaseFilter.apply_async` runs `prefetch` of all active filters concurrently,
+    then builds the statement with `apply_prefetched`.
+    """
+
+    @abstractmethod
+    async def prefetch(
+        self,
+        *,
+        value: Any,  # noqa: ANN401
+        filter_: _TFilter,
+    ) -> _TPrefetched:
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply_prefetched(
+        self,
+        stmt: Select[SelectClause],
+        *,
+        value: Any,  # noqa: ANN401
+        prefetched: _TPrefetched,
+        filter_: _TFilter,
+    ) -> Select[SelectClause]:
+        raise NotImplementedError
+
+    def apply(
+        self,
+        stmt: Select[SelectClause],  # noqa: ARG002
+        *,
+        value: Any,  # noqa: ANN401, ARG002
+        filter_: _TFilter,  # noqa: ARG002
+    ) -> Select[SelectClause]:
+        msg = f"{self.name} is an AsyncManualFilter, use apply_async"
+        raise TypeError(msg)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class FilterField:
-    _name: str = dataclasses.field(init=False, repr=False, hash=True)
+    _name: str = dataclasses.field(default="", kw_only=True, repr=False)
+    """Set on the per-class copy made when the filter class is created"""
+
+    field: InstrumentedAttribute[Any] | ColumnElement[Any]
+    """ORM attribute or Core column expression"""
 
-    field: InstrumentedAttribute[Any]
     _: dataclasses.KW_ONLY
     operator: OperatorType | OperatorProtocol
     relationship: RelationshipInfo | None = None
@@ -65,10 +111,17 @@ class FilterField:
     relationships: Sequence[RelationshipInfo] | None = None
     """For filter by nested relationship field"""
 
+    selectivity: float | None = None
+    """Expected fraction of rows matched, conditions are emitted most selective first"""
+
+    def __post_init__(self) -> None:
+        if self.relationships is not None:
+            object.__setattr__(self, "relationships", tuple(self.relationships))
+
+        if self.selectivity is not None and not 0 < self.selectivity <= 1:
+            msg = "selectivity must be in (0, 1]"
+            raise ValueError(msg)
+
     @property
     def name(self) -> str:  # pragma: no cover
         return self._name
-
-    @name.setter
-    def name(self, value: str) -> None:
-        self._name = value
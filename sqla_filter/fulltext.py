@@ -0,0 +1,247 @@
+import dataclasses
+import re
+from typing import Any
+
+import sqlalchemy.dialects.postgresql  # noqa: F401 registers to_tsvector and plainto_tsquery
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    ColumnElement,
+    Connection,
+    Dialect,
+    Index,
+    Integer,
+    String,
+    Table,
+    TypeDecorator,
+    bindparam,
+    event,
+    func,
+    literal_column,
+    text,
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.ddl import ExecutableDDLElement
+from sqlalchemy.sql.elements import BindParameter, ColumnClause
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from ._columns import as_column
+
+_CONFIG_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+_FTS5_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+class FullTextMatch(ColumnElement[bool]):
+    """
+    Full-text search predicate
+
+    PostgreSQL: `to_tsvector(config, column) @@ plainto_tsquery(config, query)`
+
+    SQLite: `rowid IN (SELECT rowid FROM <table>_<column>_fts WHERE ... MATCH query)`,
+    every word of the query is quoted, so all of them must match, like `plainto_tsquery`
+
+    Other dialects fall back to `lower(column) LIKE '%' || lower(query) || '%'`
+    """
+
+    inherit_cache = True
+    type = Boolean()
+    _is_implicitly_boolean = True
+
+    _traverse_internals = [  # noqa: RUF012
+        ("column", InternalTraversal.dp_clauseelement),
+        ("query", InternalTraversal.dp_clauseelement),
+        ("config", InternalTraversal.dp_string),
+    ]
+
+    def __init__(
+        self,
+        column: InstrumentedAttribute[Any] | ColumnElement[Any],
+        query: str,
+        *,
+        config: str = "english",
+    ) -> None:
+        self.column: Column[Any] = coercions.expect(roles.ExpressionElementRole, column)
+        self.query: BindParameter[str] = bindparam(
+            None,
+            query,
+            type_=_FullTextQueryType(),
+            unique=True,
+        )
+        self.config = _validate_config(config)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FullTextOperator:
+    config: str = "english"
+
+    def __call__(
+        self,
+        field: InstrumentedAttribute[Any] | ColumnElement[Any],
+        value: str,
+    ) -> ColumnElement[bool]:
+        return FullTextMatch(field, value, config=self.config)
+
+
+fulltext_op = FullTextOperator()
+
+
+def fts_table_name(column: InstrumentedAttribute[Any] | Column[Any]) -> str:
+    """Name of the SQLite FTS5 shadow table for `column`"""
+    column_ = as_column(column)
+    return f"{column_.table.name}_{column_.name}_fts"
+
+
+def declare_fulltext_index(
+    column: InstrumentedAttribute[Any] | Column[Any],
+    *,
+    config: str = "english",
+) -> Index:
+    """
+    Declare the index `fulltext_op` relies on
+
+    On PostgreSQL it's a GIN index over `to_tsvector(config, column)`,
+    on SQLite an external content FTS5 table kept in sync by triggers.
+    Call it once at module level, next to the model.
+
+    The FTS5 table is keyed on the table `INTEGER PRIMARY KEY` if there is one,
+    otherwise on the implicit rowid, which `VACUUM` may renumber:
+    call `rebuild_fulltext_index` after it.
+    """
+    column_ = as_column(column)
+    table = column_.table
+    config = _validate_config(config)
+
+    for statement in _sqlite_fts_ddl(column_):
+        event.listen(table, "after_create", _sqlite_ddl(statement))
+
+    event.listen(
+        table,
+        "before_drop",
+        _sqlite_ddl(f'DROP TABLE IF EXISTS "{fts_table_name(column_)}"'),
+    )
+
+    index = Index(
+        f"ix_{table.name}_{column_.name}_fts",
+        func.to_tsvector(literal_column(f"'{config}'"), column_),
+        postgresql_using="gin",
+    ).ddl_if(dialect="postgresql")
+    table.append_constraint(index)
+    return index
+
+
+def rebuild_fulltext_index(
+    connection: Connection,
+    column: InstrumentedAttribute[Any] | Column[Any],
+) -> None:
+    """Rebuild the SQLite FTS5 table of `column` from its content table, no-op elsewhere"""
+    if connection.dialect.name != "sqlite":
+        return
+
+    fts = connection.dialect.identifier_preparer.quote(fts_table_name(column))
+    connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))  # noqa: S608
+
+
+class _FullTextQueryType(TypeDecorator[str]):
+    """Search query, bound on SQLite as an FTS5 query of quoted words"""
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> str | None:
+        if value is None or dialect.name != "sqlite":
+            return value
+
+        return _fts5_query(value)
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each word so FTS5 query syntax in user input is not interpreted"""
+    tokens = _FTS5_TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return '""'
+
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+def _validate_config(config: str) -> str:
+    if not _CONFIG_PATTERN.match(config):
+        msg = f"Invalid text search configuration name: {config!r}"
+        raise ValueError(msg)
+
+    return config
+
+
+def _rowid_name(table: Table) -> str:
+    """`INTEGER PRIMARY KEY` column name, it's an alias of the stable rowid"""
+    primary_key = list(table.primary_key.columns)
+    if len(primary_key) == 1 and type(primary_key[0].type) is Integer:
+        return primary_key[0].name
+
+    return "rowid"
+
+
+def _sqlite_fts_ddl(column: Column[Any]) -> list[str]:
+    table = f'"{column.table.name}"'
+    fts = f'"{fts_table_name(column)}"'
+    name = f'"{column.name}"'
+    rowid = f'"{_rowid_name(column.table)}"'
+    trigger = fts_table_name(column)
+
+    delete = f"INSERT INTO {fts}({fts}, rowid, {name}) VALUES ('delete', old.{rowid}, old.{name});"  # noqa: S608
+    insert = f"INSERT INTO {fts}(rowid, {name}) VALUES (new.{rowid}, new.{name});"  # noqa: S608
+
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({name}, content={table}, content_rowid={rowid})",
+        f'CREATE TRIGGER "{trigger}_ai" AFTER INSERT ON {table} BEGIN {insert} END',
+        f'CREATE TRIGGER "{trigger}_ad" AFTER DELETE ON {table} BEGIN {delete} END',
+        f'CREATE TRIGGER "{trigger}_au" AFTER UPDATE ON {table} BEGIN {delete} {insert} END',
+    ]
+
+
+def _sqlite_ddl(statement: str) -> ExecutableDDLElement:
+    ddl = DDL(statement)  # type:ignore[no-untyped-call]
+    return ddl.execute_if(dialect="sqlite")
+
+
+@compiles(FullTextMatch)
+def _compile_fallback(
+    element: FullTextMatch,
+    compiler: SQLCompiler,
+    **kw: Any,  # noqa: ANN401
+) -> str:
+    return compiler.process(element.column.icontains(element.query), **kw)
+
+
+@compiles(FullTextMatch, "postgresql")
+def _compile_postgresql(
+    element: FullTextMatch,
+    compiler: SQLCompiler,
+    **kw: Any,  # noqa: ANN401
+) -> str:
+    config: ColumnClause[str] = literal_column(f"'{element.config}'")
+    expr = func.to_tsvector(config, element.column).bool_op("@@")(
+        func.plainto_tsquery(config, element.query),
+    )
+    return compiler.process(expr, **kw)
+
+
+@compiles(FullTextMatch, "sqlite")
+def _compile_sqlite(
+    element: FullTextMatch,
+    compiler: SQLCompiler,
+    **kw: Any,  # noqa: ANN401
+) -> str:
+    column = as_column(element.column)
+    rowid: ColumnClause[Any] = ColumnClause(
+        _rowid_name(column.table),
+        _selectable=element.column.table,
+    )
+    fts = compiler.preparer.quote(fts_table_name(column))
+    return (
+        f"{compiler.process(rowid, **kw)} IN (SELECT rowid FROM {fts} "  # noqa: S608
+        f"WHERE {fts} MATCH {compiler.process(element.query, **kw)})"
+    )
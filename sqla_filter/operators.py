@@ -0,0 +1,358 @@
+import dataclasses
+import json
+import string
+import sys
+from collections.abc import Collection
+from typing import TYPE_CHECKING, Any, Literal, TypeAlias
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    ColumnElement,
+    Dialect,
+    FunctionElement,
+    Index,
+    String,
+    TypeDecorator,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    column,
+    func,
+    literal_column,
+    select,
+    values,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import coercions, roles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.type_api import TypeEngine
+from sqlalchemy.sql.visitors import InternalTraversal
+
+from ._columns import as_column
+from .filter_ import FilterField
+
+if TYPE_CHECKING:
+    from .base import BaseFilter
+
+_SURROGATES_START = 0xD800
+_SURROGATES_END = 0xDFFF
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+InStrategy: TypeAlias = Literal["auto", "any", "json", "values"]
+
+
+def prefix_op(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: str,
+) -> ColumnElement[bool]:
+    """
+    Sargable `startswith`: `field >= :value AND field < :value_next`
+
+    Unlike `LIKE :value || '%'` it uses a plain B-tree index on `field`.
+    Matches `startswith` for binary ("C") collations.
+    """
+    return _prefix_range(field, value)
+
+
+def iprefix_op(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: str,
+) -> ColumnElement[bool]:
+    """
+    Sargable `istartswith`: `lower(field) >= :value AND lower(field) < :value_next`
+
+    Uses an expression index on `lower(field)`, see `declare_lower_index`.
+    `value` is lowered the way the dialect `lower()` does: ASCII only on SQLite.
+    """
+    expr = func.lower(field)
+    lower_bound = bindparam(
+        None,
+        value,
+        type_=_LowerPrefixType(upper_bound=False),
+        unique=True,
+    )
+    if _prefix_upper_bound(value) is None:
+        return expr >= lower_bound
+
+    upper_bound = bindparam(
+        None,
+        value,
+        type_=_LowerPrefixType(upper_bound=True),
+        unique=True,
+    )
+    return and_(expr >= lower_bound, expr < upper_bound)
+
+
+class _LowerPrefixType(TypeDecorator[str]):
+    """Prefix lowered like the dialect `lower()`, or the upper bound of the lowered prefix"""
+
+    impl = String
+    cache_ok = True
+
+    def __init__(self, *, upper_bound: bool) -> None:
+        super().__init__()
+        self.upper_bound = upper_bound
+
+    def process_bind_param(self, value: str | None, dialect: Dialect) -> str | None:
+        if value is None:
+            return None
+
+        if dialect.name == "sqlite":
+            value = value.translate(_ASCII_LOWER)
+        else:
+            value = value.lower()
+
+        if self.upper_bound:
+            return _prefix_upper_bound(value)
+
+        return value
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LargeInOperator:
+    """
+    `in_op` that switches strategy for long value lists
+
+    Up to `threshold` values it's a plain `IN`. Above it:
+
+    - `any`: `field = ANY(:array)`, PostgreSQL only
+    - `json`: `field IN (SELECT value FROM json_each(:json))` on SQLite,
+      `json_array_elements_text` on PostgreSQL, other dialects are not supported
+    - `values`: `field IN (SELECT value FROM (VALUES ...))`, one parameter per value
+    - `auto`: `any` on PostgreSQL, `json` on SQLite, a plain `IN` elsewhere
+
+    `any` and `json` bind the whole list as a single parameter.
+    """
+
+    threshold: int = 1000
+    strategy: InStrategy = "auto"
+
+    def __call__(
+        self,
+        field: InstrumentedAttribute[Any] | ColumnElement[Any],
+        value: Collection[Any],
+    ) -> ColumnElement[bool]:
+        if len(value) <= self.threshold:
+            return field.in_(value)
+
+        if self.strategy == "values":
+            return _in_values(field, value)
+
+        return LargeIn(field, value, strategy=self.strategy)
+
+
+large_in_op = LargeInOperator()
+
+
+class LargeIn(ColumnElement[bool]):
+    inherit_cache = True
+    type = Boolean()
+    _is_implicitly_boolean = True
+
+    _traverse_internals = [  # noqa: RUF012
+        ("column", InternalTraversal.dp_clauseelement),
+        ("values", InternalTraversal.dp_clauseelement),
+        ("items", InternalTraversal.dp_clauseelement),
+        ("strategy", InternalTraversal.dp_string),
+    ]
+
+    def __init__(
+        self,
+        column: InstrumentedAttribute[Any] | ColumnElement[Any],
+        values: Collection[Any],
+        *,
+        strategy: Literal["auto", "any", "json"],
+    ) -> None:
+        self.column: ColumnElement[Any] = coercions.expect(
+            roles.ExpressionElementRole,
+            column,
+        )
+        self.strategy = strategy
+        self.values: BindParameter[list[Any]] = bindparam(
+            None,
+            list(values),
+            type_=_InValuesType(self.column.type, strategy=strategy),
+            unique=True,
+        )
+        # Plain `IN` fallback of `auto` for dialects without a JSON table function
+        self.items: BindParameter[list[Any]] = bindparam(
+            None,
+            list(values),
+            type_=self.column.type,
+            expanding=True,
+            unique=True,
+        )
+
+
+class _InValuesType(TypeDecorator[list[Any]]):
+    """A list bound as one parameter: an array on PostgreSQL `any`, a JSON string otherwise"""
+
+    impl = String
+    cache_ok = True
+
+    def __init__(
+        self,
+        item_type: TypeEngine[Any],
+        *,
+        strategy: Literal["auto", "any", "json"],
+    ) -> None:
+        super().__init__()
+        self.item_type = item_type
+        self.strategy = strategy
+
+    def load_dialect_impl(self, dialect: Dialect) -> TypeEngine[Any]:
+        if _uses_array(self.strategy, dialect):
+            return dialect.type_descriptor(postgresql.ARRAY(self.item_type))
+
+        return dialect.type_descriptor(String())
+
+    def process_bind_param(
+        self,
+        value: list[Any] | None,
+        dialect: Dialect,
+    ) -> Any:  # noqa: ANN401
+        if value is None or _uses_array(self.strategy, dialect):
+            return value
+
+        process = self.item_type.dialect_impl(dialect).bind_processor(dialect)
+        if process is not None:
+            value = [process(item) for item in value]
+
+        return json.dumps(value, default=str)
+
+
+def _uses_array(strategy: str, dialect: Dialect) -> bool:
+    if strategy == "any":
+        return True
+
+    return strategy == "auto" and dialect.name == "postgresql"
+
+
+def _in_values(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    value: Collection[Any],
+) -> ColumnElement[bool]:
+    value_column = column("value", field.type)
+    rows = values(value_column, name="in_values").data([(item,) for item in value])
+    return field.in_(select(rows.c.value))
+
+
+@compiles(LargeIn)
+def _compile_large_in(
+    element: LargeIn,
+    compiler: SQLCompiler,
+    **kw: Any,  # noqa: ANN401
+) -> str:
+    if _uses_array(element.strategy, compiler.dialect):
+        if compiler.dialect.name != "postgresql":
+            msg = f"LargeInOperator(strategy={element.strategy!r}) requires PostgreSQL"
+            raise CompileError(msg)
+
+        expr = element.column == any_(element.values)
+    elif compiler.dialect.name == "postgresql":
+        items = select(cast(literal_column("value"), element.column.type)).select_from(
+            func.json_array_elements_text(cast(element.values, postgresql.JSON)),
+        )
+        expr = element.column.in_(items)
+    elif compiler.dialect.name == "sqlite":
+        items = select(literal_column("value")).select_from(
+            func.json_each(element.values),
+        )
+        expr = element.column.in_(items)
+    elif element.strategy == "auto":
+        expr = element.column.in_(element.items)
+    else:
+        msg = f"LargeInOperator(strategy={element.strategy!r}) requires PostgreSQL or SQLite"
+        raise CompileError(msg)
+
+    return compiler.process(expr, **kw)
+
+
+def declare_lower_index(column: InstrumentedAttribute[Any] | Column[Any]) -> Index:
+    """Declare the `lower(column)` expression index `iprefix_op` relies on"""
+    column_ = as_column(column)
+    index = Index(f"ix_{column_.table.name}_{column_.name}_lower", func.lower(column_))
+    column_.table.append_constraint(index)
+    return index
+
+
+def missing_prefix_indexes(filter_cls: type["BaseFilter"]) -> list[str]:
+    """
+    Names of `prefix_op`/`iprefix_op` fields that have no index to use
+
+    Only the model metadata is inspected, not the database.
+    """
+    missing = []
+    for name, filter_ in filter_cls.__sqla_filter_fields__.items():
+        if not isinstance(filter_, FilterField):
+            continue
+
+        if filter_.operator is prefix_op:
+            has_index = _has_index(filter_.field, lower=False)
+        elif filter_.operator is iprefix_op:
+            has_index = _has_index(filter_.field, lower=True)
+        else:
+            continue
+
+        if not has_index:
+            missing.append(name)
+
+    return missing
+
+
+def _prefix_range(
+    expr: ColumnElement[str] | InstrumentedAttribute[Any],
+    value: str,
+) -> ColumnElement[bool]:
+    upper_bound = _prefix_upper_bound(value)
+    if upper_bound is None:
+        return expr >= value
+
+    return and_(expr >= value, expr < upper_bound)
+
+
+def _prefix_upper_bound(value: str) -> str | None:
+    """Smallest string greater than every string starting with `value`"""
+    while value:
+        code = ord(value[-1]) + 1
+        if code == _SURROGATES_START:
+            code = _SURROGATES_END + 1
+
+        if code <= sys.maxunicode:
+            return value[:-1] + chr(code)
+
+        value = value[:-1]
+
+    return None
+
+
+def _has_index(
+    field: InstrumentedAttribute[Any] | ColumnElement[Any],
+    *,
+    lower: bool,
+) -> bool:
+    column = as_column(field)
+    if not lower and (column.primary_key or column.index or column.unique):
+        return True
+
+    return any(
+        _is_index_on(index.expressions[0], column, lower=lower)
+        for index in column.table.indexes
+    )
+
+
+def _is_index_on(expr: Any, column: Column[Any], *, lower: bool) -> bool:  # noqa: ANN401
+    if not lower:
+        return isinstance(expr, Column) and expr.compare(column)
+
+    if not isinstance(expr, FunctionElement) or expr.name != "lower":
+        return False
+
+    (argument,) = expr.clauses
+    return argument.compare(column)
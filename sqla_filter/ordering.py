@@ -1,8 +1,9 @@
 import dataclasses
 import enum
-from collections.abc import Iterable, Sequence
+from collections.abc import Callable, Iterable, Sequence
 from typing import Any, Literal, cast
 
+from sqlalchemy import ColumnElement, and_, or_
 from sqlalchemy.orm import InstrumentedAttribute
 
 from .relationship import RelationshipInfo
@@ -13,11 +14,14 @@ class OrderingEnum(enum.StrEnum):
     desc = enum.auto()
 
 
-@dataclasses.dataclass(slots=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class OrderingField:
-    _name: str = dataclasses.field(init=False, repr=False, hash=True)
+    _name: str = dataclasses.field(default="", kw_only=True, repr=False)
+    """Set on the per-class copy made when the sorter class is created"""
+
+    field: InstrumentedAttribute[Any] | ColumnElement[Any]
+    """ORM attribute or Core column expression"""
 
-    field: InstrumentedAttribute[Any]
     _: dataclasses.KW_ONLY
     relationship: RelationshipInfo | None = None
     """For ordering by relationship field"""
@@ -26,15 +30,17 @@ class OrderingField:
     """For ordering by nested relationship field"""
 
     nulls: Literal["first", "last"] | None = None
+    collation_key: Callable[[Any], Any] | None = None
+    """Python sort key of string values matching the database collation, for merged partitioned or sharded rows"""
+
+    def __post_init__(self) -> None:
+        if self.relationships is not None:
+            object.__setattr__(self, "relationships", tuple(self.relationships))
 
     @property
     def name(self) -> str:
         return self._name
 
-    @name.setter
-    def name(self, value: str) -> None:
-        self._name = value
-
 
 def build_priorities(*fields: Any) -> Iterable[OrderingField]:  # noqa: ANN401
     """
@@ -43,3 +49,28 @@ def build_priorities(*fields: Any) -> Iterable[OrderingField]:  # noqa: ANN401
     Pass only `OrderingField`
     """
     return cast("Iterable[OrderingField]", fields)
+
+
+def keyset_after(
+    keys: Sequence[
+        tuple[InstrumentedAttribute[Any] | ColumnElement[Any], OrderingEnum]
+    ],
+    values: Sequence[Any],
+) -> ColumnElement[bool]:
+    """
+    Rows that come after `values` in `keys` order
+
+    Expanded to `a > x OR (a = x AND b > y) ...` so directions can be mixed, keys must not be NULL.
+    """
+    condition: ColumnElement[bool] | None = None
+    for (key, ordering), value in reversed(list(zip(keys, values, strict=True))):
+        after = key > value if ordering is OrderingEnum.asc else key < value
+        condition = (
+            after if condition is None else or_(after, and_(key == value, condition))
+        )
+
+    if condition is None:
+        msg = "keyset_after requires at least one key"
+        raise ValueError(msg)
+
+    return condition
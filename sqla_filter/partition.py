@@ -0,0 +1,396 @@
+import asyncio
+import itertools
+import queue
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Literal, TypeAlias
+
+from sqlalchemy import ColumnElement, Dialect, Engine, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql import coercions, roles
+
+from ._merge import (
+    SortKeySpec,
+    merge_sorted,
+    merge_sorted_async,
+    with_sort_key,
+)
+from .base import BaseSorter
+from .ordering import OrderingField
+
+BoundariesMethod: TypeAlias = Literal["quantiles", "range"]
+
+_PUT_TIMEOUT = 0.1
+
+
+class _Done:
+    pass
+
+
+_DONE = _Done()
+
+
+def compute_boundaries(
+    session: Session,
+    stmt: Select[Any],
+    *,
+    column: InstrumentedAttribute[Any] | ColumnElement[Any],
+    partitions: int,
+    method: BoundariesMethod = "quantiles",
+) -> list[Any]:
+    """
+    Values splitting `column` of the `stmt` rows into `partitions` ranges
+
+    `quantiles` uses `ntile()` and works for any orderable column,
+    `range` splits `[min, max]` evenly and requires a numeric or date/time column.
+    """
+    _validate_partitions(partitions)
+    key: ColumnElement[Any] = coercions.expect(roles.ExpressionElementRole, column)
+    stmt = stmt.order_by(None)
+
+    if method == "range":
+        lower, upper = session.execute(
+            stmt.with_only_columns(
+                func.min(key),
+                func.max(key),
+                maintain_column_froms=True,
+            ),
+        ).one()
+        if lower is None:
+            return []
+
+        return _split_range(lower, upper, partitions=partitions)
+
+    tiles = (
+        stmt.with_only_columns(
+            key.label("key"),
+            func.ntile(partitions).over(order_by=key).label("tile"),
+            maintain_column_froms=True,
+        )
+        .where(key.is_not(None))
+        .subquery()
+    )
+    tiles_stmt = (
+        select(func.min(tiles.c.key))
+        .group_by(tiles.c.tile)
+        .order_by(func.min(tiles.c.key))
+    )
+    return list(session.scalars(tiles_stmt))[1:]
+
+
+def partition_statements(
+    stmt: Select[Any],
+    *,
+    column: InstrumentedAttribute[Any] | ColumnElement[Any],
+    boundaries: Sequence[Any],
+) -> list[Select[Any]]:
+    """Disjoint copies of `stmt` covering every row, rows with NULL `column` included"""
+    if not boundaries:
+        return [stmt]
+
+    statements = [stmt.where(column < boundaries[0])]
+    statements.extend(
+        stmt.where(column >= lower, column < upper)
+        for lower, upper in itertools.pairwise(boundaries)
+    )
+    statements.append(stmt.where(column >= boundaries[-1]))
+    statements.append(stmt.where(column.is_(None)))
+    return statements
+
+
+def iter_partitioned(  # noqa: PLR0913
+    engine: Engine,
+    stmt: Select[Any],
+    *,
+    column: InstrumentedAttribute[Any] | ColumnElement[Any],
+    partitions: int,
+    method: BoundariesMethod = "quantiles",
+    sorter: BaseSorter | None = None,
+    fields_priority: Iterable[OrderingField] | None = None,
+    batch_size: int = 1000,
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Run `stmt` split by `column` on separate connections in a thread pool
+
+    Each partition is streamed in batches of `batch_size` rows.
+    Rows are yielded as partitions produce them,
+    or merged in `sorter` order when it is passed.
+    """
+    with Session(engine) as session:
+        boundaries = compute_boundaries(
+            session,
+            stmt,
+            column=column,
+            partitions=partitions,
+            method=method,
+        )
+
+    statements, specs = _prepare_statements(
+        stmt,
+        column=column,
+        boundaries=boundaries,
+        sorter=sorter,
+        fields_priority=fields_priority,
+        dialect=engine.dialect,
+    )
+    yield from _iter_concurrently(
+        [(engine, statement) for statement in statements],
+        specs=specs if sorter is not None else None,
+        batch_size=batch_size,
+    )
+
+
+async def iter_partitioned_async(  # noqa: PLR0913
+    engine: AsyncEngine,
+    stmt: Select[Any],
+    *,
+    column: InstrumentedAttribute[Any] | ColumnElement[Any],
+    partitions: int,
+    method: BoundariesMethod = "quantiles",
+    sorter: BaseSorter | None = None,
+    fields_priority: Iterable[OrderingField] | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[tuple[Any, ...]]:
+    """Same as `iter_partitioned`, partitions are streamed concurrently on the event loop"""
+    async with AsyncSession(engine) as session:
+        boundaries = await session.run_sync(
+            compute_boundaries,
+            stmt,
+            column=column,
+            partitions=partitions,
+            method=method,
+        )
+
+    statements, specs = _prepare_statements(
+        stmt,
+        column=column,
+        boundaries=boundaries,
+        sorter=sorter,
+        fields_priority=fields_priority,
+        dialect=engine.dialect,
+    )
+    rows = _iter_concurrently_async(
+        [(engine, statement) for statement in statements],
+        specs=specs if sorter is not None else None,
+        batch_size=batch_size,
+    )
+    async for row in rows:
+        yield row
+
+
+def _iter_concurrently(
+    jobs: Sequence[tuple[Engine, Select[Any]]],
+    *,
+    specs: Sequence[SortKeySpec] | None,
+    batch_size: int,
+) -> Iterator[tuple[Any, ...]]:
+    """Run every statement on its engine in a thread pool, merge rows by `specs` if passed"""
+    queues: list[queue.Queue[Any]] = [queue.Queue(maxsize=2) for _ in jobs]
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        for (engine, statement), queue_ in zip(jobs, queues, strict=True):
+            executor.submit(_produce, engine, statement, queue_, stop, batch_size)
+
+        try:
+            if specs is None:
+                yield from (
+                    tuple(row) for batch in _iter_as_produced(queues) for row in batch
+                )
+            else:
+                yield from merge_sorted(
+                    [_iter_queue(queue_) for queue_ in queues],
+                    specs=specs,
+                )
+        finally:
+            stop.set()
+
+
+async def _iter_concurrently_async(
+    jobs: Sequence[tuple[AsyncEngine, Select[Any]]],
+    *,
+    specs: Sequence[SortKeySpec] | None,
+    batch_size: int,
+) -> AsyncIterator[tuple[Any, ...]]:
+    """Same as `_iter_concurrently`, statements are streamed on the event loop"""
+    queues: list[asyncio.Queue[Any]] = [asyncio.Queue(maxsize=2) for _ in jobs]
+    tasks = [
+        asyncio.create_task(_produce_async(engine, statement, queue_, batch_size))
+        for (engine, statement), queue_ in zip(jobs, queues, strict=True)
+    ]
+
+    try:
+        if specs is None:
+            async for batch in _iter_as_produced_async(queues):
+                for row in batch:
+                    yield tuple(row)
+        else:
+            rows = merge_sorted_async(
+                [_iter_queue_async(queue_) for queue_ in queues],
+                specs=specs,
+            )
+            async for row in rows:
+                yield row
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _prepare_statements(  # noqa: PLR0913
+    stmt: Select[Any],
+    *,
+    column: InstrumentedAttribute[Any] | ColumnElement[Any],
+    boundaries: Sequence[Any],
+    sorter: BaseSorter | None,
+    fields_priority: Iterable[OrderingField] | None,
+    dialect: Dialect,
+) -> tuple[list[Select[Any]], tuple[SortKeySpec, ...]]:
+    specs: tuple[SortKeySpec, ...] = ()
+    if sorter is not None:
+        sorted_stmt = with_sort_key(
+            stmt,
+            sorter=sorter,
+            fields_priority=fields_priority,
+            dialect=dialect,
+        )
+        stmt, specs = sorted_stmt.stmt, sorted_stmt.specs
+
+    statements = partition_statements(stmt, column=column, boundaries=boundaries)
+    return statements, specs
+
+
+def _validate_partitions(partitions: int) -> None:
+    if partitions < 1:
+        msg = f"partitions must be positive, got {partitions}"
+        raise ValueError(msg)
+
+
+def _split_range(lower: Any, upper: Any, *, partitions: int) -> list[Any]:  # noqa: ANN401
+    if isinstance(lower, int):
+        boundaries = [
+            lower + (upper - lower) * index // partitions
+            for index in range(1, partitions)
+        ]
+    else:
+        boundaries = [
+            lower + (upper - lower) * index / partitions
+            for index in range(1, partitions)
+        ]
+
+    return sorted(set(boundaries) - {lower})
+
+
+def _produce(
+    engine: Engine,
+    stmt: Select[Any],
+    queue_: "queue.Queue[Any]",
+    stop: threading.Event,
+    batch_size: int,
+) -> None:
+    item: Any = _DONE
+    try:
+        with Session(engine) as session:
+            result = session.execute(
+                stmt,
+                execution_options={"yield_per": batch_size},
+            )
+            for batch in result.partitions():
+                if not _put(queue_, batch, stop):
+                    return
+    except Exception as exc:  # noqa: BLE001
+        item = exc
+
+    _put(queue_, item, stop)
+
+
+def _put(queue_: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:  # noqa: ANN401
+    while not stop.is_set():
+        try:
+            queue_.put(item, timeout=_PUT_TIMEOUT)
+        except queue.Full:
+            continue
+        return True
+
+    return False
+
+
+def _iter_queue(queue_: "queue.Queue[Any]") -> Iterator[Any]:
+    while (item := queue_.get()) is not _DONE:
+        if isinstance(item, Exception):
+            raise item
+
+        yield from item
+
+
+def _iter_as_produced(queues: Sequence["queue.Queue[Any]"]) -> Iterator[Sequence[Any]]:
+    """Batches from all queues, polling them in turn"""
+    pending = list(queues)
+    while pending:
+        for queue_ in list(pending):
+            try:
+                item = queue_.get(timeout=_PUT_TIMEOUT / len(pending))
+            except queue.Empty:
+                continue
+
+            if item is _DONE:
+                pending.remove(queue_)
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+
+
+async def _produce_async(
+    engine: AsyncEngine,
+    stmt: Select[Any],
+    queue_: "asyncio.Queue[Any]",
+    batch_size: int,
+) -> None:
+    item: Any = _DONE
+    try:
+        async with AsyncSession(engine) as session:
+            result = await session.stream(
+                stmt,
+                execution_options={"yield_per": batch_size},
+            )
+            async for batch in result.partitions():
+                await queue_.put(batch)
+    except Exception as exc:  # noqa: BLE001
+        item = exc
+
+    await queue_.put(item)
+
+
+async def _iter_queue_async(queue_: "asyncio.Queue[Any]") -> AsyncIterator[Any]:
+    while (item := await queue_.get()) is not _DONE:
+        if isinstance(item, Exception):
+            raise item
+
+        for row in item:
+            yield row
+
+
+async def _iter_as_produced_async(
+    queues: Sequence["asyncio.Queue[Any]"],
+) -> AsyncIterator[Sequence[Any]]:
+    getters = {asyncio.ensure_future(queue_.get()): queue_ for queue_ in queues}
+    try:
+        while getters:
+            done, _ = await asyncio.wait(getters, return_when=asyncio.FIRST_COMPLETED)
+            for getter in done:
+                queue_ = getters.pop(getter)
+                item = getter.result()
+                if item is _DONE:
+                    continue
+
+                if isinstance(item, Exception):
+                    raise item
+
+                getters[asyncio.ensure_future(queue_.get())] = queue_
+                yield item
+    finally:
+        for getter in getters:
+            getter.cancel()
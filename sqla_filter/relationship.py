@@ -1,7 +1,7 @@
 import dataclasses
 from typing import Any, TypeAlias
 
-from sqlalchemy import ColumnExpressionArgument
+from sqlalchemy import ColumnExpressionArgument, FromClause
 from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.sql.roles import OnClauseRole
 
@@ -10,8 +10,12 @@ _OnClauseArgument: TypeAlias = ColumnExpressionArgument[Any] | OnClauseRole
 
 @dataclasses.dataclass(frozen=True, slots=True)
 class RelationshipInfo:
-    field: InstrumentedAttribute[Any]
+    field: InstrumentedAttribute[Any] | FromClause
+    """ORM relationship attribute or Core table to join, `onclause` is inferred from foreign keys if omitted"""
+
     _: dataclasses.KW_ONLY
     onclause: _OnClauseArgument | None = None
     isouter: bool = False
     full: bool = False
+    contains_eager: bool = False
+    """Populate the relationship from this join instead of a separate loader query"""
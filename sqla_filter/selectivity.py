@@ -0,0 +1,170 @@
+import dataclasses
+import math
+import threading
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any, cast
+
+from .filter_ import FilterField, ManualFilter
+from .unset import Unset
+
+if TYPE_CHECKING:
+    from .base import BaseFilter
+
+_Field = FilterField | ManualFilter[Any, Any]
+
+
+class SelectivityStats:
+    """
+    Selectivity of filter fields learned from observed result counts
+
+    Each query of a filter is attributed evenly to its active fields,
+    an estimate is used once a field has been observed `min_observations` times.
+    """
+
+    def __init__(self, *, smoothing: float = 0.2, min_observations: int = 3) -> None:
+        if not 0 < smoothing <= 1:
+            msg = "smoothing must be in (0, 1]"
+            raise ValueError(msg)
+
+        self.smoothing = smoothing
+        self.min_observations = min_observations
+        self._estimates: dict[tuple[type[Any], str], tuple[int, float]] = {}
+        """Observations and moving average of the log selectivity by filter class and field"""
+
+        self._lock = threading.Lock()
+
+    def observe(self, filter_: "BaseFilter", *, rows: int, total: int) -> None:
+        """Learn from a query of `filter_` matching `rows` of `total` rows, filters with an `or_` filter are skipped"""
+        if total <= 0 or getattr(filter_, "or_", None) is not None:
+            return
+
+        names = [name for name, _ in _active_fields(filter_)]
+        if not names:
+            return
+
+        # An empty result still has a non-zero selectivity
+        fraction = min(max(rows, 0.5) / total, 1.0)
+        share = math.log(fraction) / len(names)
+        with self._lock:
+            for name in names:
+                key = (type(filter_), name)
+                count, average = self._estimates.get(key, (0, share))
+                average += self.smoothing * (share - average)
+                self._estimates[key] = (count + 1, average)
+
+    def estimate(self, filter_cls: type["BaseFilter"], field_name: str) -> float | None:
+        """Learned fraction of rows matched by `field_name`, `None` until observed enough"""
+        with self._lock:
+            count, average = self._estimates.get((filter_cls, field_name), (0, 0.0))
+
+        return math.exp(average) if count >= self.min_observations else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._estimates.clear()
+
+
+def field_selectivity(
+    filter_: "BaseFilter",
+    field_name: str,
+    field: _Field,
+) -> float | None:
+    """Learned estimate of the field, or its `FilterField.selectivity` hint"""
+    stats = filter_.__sqla_filter_selectivity__
+    if stats is not None:
+        estimate = stats.estimate(type(filter_), field_name)
+        if estimate is not None:
+            return estimate
+
+    return field.selectivity if isinstance(field, FilterField) else None
+
+
+def ordered_fields(filter_: "BaseFilter") -> list[tuple[str, _Field]]:
+    """Active fields of `filter_`, most selective first, unknown ones last in declaration order"""
+    return sorted(
+        _active_fields(filter_),
+        key=lambda item: _or_one(field_selectivity(filter_, *item)),
+    )
+
+
+def branch_selectivity(filter_: "BaseFilter") -> float | None:
+    """Fraction of rows matched by the fields of `filter_` without its `or_` filter"""
+    selectivities = [
+        field_selectivity(filter_, name, field)
+        for name, field in _active_fields(filter_)
+    ]
+    if all(selectivity is None for selectivity in selectivities):
+        return None
+
+    return math.prod(_or_one(selectivity) for selectivity in selectivities)
+
+
+def filter_selectivity(filter_: "BaseFilter") -> float | None:
+    """Fraction of rows matched by `filter_` and its `or_` filters, assuming independent fields"""
+    selectivities = [branch_selectivity(branch) for branch in _chain(filter_)]
+    if all(selectivity is None for selectivity in selectivities):
+        return None
+
+    return any_selectivity(_or_one(selectivity) for selectivity in selectivities)
+
+
+def any_selectivity(selectivities: Iterable[float]) -> float:
+    """Fraction of rows matched by any of independent conditions"""
+    return 1 - math.prod(1 - selectivity for selectivity in selectivities)
+
+
+def order_or_chain(
+    filter_: "BaseFilter",
+    prefetched: Mapping[tuple[int, str], Any],
+) -> tuple["BaseFilter", Mapping[tuple[int, str], Any]]:
+    """
+    `filter_` with its `or_` chain reordered, the branch most likely to match first
+
+    `OR` stops at the first matching branch like `AND` stops at the first false condition.
+    Prefetched `AsyncManualFilter` results are moved to the reordered copies.
+    Chains with a branch without active fields are kept as is.
+    """
+    chain = _chain(filter_)
+    if len(chain) == 1 or not all(_active_fields(branch) for branch in chain):
+        return filter_, prefetched
+
+    ordered = sorted(
+        chain,
+        key=lambda branch: -_or_one(branch_selectivity(branch)),
+    )
+    if all(branch is other for branch, other in zip(chain, ordered, strict=True)):
+        return filter_, prefetched
+
+    head: BaseFilter | None = None
+    moved = dict(prefetched)
+    for branch in reversed(ordered):
+        copy = dataclasses.replace(branch, or_=head)  # type:ignore[type-var]
+        for name, _ in _active_fields(branch):
+            if (id(branch), name) in prefetched:
+                moved[id(copy), name] = prefetched[id(branch), name]
+
+        head = copy
+
+    return cast("BaseFilter", head), moved
+
+
+def _active_fields(filter_: "BaseFilter") -> list[tuple[str, _Field]]:
+    return [
+        (name, field)
+        for name, field in filter_.__sqla_filter_fields__.items()
+        if getattr(filter_, name) is not Unset.v
+    ]
+
+
+def _chain(filter_: "BaseFilter") -> list["BaseFilter"]:
+    chain = []
+    current: BaseFilter | None = filter_
+    while current is not None:
+        chain.append(current)
+        current = getattr(current, "or_", None)
+
+    return chain
+
+
+def _or_one(selectivity: float | None) -> float:
+    return 1.0 if selectivity is None else selectivity
@@ -0,0 +1,124 @@
+import itertools
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from typing import Any
+
+from sqlalchemy import Dialect, Engine, Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ._merge import SortKeySpec, with_sort_key
+from .base import BaseFilter, BaseSorter
+from .ordering import OrderingField
+from .partition import _iter_concurrently, _iter_concurrently_async
+
+
+def iter_sharded(  # noqa: PLR0913
+    engines: Sequence[Engine],
+    stmt: Select[Any],
+    *,
+    sorter: BaseSorter,
+    filter_: BaseFilter | None = None,
+    fields_priority: Iterable[OrderingField] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+    batch_size: int = 1000,
+) -> Iterator[tuple[Any, ...]]:
+    """
+    Run `stmt` filtered and sorted on every shard engine in a thread pool, merged in `sorter` order
+
+    Each shard returns at most `offset + limit` rows, `offset` and `limit` are applied to the merged rows.
+    """
+    shard_stmt, specs = _prepare_statement(
+        stmt,
+        sorter=sorter,
+        filter_=filter_,
+        fields_priority=fields_priority,
+        offset=offset,
+        limit=limit,
+        dialect=_dialect(engines),
+    )
+    rows = _iter_concurrently(
+        [(engine, shard_stmt) for engine in engines],
+        specs=specs,
+        batch_size=batch_size,
+    )
+    yield from itertools.islice(
+        rows,
+        offset,
+        offset + limit if limit is not None else None,
+    )
+
+
+async def iter_sharded_async(  # noqa: PLR0913
+    engines: Sequence[AsyncEngine],
+    stmt: Select[Any],
+    *,
+    sorter: BaseSorter,
+    filter_: BaseFilter | None = None,
+    fields_priority: Iterable[OrderingField] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[tuple[Any, ...]]:
+    """Same as `iter_sharded`, shards are streamed concurrently on the event loop"""
+    shard_stmt, specs = _prepare_statement(
+        stmt,
+        sorter=sorter,
+        filter_=filter_,
+        fields_priority=fields_priority,
+        offset=offset,
+        limit=limit,
+        dialect=_dialect(engines),
+    )
+    rows = _iter_concurrently_async(
+        [(engine, shard_stmt) for engine in engines],
+        specs=specs,
+        batch_size=batch_size,
+    )
+    stop = offset + limit if limit is not None else None
+    index = 0
+    async for row in rows:
+        if stop is not None and index >= stop:
+            break
+
+        if index >= offset:
+            yield row
+
+        index += 1
+
+
+def _prepare_statement(  # noqa: PLR0913
+    stmt: Select[Any],
+    *,
+    sorter: BaseSorter,
+    filter_: BaseFilter | None,
+    fields_priority: Iterable[OrderingField] | None,
+    offset: int,
+    limit: int | None,
+    dialect: Dialect,
+) -> tuple[Select[Any], tuple[SortKeySpec, ...]]:
+    if offset < 0 or (limit is not None and limit < 0):
+        msg = f"offset and limit must not be negative, got {offset} and {limit}"
+        raise ValueError(msg)
+
+    if filter_ is not None:
+        stmt = filter_.apply(stmt)
+
+    sorted_stmt = with_sort_key(
+        stmt,
+        sorter=sorter,
+        fields_priority=fields_priority,
+        dialect=dialect,
+    )
+    shard_stmt = sorted_stmt.stmt
+    if limit is not None:
+        shard_stmt = shard_stmt.limit(offset + limit)
+
+    return shard_stmt, sorted_stmt.specs
+
+
+def _dialect(engines: Sequence[Engine | AsyncEngine]) -> Dialect:
+    if not engines:
+        msg = "At least one shard engine is required"
+        raise ValueError(msg)
+
+    return engines[0].dialect
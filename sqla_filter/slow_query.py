@@ -0,0 +1,222 @@
+import collections
+import dataclasses
+import random
+import time
+import weakref
+from collections.abc import Collection, Mapping, Sequence
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Connection, Engine, ExecutionContext, Select, event
+from sqlalchemy.engine.interfaces import DBAPICursor
+
+from .ordering import OrderingEnum, OrderingField
+from .types_ import SelectClause
+from .unset import Unset
+
+if TYPE_CHECKING:
+    from .base import BaseFilter, BaseSorter
+
+SIGNATURE_OPTION = "sqla_filter_signatures"
+"""Execution option with the signatures of the filters and sorters applied to a statement"""
+
+_EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN",
+    "mysql": "EXPLAIN",
+    "mariadb": "EXPLAIN",
+    "sqlite": "EXPLAIN QUERY PLAN",
+}
+_EXPLAIN_SAVEPOINT = "sqla_filter_explain"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SlowQuery:
+    signatures: tuple[str, ...]
+    """e.g. `BookFilter(author_alias,created_at_from)`, `BookSorter(created_at:desc)`"""
+
+    statement: str
+    duration_ms: float
+    parameter_shapes: Any
+    """Type and length of bound values, values themselves aren't recorded"""
+
+    plan: tuple[tuple[Any, ...], ...] | None
+    """Rows of the dialect's `EXPLAIN`, `None` if unsupported or disabled"""
+
+    recorded_at: datetime
+
+
+class SlowQueryLog:
+    """
+    Records slow executions of statements built by `BaseFilter.apply`/`BaseSorter.apply`
+
+    Executions above `threshold_ms` are sampled with `sample_rate`,
+    the last `capacity` records are kept in memory.
+    """
+
+    def __init__(
+        self,
+        *,
+        threshold_ms: float,
+        sample_rate: float = 1.0,
+        capacity: int = 100,
+        explain: bool = True,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self._queries: collections.deque[SlowQuery] = collections.deque(maxlen=capacity)
+        self._started: weakref.WeakKeyDictionary[ExecutionContext, float] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def install(self, engine: Engine) -> None:
+        """Start timing executions of `engine`, pass `AsyncEngine.sync_engine` for async engines"""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def remove(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def export(self) -> list[SlowQuery]:
+        """Recorded queries, oldest first"""
+        return list(self._queries)
+
+    def clear(self) -> None:
+        self._queries.clear()
+
+    def _before_cursor_execute(  # noqa: PLR0913
+        self,
+        conn: Connection,  # noqa: ARG002
+        cursor: DBAPICursor,  # noqa: ARG002
+        statement: str,  # noqa: ARG002
+        parameters: Any,  # noqa: ANN401, ARG002
+        context: ExecutionContext | None,
+        executemany: bool,  # noqa: FBT001
+    ) -> None:
+        if context is not None and not executemany and _signatures(context):
+            self._started[context] = time.perf_counter()
+
+    def _after_cursor_execute(  # noqa: PLR0913
+        self,
+        conn: Connection,
+        cursor: DBAPICursor,  # noqa: ARG002
+        statement: str,
+        parameters: Any,  # noqa: ANN401
+        context: ExecutionContext | None,
+        executemany: bool,  # noqa: ARG002, FBT001
+    ) -> None:
+        if context is None or (started := self._started.pop(context, None)) is None:
+            return
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        if random.random() >= self.sample_rate:  # noqa: S311
+            return
+
+        plan = _explain(conn, statement, parameters) if self.explain else None
+        self._queries.append(
+            SlowQuery(
+                signatures=_signatures(context),
+                statement=statement,
+                duration_ms=duration_ms,
+                parameter_shapes=_parameter_shapes(parameters),
+                plan=plan,
+                recorded_at=datetime.now(tz=UTC),
+            ),
+        )
+
+
+def filter_signature(filter_: "BaseFilter") -> str:
+    """Class name and active field names of `filter_` and its `or_` filters"""
+    active = [
+        field_name
+        for field_name in filter_.__sqla_filter_fields__
+        if getattr(filter_, field_name) is not Unset.v
+    ]
+    signature = f"{type(filter_).__name__}({','.join(active)})"
+    if (or_filter := getattr(filter_, "or_", None)) is not None:
+        signature = f"{signature} | {filter_signature(or_filter)}"
+
+    return signature
+
+
+def sorter_signature(
+    sorter: "BaseSorter",
+    active_fields: Sequence[tuple[OrderingField, OrderingEnum]],
+) -> str:
+    active = [f"{field.name}:{value}" for field, value in active_fields]
+    return f"{type(sorter).__name__}({','.join(active)})"
+
+
+def with_signature(stmt: Select[SelectClause], signature: str) -> Select[SelectClause]:
+    signatures = stmt.get_execution_options().get(SIGNATURE_OPTION, ())
+    return stmt.execution_options(**{SIGNATURE_OPTION: (*signatures, signature)})
+
+
+def _signatures(context: ExecutionContext) -> tuple[str, ...]:
+    return context.execution_options.get(SIGNATURE_OPTION, ())  # type:ignore[no-any-return]
+
+
+def _explain(
+    conn: Connection,
+    statement: str,
+    parameters: Any,  # noqa: ANN401
+) -> tuple[tuple[Any, ...], ...] | None:
+    """Plan of `statement`, `None` if unsupported or if `EXPLAIN` fails"""
+    prefix = _EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None:
+        return None
+
+    cursor = conn.connection.cursor()
+    try:
+        return _run_explain(
+            cursor,
+            f"{prefix} {statement}",
+            parameters,
+            # A failed statement aborts the whole transaction on PostgreSQL
+            savepoint=conn.dialect.name == "postgresql",
+        )
+    except Exception:  # noqa: BLE001
+        return None
+    finally:
+        cursor.close()
+
+
+def _run_explain(
+    cursor: DBAPICursor,
+    explain: str,
+    parameters: Any,  # noqa: ANN401
+    *,
+    savepoint: bool,
+) -> tuple[tuple[Any, ...], ...]:
+    if not savepoint:
+        cursor.execute(explain, parameters)
+        return tuple(tuple(row) for row in cursor.fetchall())
+
+    cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+    try:
+        cursor.execute(explain, parameters)
+        plan = tuple(tuple(row) for row in cursor.fetchall())
+    except Exception:
+        cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+        raise
+
+    cursor.execute(f"RELEASE SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+    return plan
+
+
+def _parameter_shapes(parameters: Any) -> Any:  # noqa: ANN401
+    if isinstance(parameters, Mapping):
+        return {name: _shape(value) for name, value in parameters.items()}
+
+    return [_shape(value) for value in parameters]
+
+
+def _shape(value: Any) -> str:  # noqa: ANN401
+    if isinstance(value, str | bytes | Collection):
+        return f"{type(value).__name__}[{len(value)}]"
+
+    return type(value).__name__
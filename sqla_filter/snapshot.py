@@ -0,0 +1,156 @@
+import collections
+import dataclasses
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, and_, case, false, tuple_
+from sqlalchemy.orm import Session
+
+from ._columns import statement_primary_key
+from .base import BaseFilter, BaseSorter
+from .ordering import OrderingField
+from .types_ import SelectClause
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Snapshot:
+    ids: tuple[tuple[Any, ...], ...]
+    complete: bool
+    """False if the result had more than `max_ids` rows"""
+
+    expires_at: float
+
+
+class ResultSnapshots:
+    """
+    Primary keys of filtered and sorted results kept in memory for `ttl` seconds
+
+    The first `paginate` call of a filter, sorter and statement runs the expensive query once
+    for up to `max_ids` primary keys, later pages select rows by these keys.
+    At most `max_snapshots` results are kept, least recently used are evicted first.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_ids: int = 10_000,
+        max_snapshots: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_ids = max_ids
+        self.max_snapshots = max_snapshots
+        self._clock = clock
+        self._snapshots: collections.OrderedDict[Hashable, _Snapshot] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def paginate(  # noqa: PLR0913
+        self,
+        session: Session,
+        stmt: Select[SelectClause],
+        *,
+        filter_: BaseFilter,
+        sorter: BaseSorter | None = None,
+        fields_priority: Iterable[OrderingField] | None = None,
+        offset: int,
+        limit: int,
+    ) -> Select[SelectClause]:
+        """
+        Statement for rows `offset` to `offset + limit` of `stmt` filtered and sorted
+
+        Use `await session.run_sync(snapshots.paginate, stmt, ...)` with `AsyncSession`.
+        """
+        sorted_stmt = filter_.apply(stmt)
+        if sorter is not None:
+            sorted_stmt = sorter.apply(sorted_stmt, fields_priority)
+
+        primary_key = statement_primary_key(stmt)
+        ids_stmt = sorted_stmt.with_only_columns(
+            *primary_key,
+            maintain_column_froms=True,
+        ).limit(self.max_ids + 1)
+        key = _fingerprint(ids_stmt)
+        snapshot = self._get(key) if key is not None else None
+        if snapshot is None:
+            snapshot = self._evaluate(session, ids_stmt)
+            if key is not None:
+                self._put(key, snapshot)
+
+        if not snapshot.complete and offset + limit > len(snapshot.ids):
+            return sorted_stmt.offset(offset).limit(limit)
+
+        return _select_ids(stmt, primary_key, snapshot.ids[offset : offset + limit])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def _evaluate(self, session: Session, ids_stmt: Select[Any]) -> _Snapshot:
+        rows = session.execute(ids_stmt).all()
+        ids = tuple(dict.fromkeys(tuple(row) for row in rows[: self.max_ids]))
+        return _Snapshot(
+            ids=ids,
+            complete=len(rows) <= self.max_ids,
+            expires_at=self._clock() + self.ttl,
+        )
+
+    def _get(self, key: Hashable) -> _Snapshot | None:
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is None:
+                return None
+
+            if snapshot.expires_at <= self._clock():
+                del self._snapshots[key]
+                return None
+
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+    def _put(self, key: Hashable, snapshot: _Snapshot) -> None:
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+
+
+def _fingerprint(stmt: Select[Any]) -> Hashable | None:
+    """Statement structure and bound values, `None` if the statement can't be cached"""
+    cache_key = stmt._generate_cache_key()  # noqa: SLF001
+    if cache_key is None:
+        return None
+
+    values = repr([bind.effective_value for bind in cache_key.bindparams])
+    return cache_key.key, values
+
+
+def _select_ids(
+    stmt: Select[SelectClause],
+    primary_key: Sequence[Any],
+    ids: Sequence[tuple[Any, ...]],
+) -> Select[SelectClause]:
+    if not ids:
+        return stmt.where(false())
+
+    if len(primary_key) == 1:
+        (column,) = primary_key
+        condition = column.in_([ident for (ident,) in ids])
+    else:
+        condition = tuple_(*primary_key).in_(ids)
+
+    position = case(
+        *((_matches(primary_key, ident), index) for index, ident in enumerate(ids)),
+    )
+    return stmt.where(condition).order_by(None).order_by(position)
+
+
+def _matches(primary_key: Sequence[Any], ident: tuple[Any, ...]) -> ColumnElement[bool]:
+    return and_(
+        *(column == value for column, value in zip(primary_key, ident, strict=True)),
+    )
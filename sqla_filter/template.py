@@ -0,0 +1,378 @@
+import collections
+import dataclasses
+import datetime
+import decimal
+import enum
+import threading
+import uuid
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from collections.abc import Set as AbstractSet
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Dialect, Select, bindparam
+from sqlalchemy.sql.compiler import SQLCompiler
+
+from .filter_ import FilterField, ManualFilter
+from .ordering import OrderingField
+from .unset import Unset
+
+if TYPE_CHECKING:
+    from .base import BaseFilter, BaseSorter
+
+_PLACEHOLDER = "sqla_filter_{}_{}"
+_SCALARS = (
+    str,
+    bytes,
+    int,
+    float,
+    bool,
+    decimal.Decimal,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    uuid.UUID,
+    enum.Enum,
+)
+_MAX_TEMPLATES = 1024
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Source:
+    depth: int
+    """Position of the filter in the `or_` chain"""
+
+    field_name: str
+    index: int | None
+    """Item of a sequence value"""
+
+    processor: Callable[[Any], Any] | None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SqlTemplate:
+    """
+    SQL of a statement compiled for filters with the same active fields and value shapes
+
+    Execute `sql` with `bind(filter_)` through the DB-API or async driver connection,
+    e.g. as a server-side prepared statement.
+    """
+
+    sql: str
+    """Statement in the positional paramstyle of the dialect"""
+
+    parameters: tuple[str, ...]
+    """Names of the positional parameters"""
+
+    _shape: Hashable = dataclasses.field(repr=False)
+    _sources: tuple[_Source | Any, ...] = dataclasses.field(repr=False)
+    """Where each parameter value comes from, processed values of constant parameters"""
+
+    def bind(self, filter_: "BaseFilter | None" = None) -> list[Any]:
+        """Values of `filter_` as positional parameters, processed for the driver"""
+        if _filter_shape(filter_) != self._shape:
+            msg = "Set fields or value shapes of the filter don't match the template"
+            raise ValueError(msg)
+
+        chain = _chain(filter_)
+        values: dict[tuple[int, str], list[Any]] = {}
+        parameters = []
+        for source in self._sources:
+            if not isinstance(source, _Source):
+                parameters.append(source)
+                continue
+
+            value = getattr(chain[source.depth], source.field_name)
+            if source.index is not None:
+                key = (source.depth, source.field_name)
+                if key not in values:
+                    values[key] = list(value)
+                value = values[key][source.index]
+
+            parameters.append(
+                value if source.processor is None else source.processor(value)
+            )
+
+        return parameters
+
+
+class _Templates:
+    def __init__(self) -> None:
+        self._templates: collections.OrderedDict[Hashable, SqlTemplate] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> SqlTemplate | None:
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+
+            return template
+
+    def put(self, key: Hashable, template: SqlTemplate) -> None:
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > _MAX_TEMPLATES:
+                self._templates.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+
+_templates = _Templates()
+
+
+def compile_template(
+    stmt: Select[Any],
+    *,
+    dialect: Dialect,
+    filter_: "BaseFilter | None" = None,
+    sorter: "BaseSorter | None" = None,
+    fields_priority: Iterable[OrderingField] | None = None,
+) -> SqlTemplate:
+    """
+    `stmt` filtered and sorted, compiled once per statement, active fields, value shapes and dialect
+
+    Statements are cached by their SQLAlchemy cache key and bound values,
+    so an equal statement built on every call reuses the template.
+    Scalar values are bound as one parameter, sequences as one parameter per item
+    and `None` is part of the SQL, so a template is compiled per sequence length and `None` value.
+    `ManualFilter`s and operators that need the value itself to build the SQL raise `TypeError`.
+    """
+    active_fields = (
+        sorter.get_active_fields(fields_priority) if sorter is not None else []
+    )
+    shape = _filter_shape(filter_)
+    key = _cache_key(
+        stmt,
+        (
+            dialect.name,
+            dialect.driver,
+            dialect.paramstyle,
+            shape,
+            type(sorter),
+            tuple((field.name, value) for field, value in active_fields),
+        ),
+    )
+    template = None if key is None else _templates.get(key)
+    if template is None:
+        template = _compile(
+            stmt,
+            dialect=dialect,
+            filter_=filter_,
+            sorter=sorter,
+            active_fields=[field for field, _ in active_fields],
+            shape=shape,
+        )
+        if key is not None:
+            _templates.put(key, template)
+
+    return template
+
+
+def _cache_key(stmt: Select[Any], parts: tuple[Any, ...]) -> Hashable | None:
+    """Structure and bound values of `stmt` with `parts`, `None` if `stmt` can't be cached"""
+    cache_key = stmt._generate_cache_key()  # noqa: SLF001
+    if cache_key is None:
+        return None
+
+    # Constant values are compiled into the template, so they're part of the key
+    key = (
+        cache_key.key,
+        tuple(_hashable(bind.effective_value) for bind in cache_key.bindparams),
+        parts,
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def _hashable(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, list | tuple):
+        return tuple(_hashable(item) for item in value)
+
+    if isinstance(value, set):
+        return frozenset(value)
+
+    return value
+
+
+def clear_templates() -> None:
+    _templates.clear()
+
+
+def _compile(  # noqa: PLR0913
+    stmt: Select[Any],
+    *,
+    dialect: Dialect,
+    filter_: "BaseFilter | None",
+    sorter: "BaseSorter | None",
+    active_fields: Sequence[OrderingField],
+    shape: Hashable,
+) -> SqlTemplate:
+    placeholders: dict[str, tuple[int, str, int | None]] = {}
+    if filter_ is not None:
+        stmt = _placeholder_filter(filter_, depth=0, placeholders=placeholders).apply(
+            stmt
+        )
+
+    if sorter is not None:
+        stmt = sorter.apply(stmt, active_fields)
+
+    compiled = stmt.compile(
+        dialect=dialect, compile_kwargs={"render_postcompile": True}
+    )
+    if not compiled.positional or compiled.positiontup is None:
+        msg = f"Templates require a positional paramstyle, {dialect.name} uses {dialect.paramstyle!r}"
+        raise ValueError(msg)
+
+    missing = placeholders.keys() - set(compiled.positiontup)
+    if missing:
+        msg = f"Operators of {sorted(missing)} render their value into the SQL"
+        raise TypeError(msg)
+
+    return SqlTemplate(
+        sql=compiled.string,
+        parameters=tuple(compiled.positiontup),
+        _shape=shape,
+        _sources=_sources(compiled, dialect=dialect, placeholders=placeholders),
+    )
+
+
+def _sources(
+    compiled: SQLCompiler,
+    *,
+    dialect: Dialect,
+    placeholders: dict[str, tuple[int, str, int | None]],
+) -> tuple[_Source | Any, ...]:
+    # Constants of the statement such as an `IN` list are expanded into one parameter per item
+    expanded_state = compiled._post_compile_expanded_state  # noqa: SLF001
+    expanded = {
+        item: name
+        for name, items in (
+            expanded_state.parameter_expansion if expanded_state is not None else {}
+        ).items()
+        for item in items
+    }
+    values = compiled.construct_params()
+    sources: list[_Source | Any] = []
+    for name in compiled.positiontup or ():
+        bind = compiled.binds[expanded.get(name, name)]
+        processor = bind.type.dialect_impl(dialect).bind_processor(dialect)
+        if name in placeholders:
+            depth, field_name, index = placeholders[name]
+            sources.append(_Source(depth, field_name, index, processor))
+        else:
+            value = values[name]
+            sources.append(value if processor is None else processor(value))
+
+    return tuple(sources)
+
+
+def _placeholder_filter(
+    filter_: "BaseFilter",
+    *,
+    depth: int,
+    placeholders: dict[str, tuple[int, str, int | None]],
+) -> "BaseFilter":
+    """Copy of `filter_` with bind parameters instead of the values of its active fields"""
+    changes: dict[str, Any] = {}
+    for field_name, field in filter_.__sqla_filter_fields__.items():
+        value = getattr(filter_, field_name)
+        if value is Unset.v:
+            continue
+
+        if isinstance(field, ManualFilter):
+            msg = f"{type(filter_).__name__}.{field_name} is a ManualFilter, it can't be bound into a template"
+            raise TypeError(msg)
+
+        changes[field_name] = _placeholder(
+            field,
+            value,
+            key=_PLACEHOLDER.format(depth, field_name),
+            placeholders=placeholders,
+            source=(depth, field_name),
+        )
+
+    if (or_filter := getattr(filter_, "or_", None)) is not None:
+        changes["or_"] = _placeholder_filter(
+            or_filter,
+            depth=depth + 1,
+            placeholders=placeholders,
+        )
+
+    return dataclasses.replace(filter_, **changes)  # type:ignore[type-var]
+
+
+def _placeholder(
+    field: FilterField,
+    value: Any,  # noqa: ANN401
+    *,
+    key: str,
+    placeholders: dict[str, tuple[int, str, int | None]],
+    source: tuple[int, str],
+) -> Any:  # noqa: ANN401
+    if value is None:
+        return None
+
+    type_ = field.field.type
+    if isinstance(value, _SCALARS):
+        placeholders[key] = (*source, None)
+        placeholder: Any = bindparam(key, type_=type_, required=False)
+    else:
+        placeholder = []
+        for index in range(len(value)):
+            placeholders[f"{key}_{index}"] = (*source, index)
+            placeholder.append(bindparam(f"{key}_{index}", type_=type_, required=False))
+
+    try:
+        field.operator(field.field, placeholder)
+    except Exception as e:
+        msg = f"Operator of {field.name} needs the value itself to build the SQL, it can't be bound into a template"
+        raise TypeError(msg) from e
+
+    return placeholder
+
+
+def _filter_shape(filter_: "BaseFilter | None") -> Hashable:
+    """Filter classes, active fields and value shapes of the `or_` chain"""
+    return tuple(
+        (
+            type(current),
+            tuple(
+                (field_name, _value_shape(getattr(current, field_name)))
+                for field_name in current.__sqla_filter_fields__
+                if getattr(current, field_name) is not Unset.v
+            ),
+        )
+        for current in _chain(filter_)
+    )
+
+
+def _value_shape(value: Any) -> Hashable:  # noqa: ANN401
+    if value is None:
+        return None
+
+    if isinstance(value, _SCALARS):
+        return "scalar"
+
+    if isinstance(value, Sequence | AbstractSet):
+        return len(value)
+
+    msg = f"Values of type {type(value).__name__} can't be bound into a template"
+    raise TypeError(msg)
+
+
+def _chain(filter_: "BaseFilter | None") -> list["BaseFilter"]:
+    chain = []
+    while filter_ is not None:
+        chain.append(filter_)
+        filter_ = getattr(filter_, "or_", None)
+
+    return chain
@@ -0,0 +1,145 @@
+import dataclasses
+import difflib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Alias, BooleanClauseList, FromClause, Join, Select
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.cache_key import CacheKey
+
+if TYPE_CHECKING:
+    from .base import BaseFilter, BaseSorter
+
+UPDATE_SNAPSHOTS_ENV = "SQLA_FILTER_UPDATE_SNAPSHOTS"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SqlShape:
+    """Structure of a statement, for asserting filters don't add joins or change predicates"""
+
+    joins: tuple[str, ...]
+    """e.g. `JOIN author`, `LEFT OUTER JOIN user`, in statement order"""
+
+    predicates: tuple[str, ...]
+    """`WHERE` conditions joined by `AND`"""
+
+    order_by: tuple[str, ...]
+    distinct: bool
+    subqueries: int
+    cache_key: CacheKey | None = dataclasses.field(compare=False)
+    """Equal for statements that differ in bound values only, `None` if not cacheable"""
+
+    @property
+    def join_count(self) -> int:
+        return len(self.joins)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable shape, the cache key is reduced to whether there is one"""
+        return {
+            "joins": list(self.joins),
+            "predicates": list(self.predicates),
+            "order_by": list(self.order_by),
+            "distinct": self.distinct,
+            "subqueries": self.subqueries,
+            "cacheable": self.cache_key is not None,
+        }
+
+
+def sql_shape(
+    stmt: Select[Any],
+    *applied: "BaseFilter | BaseSorter",
+) -> SqlShape:
+    """Shape of `stmt` after applying `applied` filters and sorters in order"""
+    for owner in applied:
+        stmt = owner.apply(stmt)
+
+    return SqlShape(
+        joins=tuple(
+            join for from_ in stmt.get_final_froms() for join in _iter_joins(from_)
+        ),
+        predicates=tuple(_iter_predicates(stmt)),
+        order_by=tuple(str(clause) for clause in stmt._order_by_clauses),  # noqa: SLF001
+        distinct=stmt._distinct,  # noqa: SLF001
+        subqueries=sum(
+            isinstance(element, Select) and element is not stmt
+            for element in visitors.iterate(stmt)
+        ),
+        cache_key=stmt._generate_cache_key(),  # noqa: SLF001
+    )
+
+
+def assert_shape_snapshot(
+    shape: SqlShape,
+    path: Path,
+    *,
+    update: bool = False,
+) -> None:
+    """
+    Compare `shape` with the JSON snapshot at `path`
+
+    The snapshot is written if `update` is true or the `SQLA_FILTER_UPDATE_SNAPSHOTS`
+    environment variable is set, a missing snapshot fails otherwise.
+    """
+    actual = json.dumps(shape.to_dict(), indent=2) + "\n"
+    if update or os.environ.get(UPDATE_SNAPSHOTS_ENV):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(actual)
+        return
+
+    if not path.exists():
+        msg = f"Snapshot {path} doesn't exist, run with {UPDATE_SNAPSHOTS_ENV}=1 to write it"
+        raise AssertionError(msg)
+
+    expected = path.read_text()
+    if actual != expected:
+        diff = "".join(
+            difflib.unified_diff(
+                expected.splitlines(keepends=True),
+                actual.splitlines(keepends=True),
+                fromfile=str(path),
+                tofile="actual",
+            ),
+        )
+        msg = f"SQL shape differs from snapshot:\n{diff}"
+        raise AssertionError(msg)
+
+
+def _iter_joins(from_: FromClause) -> list[str]:
+    if not isinstance(from_, Join):
+        return []
+
+    if from_.full:
+        kind = "FULL OUTER JOIN"
+    elif from_.isouter:
+        kind = "LEFT OUTER JOIN"
+    else:
+        kind = "JOIN"
+
+    return [
+        *_iter_joins(from_.left),
+        f"{kind} {_target_name(from_.right)}",
+        *_iter_joins(from_.right),
+    ]
+
+
+def _target_name(from_: FromClause) -> str:
+    if isinstance(from_, Join):
+        return _target_name(from_.left)
+
+    if isinstance(from_, Alias):
+        from_ = from_.element
+
+    return getattr(from_, "name", None) or type(from_).__name__
+
+
+def _iter_predicates(stmt: Select[Any]) -> list[str]:
+    where = stmt.whereclause
+    if where is None:
+        return []
+
+    if isinstance(where, BooleanClauseList) and where.operator is operators.and_:
+        return [str(clause) for clause in where.clauses]
+
+    return [str(where)]
@@ -0,0 +1,75 @@
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, Select, func, select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ._columns import statement_primary_key
+from ._joins import iter_relationships
+from .base import BaseSorter, _apply_joins, _get_ordering_method
+from .ordering import OrderingField
+from .types_ import SelectClause
+
+_RANK_LABEL = "_sqla_filter_rank"
+
+
+def top_n_per_group(
+    stmt: Select[SelectClause],
+    *,
+    sorter: BaseSorter,
+    partition_by: InstrumentedAttribute[Any]
+    | ColumnElement[Any]
+    | Sequence[InstrumentedAttribute[Any] | ColumnElement[Any]],
+    limit: int,
+    fields_priority: Iterable[OrderingField] | None = None,
+) -> Select[SelectClause]:
+    """
+    Keep the first `limit` rows of every `partition_by` group in `sorter` order
+
+    Rows are ranked with `row_number() OVER (PARTITION BY ... ORDER BY <sorter>)`
+    and matched by the primary key of the statement first table,
+    so the selected columns, joins and options of `stmt` are kept.
+    The result is ordered by `partition_by`, then by `sorter`.
+    """
+    if limit < 1:
+        msg = f"limit must be positive, got {limit}"
+        raise ValueError(msg)
+
+    if isinstance(partition_by, Sequence):
+        partition_by = list(partition_by)
+    else:
+        partition_by = [partition_by]
+
+    fields_priority = tuple(fields_priority or ())
+    ranked_stmt = stmt.order_by(None)
+    order_by = []
+    for field, ordering in sorter.get_active_fields(fields_priority):
+        ranked_stmt = _apply_joins(
+            ranked_stmt,
+            relationships=iter_relationships(field),
+            is_filter=False,
+            with_loader=False,
+        )
+        order_by.append(
+            _get_ordering_method(field.field, ordering=ordering, nulls=field.nulls),
+        )
+
+    primary_key = statement_primary_key(stmt)
+    rank = func.row_number().over(partition_by=partition_by, order_by=order_by)
+    ranked = ranked_stmt.with_only_columns(
+        *primary_key,
+        rank.label(_RANK_LABEL),
+        maintain_column_froms=True,
+    ).subquery()
+    top = (
+        select(*ranked.c[: len(primary_key)])
+        .where(ranked.c[_RANK_LABEL] <= limit)
+        .correlate(None)
+    )
+
+    if len(primary_key) == 1:
+        stmt = stmt.where(primary_key[0].in_(top))
+    else:
+        stmt = stmt.where(tuple_(*primary_key).in_(top))
+
+    return sorter.apply(stmt.order_by(None).order_by(*partition_by), fields_priority)
@@ -0,0 +1,16 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, create_engine
+
+from tests.sqla_filter.common.models import meta
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite3'}")
+    meta.create_all(engine)
+    yield engine
+    meta.drop_all(engine)
+    engine.dispose()
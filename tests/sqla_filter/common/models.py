@@ -1,9 +1,14 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import ForeignKey, MetaData
+from sqlalchemy import JSON, ForeignKey, MetaData, String
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from sqla_filter.fulltext import declare_fulltext_index
+from sqla_filter.operators import declare_lower_index
+
 meta = MetaData(
     naming_convention={
         "ix": "ix_%(column_0_label)s",
@@ -28,6 +33,9 @@ class User(Base):
     is_deleted: Mapped[bool]
 
 
+declare_lower_index(User.last_name)
+
+
 class Review(Base):
     __tablename__ = "review"
 
@@ -37,6 +45,9 @@ class Review(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"))
 
 
+declare_fulltext_index(Review.content)
+
+
 class Author(Base):
     __tablename__ = "author"
 
@@ -63,3 +74,11 @@ class Book(Base):
     authors: Mapped[list[Author]] = relationship(secondary=BookAuthor.__table__)
     reviews: Mapped[list[Review]] = relationship()
     created_at: Mapped[datetime]
+    tags: Mapped[list[str]] = mapped_column(
+        JSON().with_variant(postgresql.ARRAY(String), "postgresql"),
+        default=list,
+    )
+    attributes: Mapped[dict[str, Any]] = mapped_column(
+        JSON().with_variant(postgresql.JSONB, "postgresql"),
+        default=dict,
+    )
@@ -0,0 +1,193 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import Engine, and_, false, not_, or_, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from sqla_filter.algebra import And, FilterExpression, Not, Or
+from sqla_filter.cost import QueryBudget, QueryBudgetExceededError
+from sqla_filter.slow_query import SIGNATURE_OPTION
+from tests.sqla_filter.common.filter import BookFilter
+from tests.sqla_filter.common.models import Book, BookAuthor, Review
+from tests.sqla_filter.test_async_manual_filter import BookAclFilter
+from tests.sqla_filter.test_cte import _CTE_NAME
+from tests.sqla_filter.test_cte import BookFilter as CteBookFilter
+from tests.utils import compile_stmt
+
+_NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class BudgetBookFilter(BookFilter):
+    __sqla_filter_budget__ = QueryBudget(max_score=1)
+
+
+def test_operators_build_flat_expressions() -> None:
+    first, second, third = (BookFilter(ident=uuid.uuid4()) for _ in range(3))
+
+    assert (first & second) & third == And(items=(first, second, third))
+    assert first | (second | third) == Or(items=(first, second, third))
+    assert ~(first & second) | third == Or(
+        items=(Not(item=And(items=(first, second))), third),
+    )
+
+
+def test_apply() -> None:
+    ident = uuid.uuid4()
+    author_ids = [uuid.uuid4()]
+    expression = (
+        BookFilter(created_at_from=_NOW)
+        & (BookFilter(ident=ident) | BookFilter(author_ids=author_ids))
+        & ~BookFilter(review_content_contains="draft")
+    )
+
+    stmt = expression.apply(select(Book))
+
+    author_book_ids = (
+        select(Book.id)
+        .join(BookAuthor, Book.id == BookAuthor.book_id)
+        .where(BookAuthor.author_id.in_(author_ids))
+        .correlate(None)
+    )
+    draft_book_ids = (
+        select(Book.id)
+        .join(Book.reviews)
+        .where(Review.content.icontains("draft"))
+        .correlate(None)
+    )
+    expected_stmt = select(Book).where(
+        and_(
+            Book.created_at >= _NOW,
+            or_(Book.id == ident, Book.id.in_(author_book_ids)),
+            not_(Book.id.in_(draft_book_ids)),
+        ),
+    )
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+    assert stmt.get_execution_options()[SIGNATURE_OPTION] == (
+        "BookFilter(created_at_from) & (BookFilter(ident) | BookFilter(author_ids))"
+        " & ~BookFilter(review_content_contains)",
+    )
+
+
+def test_shared_sub_expressions_are_built_once() -> None:
+    ident = uuid.uuid4()
+    shared = BookFilter(ident=ident) | BookFilter(created_at_from=_NOW)
+    equal = BookFilter(ident=ident) | BookFilter(created_at_from=_NOW)
+
+    stmt = (shared & equal & BookFilter(created_at_to=_NOW)).apply(select(Book))
+
+    sql = compile_stmt(stmt).string
+    assert sql.count("book.id =") == 1
+    assert sql.count("book.created_at >=") == 1
+
+
+def test_empty_filters() -> None:
+    assert (
+        compile_stmt(
+            (BookFilter() | BookFilter(ident=uuid.uuid4())).apply(select(Book))
+        ).string
+        == compile_stmt(select(Book)).string
+    )
+    assert (
+        compile_stmt((~BookFilter()).apply(select(Book))).string
+        == compile_stmt(select(Book).where(false())).string
+    )
+
+
+def test_budget_of_every_filter() -> None:
+    expression = BookFilter(ident=uuid.uuid4()) | BudgetBookFilter(
+        review_content_contains="draft",
+    )
+
+    with pytest.raises(QueryBudgetExceededError, match="BudgetBookFilter"):
+        expression.apply(select(Book))
+
+
+def test_apply_async() -> None:
+    ids = [uuid.uuid4() for _ in range(2)]
+    expression = BookAclFilter(ident=ids[0]) | ~BookAclFilter(other_ident=ids[1])
+
+    stmt = asyncio.run(expression.apply_async(select(Book)))
+
+    expected_stmt = select(Book).where(
+        or_(Book.id.in_([ids[0]]), not_(Book.id.in_([ids[1]]))),
+    )
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_rows(engine: Engine) -> None:
+    ids = [uuid.uuid4() for _ in range(4)]
+    with Session(engine) as session:
+        session.add_all(
+            Book(id=ident, created_at=_NOW + timedelta(days=day))
+            for day, ident in enumerate(ids)
+        )
+        session.commit()
+
+        expression = (
+            BookFilter(created_at_to=_NOW + timedelta(days=1))
+            | BookFilter(ident=ids[3])
+        ) & ~BookFilter(ident=ids[0])
+        rows = session.scalars(expression.apply(select(Book.id))).all()
+
+    assert sorted(rows) == sorted([ids[1], ids[3]])
+
+
+def test_joins_of_and_operands() -> None:
+    author_ids = [uuid.uuid4()]
+    expression = BookFilter(created_at_from=_NOW) & BookFilter(author_ids=author_ids)
+
+    stmt = expression.apply(select(Book))
+
+    expected_stmt = (
+        select(Book)
+        .join(BookAuthor, Book.id == BookAuthor.book_id)
+        .where(
+            and_(Book.created_at >= _NOW, BookAuthor.author_id.in_(author_ids)),
+        )
+    )
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_rows_of_joined_filters_under_or_and_not(engine: Engine) -> None:
+    ids = [uuid.uuid4() for _ in range(3)]
+    with Session(engine) as session:
+        session.add_all(
+            Book(id=ident, created_at=_NOW, reviews=reviews)
+            for ident, reviews in zip(
+                ids,
+                (
+                    [Review(content="spoiler", user_id=uuid.uuid4())],
+                    [
+                        Review(content="spoiler", user_id=uuid.uuid4()),
+                        Review(content="nice", user_id=uuid.uuid4()),
+                    ],
+                    [],
+                ),
+                strict=True,
+            )
+        )
+        session.commit()
+
+        def rows(expression: FilterExpression) -> set[uuid.UUID]:
+            return set(session.scalars(expression.apply(select(Book.id))))
+
+        assert rows(~BookFilter(review_content_contains="spoiler")) == {ids[2]}
+        assert rows(
+            BookFilter(ident=ids[2]) | BookFilter(review_content_contains="nice"),
+        ) == {ids[1], ids[2]}
+
+
+def test_shared_cte_of_all_filters() -> None:
+    ident = uuid.uuid4()
+    expression = CteBookFilter(reviewed_by_deleted_user=True) | CteBookFilter(
+        ident=ident,
+        reviewed_by_deleted_user=False,
+    )
+
+    stmt = expression.apply(select(Book))
+
+    compiled = stmt.compile(dialect=postgresql.dialect()).string  # type:ignore[no-untyped-call]
+    assert compiled.count(f"{_CTE_NAME} AS") == 1
@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from typing import Annotated, final
+
+import pytest
+from sqlalchemy import Select, and_, or_, select
+
+from sqla_filter import UNSET, AsyncManualFilter, SupportsOrFilter, Unset
+from tests.sqla_filter.common.models import Book
+from tests.utils import compile_stmt
+
+
+class _Concurrency:
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+
+
+@final
+class BookIdsFilter(
+    AsyncManualFilter[tuple[Book], "BookAclFilter", list[uuid.UUID]],
+):
+    def __init__(self, concurrency: _Concurrency) -> None:
+        self.concurrency = concurrency
+
+    async def prefetch(
+        self,
+        *,
+        value: uuid.UUID,
+        filter_: "BookAclFilter",  # noqa: ARG002
+    ) -> list[uuid.UUID]:
+        self.concurrency.running += 1
+        self.concurrency.max_running = max(
+            self.concurrency.max_running,
+            self.concurrency.running,
+        )
+        await asyncio.sleep(0.01)
+        self.concurrency.running -= 1
+        return [value]
+
+    def apply_prefetched(
+        self,
+        stmt: Select[tuple[Book]],
+        *,
+        value: uuid.UUID,  # noqa: ARG002
+        prefetched: list[uuid.UUID],
+        filter_: "BookAclFilter",  # noqa: ARG002
+    ) -> Select[tuple[Book]]:
+        return stmt.where(Book.id.in_(prefetched))
+
+
+_concurrency = _Concurrency()
+
+
+class BookAclFilter(SupportsOrFilter):
+    ident: Annotated[uuid.UUID | Unset, BookIdsFilter(_concurrency)] = UNSET
+    other_ident: Annotated[uuid.UUID | Unset, BookIdsFilter(_concurrency)] = UNSET
+
+
+def test_apply_async_prefetches_concurrently() -> None:
+    ids = [uuid.uuid4() for _ in range(3)]
+    filter_ = BookAclFilter(
+        ident=ids[0],
+        other_ident=ids[1],
+        or_=BookAclFilter(ident=ids[2]),
+    )
+
+    stmt = asyncio.run(filter_.apply_async(select(Book)))
+
+    expected_stmt = select(Book).where(
+        or_(
+            and_(Book.id.in_([ids[0]]), Book.id.in_([ids[1]])),
+            Book.id.in_([ids[2]]),
+        ),
+    )
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+    assert _concurrency.max_running == len(ids)
+
+
+def test_apply_requires_apply_async() -> None:
+    filter_ = BookAclFilter(ident=uuid.uuid4())
+
+    with pytest.raises(TypeError, match="ident is an AsyncManualFilter"):
+        filter_.apply(select(Book))
@@ -1,10 +1,28 @@
+import dataclasses
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated
 from uuid import UUID
 
+import pytest
+from sqlalchemy import select
 from sqlalchemy.sql.operators import eq
 
-from sqla_filter import UNSET, BaseFilter, FilterField, Unset
+from sqla_filter import (
+    UNSET,
+    BaseFilter,
+    BaseSorter,
+    FilterField,
+    OrderingEnum,
+    OrderingField,
+    Unset,
+)
+from tests.sqla_filter.common.filter import BookFilter
 from tests.sqla_filter.common.models import Book
+from tests.utils import compile_stmt
+
+_THREADS = 8
 
 
 def test_base_filter() -> None:
@@ -19,3 +37,62 @@ def test_base_filter() -> None:
     assert filter_.ident is UNSET
     assert filter_.second_manually_filter == []
     assert filter_.first_manually_filter is None
+
+
+def _created_at_field() -> OrderingField:
+    return OrderingField(Book.created_at)
+
+
+_shared_field = _created_at_field()
+
+
+class FirstSorter(BaseSorter):
+    first: Annotated[OrderingEnum | Unset, _shared_field] = UNSET
+
+
+class SecondSorter(BaseSorter):
+    second: Annotated[OrderingEnum | Unset, _shared_field] = UNSET
+
+
+def test_shared_field_is_bound_per_class() -> None:
+    assert FirstSorter.__sqla_filter_fields__["first"].name == "first"
+    assert SecondSorter.__sqla_filter_fields__["second"].name == "second"
+    assert _shared_field.name == ""
+
+    stmt = FirstSorter(first=OrderingEnum.desc).apply(select(Book))
+
+    assert compile_stmt(stmt).string.endswith("ORDER BY book.created_at DESC")
+
+
+def test_fields_are_immutable() -> None:
+    field = FirstSorter.__sqla_filter_fields__["first"]
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        field.nulls = "last"  # type:ignore[misc]
+
+    with pytest.raises(TypeError):
+        FirstSorter.__sqla_filter_fields__["other"] = field  # type:ignore[index]
+
+    assert hash(field) == hash(dataclasses.replace(field))
+
+
+def test_apply_concurrently() -> None:
+    filters = [
+        BookFilter(
+            ident=uuid.uuid4(),
+            author_user_id=uuid.uuid4(),
+            review_content_contains=str(index),
+        )
+        for index in range(_THREADS * 4)
+    ]
+    expected = [compile_stmt(filter_.apply(select(Book))).string for filter_ in filters]
+    barrier = threading.Barrier(_THREADS)
+
+    def apply(index: int) -> str:
+        if index < _THREADS:
+            barrier.wait()
+        return compile_stmt(filters[index].apply(select(Book))).string
+
+    with ThreadPoolExecutor(max_workers=_THREADS) as executor:
+        for _ in range(10):
+            assert list(executor.map(apply, range(len(filters)))) == expected
@@ -85,3 +85,51 @@ def test_sorter_raises() -> None:
 
         class Sorter(BaseSorter):  # pyright:ignore[reportUnusedClass]
             created_at: Annotated[int | Unset, OrderingField(Book.created_at)] = UNSET
+
+
+def test_fields_priority_generator() -> None:
+    sorter = BookSorter(
+        author_user_first_name=OrderingEnum.desc,
+        author_user_is_deleted=OrderingEnum.asc,
+    )
+    stmt = sorter.apply(
+        select(Book),
+        fields_priority=iter(build_priorities(BookSorter.author_user_is_deleted)),
+    )
+
+    assert compile_stmt(stmt).string.endswith(
+        'ORDER BY "user".is_deleted ASC, "user".first_name DESC',
+    )
+
+
+def test_from_spec() -> None:
+    sorter, fields_priority = BookSorter.from_spec(
+        " -author_user_is_deleted, +created_at,author_alias,",
+    )
+    stmt = sorter.apply(select(Book), fields_priority)
+
+    assert sorter == BookSorter(
+        author_user_is_deleted=OrderingEnum.desc,
+        created_at=OrderingEnum.asc,
+        author_alias=OrderingEnum.asc,
+    )
+    assert [field.name for field in fields_priority] == [
+        "author_user_is_deleted",
+        "created_at",
+        "author_alias",
+    ]
+    assert compile_stmt(stmt).string.endswith(
+        'ORDER BY "user".is_deleted DESC, book.created_at ASC, author.alias ASC',
+    )
+
+
+@pytest.mark.parametrize(
+    ("spec", "match"),
+    [
+        ("-unknown", "Unknown ordering field 'unknown'"),
+        ("created_at,-created_at", "Duplicate ordering field 'created_at'"),
+    ],
+)
+def test_from_spec_raises(spec: str, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        BookSorter.from_spec(spec)
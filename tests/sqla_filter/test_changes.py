@@ -0,0 +1,89 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import ne
+
+from sqla_filter import UNSET, BaseFilter, FilterField, Unset
+from sqla_filter.changes import changed_since, decode_watermark, encode_watermark
+from tests.sqla_filter.common.models import Book
+
+_NOW = datetime(2026, 1, 1)  # noqa: DTZ001
+
+
+class BookFilter(BaseFilter):
+    exclude_id: Annotated[uuid.UUID | Unset, FilterField(Book.id, operator=ne)] = UNSET
+
+
+def test_changed_since_stmt() -> None:
+    query = changed_since(
+        select(Book.id),
+        filter_=BookFilter(),
+        watermark_column=Book.created_at,
+        watermark=encode_watermark([_NOW, uuid.UUID(int=1)]),
+        limit=10,
+    )
+
+    compiled = str(query.stmt)
+
+    assert (
+        "WHERE book.created_at > :created_at_1 "
+        "OR book.created_at = :created_at_2 AND book.id > :id_1"
+    ) in compiled
+    assert compiled.endswith("ORDER BY book.created_at, book.id\n LIMIT :param_1")
+
+
+def test_changed_since_polling(engine: Engine) -> None:
+    ids = [uuid.UUID(int=index) for index in range(4)]
+    with Session(engine) as session:
+        session.add_all(Book(id=ident, created_at=_NOW) for ident in ids)
+        session.commit()
+
+        def poll(watermark: str | None) -> tuple[list[uuid.UUID], str | None]:
+            query = changed_since(
+                select(Book.id),
+                filter_=BookFilter(exclude_id=ids[3]),
+                watermark_column=Book.created_at,
+                watermark=watermark,
+                limit=2,
+            )
+            rows, watermark = query.split(session.execute(query.stmt).all())
+            return [ident for (ident,) in rows], watermark
+
+        first, watermark = poll(None)
+        second, watermark = poll(watermark)
+        empty, same_watermark = poll(watermark)
+
+        session.execute(
+            update(Book)
+            .where(Book.id.in_([ids[0], ids[3]]))
+            .values(created_at=_NOW + timedelta(seconds=1)),
+        )
+        changed, _ = poll(watermark)
+
+    assert first == [ids[0], ids[1]]
+    assert second == [ids[2]]
+    assert empty == []
+    assert same_watermark == watermark
+    assert changed == [ids[0]]
+
+
+def test_watermark_round_trip() -> None:
+    keys = [Book.__table__.c.created_at, Book.__table__.c.id]
+    values = [_NOW, uuid.uuid4()]
+
+    assert decode_watermark(encode_watermark(values), keys=keys) == values
+
+
+@pytest.mark.parametrize(
+    "watermark",
+    ["not a watermark", encode_watermark([1]), encode_watermark(["x", "y"])],
+)
+def test_invalid_watermark(watermark: str) -> None:
+    keys = [Book.__table__.c.created_at, Book.__table__.c.id]
+
+    with pytest.raises(ValueError, match="Invalid watermark"):
+        decode_watermark(watermark, keys=keys)
@@ -0,0 +1,112 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import CompileError
+from sqlalchemy.orm import Session
+
+from sqla_filter import UNSET, BaseFilter, FilterField, Unset
+from sqla_filter.containment import (
+    array_contains_op,
+    array_overlap_op,
+    json_contains_op,
+    json_has_key_op,
+)
+from tests.sqla_filter.common.models import Book
+
+
+class BookFilter(BaseFilter):
+    attributes_contain: Annotated[
+        dict[str, Any] | Unset,
+        FilterField(Book.attributes, operator=json_contains_op),
+    ] = UNSET
+    attributes_has_key: Annotated[
+        str | Unset,
+        FilterField(Book.attributes, operator=json_has_key_op),
+    ] = UNSET
+    tags_overlap: Annotated[
+        list[str] | Unset,
+        FilterField(Book.tags, operator=array_overlap_op),
+    ] = UNSET
+    tags_contain: Annotated[
+        list[str] | Unset,
+        FilterField(Book.tags, operator=array_contains_op),
+    ] = UNSET
+
+
+def test_postgresql() -> None:
+    stmt = BookFilter(
+        attributes_contain={"lang": "en"},
+        attributes_has_key="isbn",
+        tags_overlap=["a", "b"],
+        tags_contain=["c"],
+    ).apply(select(Book.id))
+
+    compiled = stmt.compile(dialect=postgresql.dialect())  # type:ignore[no-untyped-call]
+
+    assert compiled.string.endswith(
+        "WHERE book.attributes @> %(param_1)s::JSONB "
+        "AND book.attributes ? %(param_2)s "
+        "AND book.tags && %(param_3)s::VARCHAR[] "
+        "AND book.tags @> %(param_4)s::VARCHAR[]",
+    )
+    assert compiled.params == {
+        "param_1": {"lang": "en"},
+        "param_2": "isbn",
+        "param_3": ["a", "b"],
+        "param_4": ["c"],
+    }
+
+
+_BOOKS: list[dict[str, Any]] = [
+    {
+        "tags": ["a", "b"],
+        "attributes": {"lang": "en", "meta": {"pages": 10, "draft": True}},
+    },
+    {"tags": ["b", "c"], "attributes": {"lang": "de", "formats": ["pdf", "epub"]}},
+    {"tags": [], "attributes": {"lang": None, "meta": {"pages": 1}}},
+]
+
+
+@pytest.mark.parametrize(
+    ("filter_", "expected"),
+    [
+        (BookFilter(attributes_contain={"lang": "en"}), [0]),
+        (BookFilter(attributes_contain={"meta": {"pages": 10}}), [0]),
+        (BookFilter(attributes_contain={"meta": {"draft": True}}), [0]),
+        (BookFilter(attributes_contain={"meta": {"pages": True}}), []),
+        (BookFilter(attributes_contain={"lang": None}), [2]),
+        (BookFilter(attributes_contain={"formats": ["epub"]}), [1]),
+        (BookFilter(attributes_contain={"formats": "epub"}), []),
+        (BookFilter(attributes_contain={}), [0, 1, 2]),
+        (BookFilter(attributes_has_key="meta"), [0, 2]),
+        (BookFilter(tags_overlap=["a", "c"]), [0, 1]),
+        (BookFilter(tags_overlap=["d"]), []),
+        (BookFilter(tags_contain=["b", "c"]), [1]),
+        (BookFilter(tags_contain=[]), [0, 1, 2]),
+    ],
+)
+def test_sqlite(engine: Engine, filter_: BookFilter, expected: list[int]) -> None:
+    ids = [uuid.UUID(int=index) for index in range(len(_BOOKS))]
+    with Session(engine) as session:
+        session.add_all(
+            Book(id=ident, created_at=datetime.now(tz=UTC), **values)
+            for ident, values in zip(ids, _BOOKS, strict=True)
+        )
+        session.commit()
+
+        result = set(session.scalars(filter_.apply(select(Book.id))))
+
+    assert result == {ids[index] for index in expected}
+
+
+def test_unsupported() -> None:
+    stmt = BookFilter(attributes_contain={"items": [{"id": 1}]}).apply(select(Book.id))
+
+    with pytest.raises(CompileError, match="not supported on SQLite"):
+        stmt.compile(dialect=sqlite.dialect())  # type:ignore[no-untyped-call]
+    with pytest.raises(CompileError, match="requires PostgreSQL or SQLite"):
+        stmt.compile(dialect=mysql.dialect())  # type:ignore[no-untyped-call]
@@ -0,0 +1,185 @@
+import uuid
+from typing import Annotated
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.sql.operators import eq, in_op
+
+from sqla_filter import (
+    UNSET,
+    BaseFilter,
+    BaseSorter,
+    FilterField,
+    OrderingEnum,
+    OrderingField,
+    RelationshipInfo,
+    Unset,
+)
+from tests.sqla_filter.common.models import Author, Book, Review, User
+from tests.utils import compile_stmt
+
+
+class AuthorFilter(BaseFilter):
+    user_id: Annotated[
+        uuid.UUID | Unset,
+        FilterField(
+            User.id,
+            operator=eq,
+            relationship=RelationshipInfo(field=Author.user, contains_eager=True),
+        ),
+    ] = UNSET
+
+
+class AuthorSorter(BaseSorter):
+    user_last_name: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            User.last_name,
+            relationship=RelationshipInfo(
+                field=Author.user,
+                onclause=Author.user_id == User.id,
+                contains_eager=True,
+            ),
+        ),
+    ] = UNSET
+
+
+class BookFilter(BaseFilter):
+    review_id: Annotated[
+        uuid.UUID | Unset,
+        FilterField(
+            Review.id,
+            operator=eq,
+            relationship=RelationshipInfo(field=Book.reviews, contains_eager=True),
+        ),
+    ] = UNSET
+
+
+class BookSorter(BaseSorter):
+    author_user_last_name: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            User.last_name,
+            relationships=[
+                RelationshipInfo(field=Book.authors, contains_eager=True),
+                RelationshipInfo(field=Author.user, contains_eager=True),
+            ],
+        ),
+    ] = UNSET
+    author_user_first_name: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            User.first_name,
+            relationships=[
+                RelationshipInfo(field=Book.authors),
+                RelationshipInfo(field=Author.user, contains_eager=True),
+            ],
+        ),
+    ] = UNSET
+    review_content: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            Review.content,
+            relationship=RelationshipInfo(
+                field=Book.reviews,
+                onclause=Review.book_id == Book.id,
+                contains_eager=True,
+            ),
+        ),
+    ] = UNSET
+
+
+def test_filter_contains_eager_scalar() -> None:
+    user_id = uuid.uuid4()
+    stmt = AuthorFilter(user_id=user_id).apply(select(Author))
+
+    expected_stmt = (
+        select(Author)
+        .join(Author.user)
+        .options(contains_eager(Author.user))
+        .where(User.id == user_id)
+    )
+
+    compiled_stmt = compile_stmt(stmt)
+    assert compiled_stmt.string == compile_stmt(expected_stmt).string
+    assert '"user".last_name' in compiled_stmt.string
+
+
+def test_filter_contains_eager_collection_raises() -> None:
+    filter_ = BookFilter(review_id=uuid.uuid4())
+
+    with pytest.raises(ValueError, match="incomplete collection"):
+        filter_.apply(select(Book))
+
+
+def test_sorter_contains_eager_nested() -> None:
+    sorter = BookSorter(author_user_last_name=OrderingEnum.asc)
+    stmt = sorter.apply(select(Book))
+
+    expected_stmt = (
+        select(Book)
+        .join(Book.authors)
+        .join(Author.user)
+        .options(contains_eager(Book.authors).contains_eager(Author.user))
+        .order_by(User.last_name.asc())
+    )
+
+    compiled_stmt = compile_stmt(stmt)
+    assert compiled_stmt.string == compile_stmt(expected_stmt).string
+    assert "author.alias" in compiled_stmt.string
+
+
+@pytest.mark.parametrize(
+    ("sorter", "match"),
+    [
+        (
+            BookSorter(author_user_first_name=OrderingEnum.asc),
+            "preceding relationships",
+        ),
+        (BookSorter(review_content=OrderingEnum.asc), "custom onclause"),
+        (AuthorSorter(user_last_name=OrderingEnum.asc), "custom onclause"),
+    ],
+)
+def test_sorter_contains_eager_raises(sorter: BaseSorter, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        sorter.apply(select(Book))
+
+
+class AuthorAliasFilter(BaseFilter):
+    author_alias: Annotated[
+        str | Unset,
+        FilterField(
+            Author.alias,
+            operator=eq,
+            relationship=RelationshipInfo(field=Book.authors),
+        ),
+    ] = UNSET
+    author_ids: Annotated[
+        list[uuid.UUID] | Unset,
+        FilterField(
+            Author.id,
+            operator=in_op,
+            relationship=RelationshipInfo(field=Book.authors),
+        ),
+    ] = UNSET
+
+
+@pytest.mark.parametrize(
+    "filter_",
+    [AuthorAliasFilter(author_alias="x"), AuthorAliasFilter(author_ids=[uuid.uuid4()])],
+)
+def test_sorter_contains_eager_after_filter_raises(filter_: BaseFilter) -> None:
+    stmt = filter_.apply(select(Book))
+    sorter = BookSorter(author_user_last_name=OrderingEnum.asc)
+
+    with pytest.raises(ValueError, match="already filters this join"):
+        sorter.apply(stmt)
+
+
+def test_sorter_contains_eager_after_unrelated_filter() -> None:
+    stmt = select(Book).join(Book.authors).where(Book.id == uuid.uuid4())
+
+    stmt = BookSorter(author_user_last_name=OrderingEnum.asc).apply(stmt)
+
+    assert "author.alias" in compile_stmt(stmt).string
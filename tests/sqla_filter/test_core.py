@@ -0,0 +1,157 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, insert, select
+from sqlalchemy.sql.operators import eq
+
+from sqla_filter import (
+    UNSET,
+    BaseFilter,
+    BaseSorter,
+    FilterField,
+    OrderingEnum,
+    OrderingField,
+    RelationshipInfo,
+    Unset,
+)
+from sqla_filter.operators import prefix_op
+from tests.sqla_filter.common.models import meta
+from tests.utils import compile_stmt
+
+author = meta.tables["author"]
+book = meta.tables["book"]
+book_author = meta.tables["book__author"]
+review = meta.tables["review"]
+user = meta.tables["user"]
+
+
+class ReviewFilter(BaseFilter):
+    book_id: Annotated[
+        uuid.UUID | Unset,
+        FilterField(review.c.book_id, operator=eq),
+    ] = UNSET
+    user_last_name: Annotated[
+        str | Unset,
+        FilterField(
+            user.c.last_name,
+            operator=prefix_op,
+            relationship=RelationshipInfo(field=user),
+        ),
+    ] = UNSET
+
+
+class ReviewSorter(BaseSorter):
+    user_last_name: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            user.c.last_name,
+            relationship=RelationshipInfo(
+                field=user,
+                onclause=review.c.user_id == user.c.id,
+            ),
+        ),
+    ] = UNSET
+    book_created_at: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            book.c.created_at,
+            relationship=RelationshipInfo(field=book),
+            nulls="last",
+        ),
+    ] = UNSET
+
+
+def test_core_stmt() -> None:
+    book_id = uuid.uuid4()
+    stmt = ReviewFilter(book_id=book_id, user_last_name="Do").apply(
+        select(review.c.id),
+    )
+    stmt = ReviewSorter(
+        user_last_name=OrderingEnum.asc,
+        book_created_at=OrderingEnum.desc,
+    ).apply(stmt)
+
+    expected_stmt = (
+        select(review.c.id)
+        .join(user)
+        .join(book)
+        .where(
+            review.c.book_id == book_id,
+            user.c.last_name >= "Do",
+            user.c.last_name < "Dp",
+        )
+        .order_by(user.c.last_name.asc(), book.c.created_at.desc().nulls_last())
+    )
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_core_execute(engine: Engine) -> None:
+    book_id = uuid.uuid4()
+    users = [
+        {"id": uuid.uuid4(), "last_name": last_name, "is_deleted": False}
+        for last_name in ["Doe", "Dorian", "Smith"]
+    ]
+    reviews = [
+        {"id": uuid.uuid4(), "content": "", "book_id": book_id, "user_id": user_["id"]}
+        for user_ in users
+    ]
+    with engine.begin() as connection:
+        connection.execute(insert(user), users)
+        connection.execute(
+            insert(book),
+            [{"id": book_id, "created_at": datetime.now(tz=UTC)}],
+        )
+        connection.execute(insert(review), reviews)
+
+        stmt = ReviewFilter(user_last_name="Do").apply(
+            select(review.c.id, user.c.last_name),
+        )
+        stmt = ReviewSorter(user_last_name=OrderingEnum.desc).apply(stmt)
+        rows = connection.execute(stmt).all()
+
+    assert [tuple(row) for row in rows] == [
+        (reviews[1]["id"], "Dorian"),
+        (reviews[0]["id"], "Doe"),
+    ]
+
+
+def test_core_contains_eager_raises() -> None:
+    class BookSorter(BaseSorter):
+        review_content: Annotated[
+            OrderingEnum | Unset,
+            OrderingField(
+                review.c.content,
+                relationship=RelationshipInfo(field=review, contains_eager=True),
+            ),
+        ] = UNSET
+
+    with pytest.raises(TypeError, match="requires an ORM relationship"):
+        BookSorter(review_content=OrderingEnum.asc).apply(select(book))
+
+
+def test_core_join_on_another_condition_raises() -> None:
+    class ReviewUserFilter(ReviewFilter):
+        book_author_last_name: Annotated[
+            str | Unset,
+            FilterField(
+                user.c.last_name,
+                operator=eq,
+                relationships=[
+                    RelationshipInfo(field=book),
+                    RelationshipInfo(field=book_author),
+                    RelationshipInfo(field=author),
+                    RelationshipInfo(
+                        field=user,
+                        onclause=author.c.user_id == user.c.id,
+                    ),
+                ],
+            ),
+        ] = UNSET
+
+    filter_ = ReviewUserFilter(user_last_name="A", book_author_last_name="B")
+
+    with pytest.raises(ValueError, match="already joined on another condition"):
+        filter_.apply(select(review.c.id))
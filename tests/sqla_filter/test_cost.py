@@ -0,0 +1,157 @@
+import uuid
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import eq, icontains_op
+
+from sqla_filter import (
+    UNSET,
+    BaseSorter,
+    FilterField,
+    OrderingEnum,
+    OrderingField,
+    RelationshipInfo,
+    SupportsOrFilter,
+    Unset,
+)
+from sqla_filter.cost import (
+    TIMEOUT_OPTION,
+    QueryBudget,
+    QueryBudgetExceededError,
+    QueryCost,
+    install_statement_timeout,
+)
+from sqla_filter.operators import iprefix_op
+from sqla_filter.ordering import build_priorities
+from tests.sqla_filter.common.models import Author, Book, User
+
+
+class BookFilter(SupportsOrFilter):
+    __sqla_filter_budget__ = QueryBudget(max_score=10)
+
+    ident: Annotated[uuid.UUID | Unset, FilterField(Book.id, operator=eq)] = UNSET
+    author_alias: Annotated[
+        str | Unset,
+        FilterField(
+            Author.alias,
+            operator=icontains_op,
+            relationship=RelationshipInfo(field=Book.authors),
+        ),
+    ] = UNSET
+    author_user_last_name: Annotated[
+        str | Unset,
+        FilterField(
+            User.last_name,
+            operator=iprefix_op,
+            relationships=[
+                RelationshipInfo(field=Book.authors),
+                RelationshipInfo(field=Author.user),
+            ],
+        ),
+    ] = UNSET
+    author_user_first_name: Annotated[
+        str | Unset,
+        FilterField(
+            User.first_name,
+            operator=eq,
+            relationships=[
+                RelationshipInfo(field=Book.authors),
+                RelationshipInfo(field=Author.user),
+            ],
+        ),
+    ] = UNSET
+
+
+class TimeoutBookFilter(BookFilter):
+    __sqla_filter_budget__ = QueryBudget(max_score=10, action="timeout", timeout_ms=500)
+
+
+class AuthorSorter(BaseSorter):
+    __sqla_filter_budget__ = QueryBudget(max_score=3)
+
+    alias: Annotated[OrderingEnum | Unset, OrderingField(Author.alias)] = UNSET
+    user_last_name: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(
+            User.last_name,
+            relationship=RelationshipInfo(field=Author.user),
+        ),
+    ] = UNSET
+
+
+def test_estimate_cost() -> None:
+    filter_ = BookFilter(
+        author_user_last_name="Do",
+        author_user_first_name="John",
+        or_=BookFilter(ident=uuid.uuid4(), author_alias="A"),
+    )
+
+    assert filter_.estimate_cost() == QueryCost(
+        joins=1,
+        to_many_joins=1,
+        indexed_predicates=2,
+        unindexed_predicates=1,
+        substring_predicates=1,
+        or_depth=1,
+    )
+
+
+def test_within_budget() -> None:
+    stmt = BookFilter(author_user_last_name="Do").apply(select(Book))
+
+    assert TIMEOUT_OPTION not in stmt.get_execution_options()
+
+
+def test_reject_over_budget() -> None:
+    filter_ = BookFilter(author_alias="A", author_user_first_name="John")
+
+    with pytest.raises(
+        QueryBudgetExceededError, match="BookFilter query cost 16 exceeds budget 10"
+    ):
+        filter_.apply(select(Book))
+
+
+def test_timeout_over_budget() -> None:
+    filter_ = TimeoutBookFilter(author_alias="A", author_user_first_name="John")
+
+    stmt = filter_.apply(select(Book.id))
+
+    assert stmt.get_execution_options()[TIMEOUT_OPTION] == 500  # noqa: PLR2004
+    compiled = stmt.compile(dialect=mysql.dialect()).string  # type:ignore[no-untyped-call]
+    assert compiled.startswith("SELECT /*+ MAX_EXECUTION_TIME(500) */ book.id")
+
+
+def test_timeout_requires_timeout_ms() -> None:
+    with pytest.raises(ValueError, match="timeout_ms is required"):
+        QueryBudget(max_score=1, action="timeout")
+
+
+def test_sorter_budget() -> None:
+    AuthorSorter(user_last_name=OrderingEnum.asc).apply(select(Author))
+
+    with pytest.raises(QueryBudgetExceededError, match="AuthorSorter"):
+        AuthorSorter(
+            alias=OrderingEnum.asc,
+            user_last_name=OrderingEnum.asc,
+        ).apply(select(Author))
+
+
+def test_statement_timeout_listener_skips_other_dialects(engine: Engine) -> None:
+    install_statement_timeout(engine)
+    filter_ = TimeoutBookFilter(author_alias="A", author_user_first_name="John")
+
+    with Session(engine) as session:
+        assert list(session.scalars(filter_.apply(select(Book.id)))) == []
+
+
+def test_sorter_budget_with_priority_generator() -> None:
+    sorter = AuthorSorter(alias=OrderingEnum.asc, user_last_name=OrderingEnum.asc)
+
+    with pytest.raises(QueryBudgetExceededError, match="AuthorSorter"):
+        sorter.apply(
+            select(Author),
+            fields_priority=iter(build_priorities(AuthorSorter.user_last_name)),
+        )
@@ -0,0 +1,114 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated, final
+
+from sqlalchemy import Engine, Select, select
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import eq
+
+from sqla_filter import UNSET, FilterField, ManualFilter, SupportsOrFilter, Unset
+from sqla_filter.cte import shared_cte
+from tests.sqla_filter.common.models import Book, Review, User
+
+_CTE_NAME = "deleted_user_reviews"
+
+
+def _deleted_user_reviews() -> Select[tuple[uuid.UUID]]:
+    _factory_calls.append(None)
+    return (
+        select(Review.book_id)
+        .join(User, Review.user_id == User.id)
+        .where(User.is_deleted.is_(True))
+    )
+
+
+_factory_calls: list[None] = []
+
+
+@final
+class ReviewedByDeletedUserFilter(ManualFilter[tuple[Book], "BookFilter"]):
+    def apply(
+        self,
+        stmt: Select[tuple[Book]],
+        *,
+        value: bool,
+        filter_: "BookFilter",  # noqa: ARG002
+    ) -> Select[tuple[Book]]:
+        cte = shared_cte(_CTE_NAME, _deleted_user_reviews, materialized=True)
+        condition = Book.id.in_(select(cte.c.book_id))
+        return stmt.where(condition if value else ~condition)
+
+
+class BookFilter(SupportsOrFilter):
+    ident: Annotated[uuid.UUID | Unset, FilterField(Book.id, operator=eq)] = UNSET
+    reviewed_by_deleted_user: Annotated[
+        bool | Unset,
+        ReviewedByDeletedUserFilter(),
+    ] = UNSET
+
+
+def _or_filter(ident: uuid.UUID) -> BookFilter:
+    return BookFilter(
+        reviewed_by_deleted_user=True,
+        or_=BookFilter(ident=ident, reviewed_by_deleted_user=False),
+    )
+
+
+def test_shared_cte_rendered_once() -> None:
+    _factory_calls.clear()
+    stmt = _or_filter(uuid.uuid4()).apply(select(Book))
+
+    compiled = stmt.compile(dialect=postgresql.dialect()).string  # type:ignore[no-untyped-call]
+
+    assert len(_factory_calls) == 1
+    assert compiled.startswith(f"WITH {_CTE_NAME} AS MATERIALIZED \n(SELECT")
+    assert compiled.count(f"FROM {_CTE_NAME})") == 2  # noqa: PLR2004
+
+
+def test_materialized_hint_dialects() -> None:
+    stmt = _or_filter(uuid.uuid4()).apply(select(Book))
+
+    compiled = stmt.compile(dialect=mysql.dialect()).string  # type:ignore[no-untyped-call]
+
+    assert compiled.startswith(f"WITH {_CTE_NAME} AS \n(SELECT")
+
+
+def test_shared_cte_outside_apply() -> None:
+    first = shared_cte(_CTE_NAME, _deleted_user_reviews)
+    second = shared_cte(_CTE_NAME, _deleted_user_reviews)
+
+    assert first is not second
+
+
+def test_shared_cte_execute(engine: Engine) -> None:
+    users = [
+        User(id=uuid.uuid4(), last_name="Doe", is_deleted=True),
+        User(id=uuid.uuid4(), last_name="Roe", is_deleted=False),
+    ]
+    books = [Book(id=uuid.uuid4(), created_at=datetime.now(tz=UTC)) for _ in range(3)]
+    with Session(engine) as session:
+        session.add_all([*users, *books])
+        session.add_all(
+            [
+                Review(content="", book_id=books[0].id, user_id=users[0].id),
+                Review(content="", book_id=books[1].id, user_id=users[1].id),
+            ],
+        )
+        session.commit()
+
+        stmt = _or_filter(books[2].id).apply(select(Book.id))
+
+        assert set(session.scalars(stmt)) == {books[0].id, books[2].id}
+
+
+def test_shared_cte_chained_apply() -> None:
+    _factory_calls.clear()
+    stmt = BookFilter(reviewed_by_deleted_user=True).apply(select(Book))
+    stmt = BookFilter(reviewed_by_deleted_user=False).apply(stmt)
+
+    compiled = stmt.compile(dialect=postgresql.dialect()).string  # type:ignore[no-untyped-call]
+
+    assert len(_factory_calls) == 1
+    assert compiled.count(f"{_CTE_NAME} AS") == 1
+    assert compiled.count(f"FROM {_CTE_NAME})") == 2  # noqa: PLR2004
@@ -0,0 +1,101 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+from sqlalchemy import Engine, delete, or_, select, tuple_, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import eq
+
+from sqla_filter import UNSET, BaseFilter, FilterField, RelationshipInfo, Unset
+from tests.sqla_filter.common.filter import BookFilter, BookOrFilter
+from tests.sqla_filter.common.models import Author, Book, BookAuthor, Review, User
+from tests.utils import compile_stmt
+
+
+class BookAuthorFilter(BaseFilter):
+    author_alias: Annotated[
+        str | Unset,
+        FilterField(
+            Author.alias,
+            operator=eq,
+            relationship=RelationshipInfo(field=Author.__table__),
+        ),
+    ] = UNSET
+
+
+def test_dml_without_joins_is_inlined() -> None:
+    ident, other_ident = uuid.uuid4(), uuid.uuid4()
+    created_at = datetime.now(tz=UTC)
+    stmt = BookOrFilter(ident=ident, or_=BookOrFilter(ident=other_ident)).apply_dml(
+        update(Book).values(created_at=created_at),
+    )
+
+    expected_stmt = (
+        update(Book)
+        .values(created_at=created_at)
+        .where(or_(Book.id == ident, Book.id == other_ident))
+    )
+
+    assert str(stmt) == str(expected_stmt)
+
+
+def test_dml_empty_filter() -> None:
+    stmt = BookFilter().apply_dml(delete(Book))
+
+    assert str(stmt) == str(delete(Book))
+
+
+def test_dml_with_joins() -> None:
+    stmt = BookFilter(review_content_contains="spam").apply_dml(delete(Book))
+
+    expected_stmt = delete(Book).where(
+        Book.id.in_(
+            select(Book.id)
+            .join(Book.reviews)
+            .where(Review.content.icontains("spam"))
+            .correlate(None),
+        ),
+    )
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_dml_composite_primary_key() -> None:
+    stmt = BookAuthorFilter(author_alias="Ann").apply_dml(delete(BookAuthor))
+
+    expected_stmt = delete(BookAuthor).where(
+        tuple_(BookAuthor.book_id, BookAuthor.author_id).in_(
+            select(BookAuthor.book_id, BookAuthor.author_id)
+            .join(Author)
+            .where(Author.alias == "Ann"),
+        ),
+    )
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_dml_execute(engine: Engine) -> None:
+    now = datetime.now(tz=UTC).replace(tzinfo=None)
+    user = User(id=uuid.uuid4(), last_name="Doe", is_deleted=False)
+    books = [Book(id=uuid.uuid4(), created_at=now) for _ in range(3)]
+    reviews = [
+        Review(content="spam", book_id=books[0].id, user_id=user.id),
+        Review(content="Great", book_id=books[1].id, user_id=user.id),
+    ]
+    with Session(engine) as session:
+        session.add_all([user, *books, *reviews])
+        session.commit()
+
+        session.execute(
+            BookFilter(review_content_contains="SPAM").apply_dml(
+                update(Book).values(created_at=now - timedelta(days=1)),
+            ),
+        )
+        session.execute(
+            BookFilter(review_content_contains="great").apply_dml(delete(Book)),
+        )
+        session.commit()
+
+        updated = session.scalars(select(Book.id).where(Book.created_at < now))
+        assert list(updated) == [books[0].id]
+        assert set(session.scalars(select(Book.id))) == {books[0].id, books[2].id}
@@ -0,0 +1,156 @@
+import asyncio
+import importlib.util
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, event, select
+from sqlalchemy.orm import Session
+
+from sqla_filter.export import iter_column_batches, iter_column_batches_async
+from tests.sqla_filter.common.filter import BookFilter
+from tests.sqla_filter.common.models import Author, Book, User
+
+_NOW = datetime(2025, 1, 1)  # noqa: DTZ001
+_BOOKS = 5
+
+
+@pytest.fixture
+def book_ids(engine: Engine) -> list[uuid.UUID]:
+    ids = [uuid.UUID(int=index) for index in range(_BOOKS)]
+    user = User(id=uuid.uuid4(), last_name="Doe", is_deleted=False)
+    author = Author(id=uuid.uuid4(), alias="A", user=user)
+    with Session(engine) as session:
+        session.add_all(
+            Book(
+                id=ident,
+                created_at=_NOW + timedelta(days=index),
+                authors=[author] if index % 2 else [],
+            )
+            for index, ident in enumerate(ids)
+        )
+        session.commit()
+
+    return ids
+
+
+def test_iter_column_batches(engine: Engine, book_ids: list[uuid.UUID]) -> None:
+    statements: list[str] = []
+    event.listen(
+        engine, "before_cursor_execute", lambda *args: statements.append(args[2])
+    )
+
+    with Session(engine) as session:
+        batches = list(
+            iter_column_batches(
+                session,
+                select(Book).order_by(Book.created_at),
+                filter_=BookFilter(created_at_from=_NOW + timedelta(days=1)),
+                batch_size=3,
+                arrays="list",
+            ),
+        )
+
+        assert not session.identity_map
+
+    assert [list(batch) for batch in batches] == [
+        ["id", "created_at", "tags", "attributes"]
+    ] * 2
+    assert batches[0]["id"] == book_ids[1:4]
+    assert batches[1]["id"] == book_ids[4:]
+    assert batches[1]["created_at"] == [_NOW + timedelta(days=4)]
+    assert statements[0].startswith(
+        "SELECT book.id, book.created_at, book.tags, book.attributes"
+    )
+
+
+def test_iter_column_batches_columns_and_joins(
+    engine: Engine, book_ids: list[uuid.UUID]
+) -> None:
+    with Session(engine) as session:
+        (batch,) = iter_column_batches(
+            session,
+            select(Book).order_by(Book.created_at),
+            filter_=BookFilter(
+                author_user_id=(author_user_id := _author_user_id(session))
+            ),
+            columns=[Book.id, Author.user_id],
+            arrays="list",
+        )
+
+    assert batch == {
+        "id": [book_ids[1], book_ids[3]],
+        "user_id": [author_user_id] * 2,
+    }
+
+
+def _author_user_id(session: Session) -> uuid.UUID:
+    return session.scalars(select(User.id)).one()
+
+
+def test_iter_column_batches_numpy(engine: Engine, book_ids: list[uuid.UUID]) -> None:
+    numpy = pytest.importorskip("numpy")
+
+    with Session(engine) as session:
+        (batch,) = iter_column_batches(
+            session,
+            select(Book.id),
+            filter_=BookFilter(),
+            arrays="auto",
+        )
+
+    assert isinstance(batch["id"], numpy.ndarray)
+    assert sorted(batch["id"].tolist()) == book_ids
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("numpy") is not None, reason="NumPy is installed"
+)
+def test_iter_column_batches_numpy_missing(engine: Engine) -> None:
+    with Session(engine) as session:
+        batches = iter_column_batches(
+            session, select(Book.id), filter_=BookFilter(), arrays="numpy"
+        )
+
+        with pytest.raises(ImportError, match=r"install sqla-filter\[numpy\]"):
+            next(batches)
+
+
+def test_iter_column_batches_async(
+    tmp_path: Path,
+    book_ids: list[uuid.UUID],
+) -> None:
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import (  # noqa: PLC0415
+        AsyncSession,
+        create_async_engine,
+    )
+
+    async def collect() -> list[dict[str, Any]]:
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}"
+        )
+        try:
+            async with AsyncSession(async_engine) as session:
+                return [
+                    batch
+                    async for batch in iter_column_batches_async(
+                        session,
+                        select(Book.id).order_by(Book.id),
+                        filter_=BookFilter(),
+                        batch_size=2,
+                        arrays="list",
+                    )
+                ]
+        finally:
+            await async_engine.dispose()
+
+    batches = asyncio.run(collect())
+
+    assert [batch["id"] for batch in batches] == [
+        book_ids[:2],
+        book_ids[2:4],
+        book_ids[4:],
+    ]
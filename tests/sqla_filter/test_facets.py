@@ -0,0 +1,107 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import eq, ge
+
+from sqla_filter import UNSET, BaseFilter, FilterField, RelationshipInfo, Unset
+from sqla_filter.base import collect_facet_counts
+from tests.sqla_filter.common.models import Author, Book, User
+
+
+class BookFilter(BaseFilter):
+    author_alias: Annotated[
+        str | Unset,
+        FilterField(
+            Author.alias,
+            operator=eq,
+            relationship=RelationshipInfo(field=Book.authors),
+        ),
+    ] = UNSET
+    author_user_is_deleted: Annotated[
+        bool | Unset,
+        FilterField(
+            User.is_deleted,
+            operator=eq,
+            relationships=[
+                RelationshipInfo(field=Book.authors),
+                RelationshipInfo(field=Author.user),
+            ],
+        ),
+    ] = UNSET
+    created_at_from: Annotated[
+        datetime | Unset,
+        FilterField(Book.created_at, operator=ge),
+    ] = UNSET
+
+
+_FACETS = ["author_alias", "author_user_is_deleted"]
+
+
+def test_facet_counts_execute(engine: Engine) -> None:
+    now = datetime.now(tz=UTC).replace(tzinfo=None)
+    users = [
+        User(id=uuid.uuid4(), last_name="Doe", is_deleted=False),
+        User(id=uuid.uuid4(), last_name="Roe", is_deleted=True),
+    ]
+    authors = [
+        Author(id=uuid.uuid4(), alias="A", user=users[0]),
+        Author(id=uuid.uuid4(), alias="B", user=users[1]),
+    ]
+    books = [
+        Book(id=uuid.uuid4(), created_at=now, authors=[authors[0]]),
+        Book(id=uuid.uuid4(), created_at=now, authors=authors),
+        Book(id=uuid.uuid4(), created_at=now - timedelta(days=2), authors=[authors[1]]),
+        Book(id=uuid.uuid4(), created_at=now, authors=[]),
+    ]
+    with Session(engine) as session:
+        session.add_all(books)
+        session.commit()
+
+        filter_ = BookFilter(
+            author_alias="A",
+            created_at_from=now - timedelta(days=1),
+        )
+        rows = session.execute(filter_.facet_counts(select(Book), facets=_FACETS))
+        counts = collect_facet_counts(rows)
+
+    assert counts == {
+        "author_alias": {"A": 2, "B": 1},
+        "author_user_is_deleted": {False: 2},
+    }
+
+
+def test_facet_counts_grouping_sets() -> None:
+    stmt = BookFilter(created_at_from=datetime.now(tz=UTC)).facet_counts(
+        select(Book),
+        facets=_FACETS,
+        grouping_sets=True,
+    )
+
+    compiled = stmt.compile(dialect=postgresql.dialect()).string  # type:ignore[no-untyped-call]
+
+    assert "UNION ALL" not in compiled
+    assert "CASE WHEN (grouping(author.alias) = %(grouping_1)s)" in compiled
+    assert compiled.endswith('GROUP BY GROUPING SETS(author.alias, "user".is_deleted)')
+
+
+def test_facet_counts_grouping_sets_with_facet_set() -> None:
+    stmt = BookFilter(author_alias="A").facet_counts(
+        select(Book),
+        facets=_FACETS,
+        grouping_sets=True,
+    )
+
+    compiled = stmt.compile(dialect=postgresql.dialect()).string  # type:ignore[no-untyped-call]
+
+    assert "UNION ALL" in compiled
+    assert "GROUPING SETS" not in compiled
+
+
+def test_facet_counts_invalid_field() -> None:
+    with pytest.raises(ValueError, match="'unknown' is not a FilterField"):
+        BookFilter().facet_counts(select(Book), facets=["unknown"])
@@ -0,0 +1,184 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated
+
+import pytest
+from sqlalchemy import (
+    Column,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.schema import CreateIndex
+
+from sqla_filter import UNSET, BaseFilter, FilterField, Unset
+from sqla_filter.fulltext import (
+    FullTextMatch,
+    FullTextOperator,
+    declare_fulltext_index,
+    fulltext_op,
+    rebuild_fulltext_index,
+)
+from tests.sqla_filter.common.models import Book, Review, User, meta
+
+
+class ReviewFilter(BaseFilter):
+    content: Annotated[
+        str | Unset, FilterField(Review.content, operator=fulltext_op)
+    ] = UNSET
+
+
+@pytest.fixture
+def reviews(engine: Engine) -> list[Review]:
+    user = User(id=uuid.uuid4(), last_name="Doe", is_deleted=False)
+    book = Book(id=uuid.uuid4(), created_at=datetime.now(tz=UTC))
+    reviews = [
+        Review(content="A thrilling mystery novel", book_id=book.id, user_id=user.id),
+        Review(content="Boring and slow", book_id=book.id, user_id=user.id),
+        Review(
+            content='The "mystery" of the slow ending', book_id=book.id, user_id=user.id
+        ),
+    ]
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all([user, book, *reviews])
+        session.commit()
+
+    return reviews
+
+
+def test_compile_postgresql() -> None:
+    stmt = ReviewFilter(content="mystery").apply(select(Review.id))
+
+    compiled = stmt.compile(dialect=postgresql.dialect())  # type:ignore[no-untyped-call]
+
+    assert (
+        "to_tsvector('english', review.content) @@ plainto_tsquery('english', %(param_1)s)"
+        in compiled.string
+    )
+
+
+def test_postgresql_index() -> None:
+    (index,) = meta.tables["review"].indexes
+
+    compiled = CreateIndex(index).compile(
+        dialect=postgresql.dialect(),  # type:ignore[no-untyped-call]
+    )
+
+    assert compiled.string == (
+        "CREATE INDEX ix_review_content_fts ON review "
+        "USING gin (to_tsvector('english', content))"
+    )
+
+
+def test_compile_fallback() -> None:
+    stmt = ReviewFilter(content="mystery").apply(select(Review.id))
+
+    compiled = stmt.compile(dialect=mysql.dialect())  # type:ignore[no-untyped-call]
+
+    assert compiled.string.endswith(
+        "WHERE lower(review.content) LIKE concat('%%', lower(%s), '%%')",
+    )
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("mystery", [0, 2]),
+        ("slow", [1, 2]),
+        ("thrilling mystery", [0]),
+        ("novel thrilling", [0]),
+        ("mystery, ending!", [2]),
+        ('"mystery" OR', []),
+        ("detective", []),
+    ],
+)
+def test_sqlite_fts5(
+    engine: Engine,
+    reviews: list[Review],
+    query: str,
+    expected: list[int],
+) -> None:
+    stmt = ReviewFilter(content=query).apply(select(Review.id))
+
+    with Session(engine) as session:
+        result = set(session.scalars(stmt))
+
+    assert result == {reviews[index].id for index in expected}
+
+
+def test_sqlite_fts5_follows_updates(engine: Engine, reviews: list[Review]) -> None:
+    stmt = ReviewFilter(content="mystery").apply(select(Review.id))
+
+    with Session(engine) as session:
+        review = session.get_one(Review, reviews[0].id)
+        review.content = "A thrilling detective novel"
+        session.delete(session.get_one(Review, reviews[2].id))
+        session.commit()
+
+        assert list(session.scalars(stmt)) == []
+
+
+def test_sqlite_fts5_aliased(engine: Engine, reviews: list[Review]) -> None:
+    review = aliased(Review)
+    stmt = select(review.id).where(fulltext_op(review.content, "mystery"))
+
+    with Session(engine) as session:
+        result = set(session.scalars(stmt))
+
+    assert "review_1.rowid IN" in str(stmt.compile(engine))
+    assert result == {reviews[0].id, reviews[2].id}
+
+
+def test_sqlite_fts5_integer_primary_key(engine: Engine) -> None:
+    note = Table(
+        "note",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("body", String, nullable=False),
+    )
+    declare_fulltext_index(note.c.body)
+
+    note.metadata.create_all(engine)
+    try:
+        with engine.begin() as connection:
+            connection.execute(insert(note), [{"id": 10, "body": "mystery"}])
+            fts_sql = connection.scalar(
+                text("SELECT sql FROM sqlite_master WHERE name = 'note_body_fts'"),
+            )
+            result = connection.scalars(
+                select(note.c.id).where(fulltext_op(note.c.body, "mystery")),
+            ).all()
+    finally:
+        note.metadata.drop_all(engine)
+
+    assert 'content_rowid="id"' in fts_sql
+    assert result == [10]
+
+
+def test_sqlite_fts5_rebuild(engine: Engine, reviews: list[Review]) -> None:
+    stmt = ReviewFilter(content="slow").apply(select(Review.id))
+
+    with engine.begin() as connection:
+        rebuild_fulltext_index(connection, Review.content)
+        result = set(connection.scalars(stmt))
+
+    assert result == {reviews[1].id, reviews[2].id}
+
+
+def test_invalid_config() -> None:
+    with pytest.raises(ValueError, match="Invalid text search configuration"):
+        FullTextOperator(config="english'; --")(Review.content, "mystery")
+
+
+def test_requires_table_column() -> None:
+    with pytest.raises(TypeError, match="Expected a table column"):
+        FullTextMatch(Review.content + "!", "mystery").compile(
+            dialect=sqlite.dialect(),  # type:ignore[no-untyped-call]
+        )
@@ -0,0 +1,124 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import eq
+
+from sqla_filter import UNSET, BaseFilter, FilterField, RelationshipInfo, Unset
+from tests.sqla_filter.common.filter import BookFilter
+from tests.sqla_filter.common.models import Author, Book, User
+from tests.utils import compile_stmt
+
+
+class JoiningBookFilter(BookFilter):
+    __sqla_filter_eliminate_joins__ = False
+
+
+class AuthorFilter(BaseFilter):
+    user_id: Annotated[
+        uuid.UUID | Unset,
+        FilterField(
+            User.id, operator=eq, relationship=RelationshipInfo(field=Author.user)
+        ),
+    ] = UNSET
+    outer_user_id: Annotated[
+        uuid.UUID | Unset,
+        FilterField(
+            User.id,
+            operator=eq,
+            relationship=RelationshipInfo(field=Author.user, isouter=True),
+        ),
+    ] = UNSET
+    eager_user_id: Annotated[
+        uuid.UUID | Unset,
+        FilterField(
+            User.id,
+            operator=eq,
+            relationship=RelationshipInfo(field=Author.user, contains_eager=True),
+        ),
+    ] = UNSET
+    user_last_name: Annotated[
+        str | Unset,
+        FilterField(
+            User.last_name,
+            operator=eq,
+            relationship=RelationshipInfo(field=Author.user),
+        ),
+    ] = UNSET
+
+
+def test_many_to_one_join_is_dropped() -> None:
+    stmt = AuthorFilter(user_id=uuid.uuid4()).apply(select(Author))
+
+    assert compile_stmt(stmt).string.startswith(
+        "SELECT author.id, author.alias, author.user_id \nFROM author \nWHERE author.user_id = ",
+    )
+
+
+def test_joins_are_kept() -> None:
+    user_id = uuid.uuid4()
+
+    for filter_ in (
+        AuthorFilter(outer_user_id=user_id),
+        AuthorFilter(eager_user_id=user_id),
+        AuthorFilter(user_last_name="Doe"),
+    ):
+        assert 'JOIN "user"' in compile_stmt(filter_.apply(select(Author))).string
+
+    stmt = JoiningBookFilter(author_user_id=user_id).apply(select(Book))
+    assert 'JOIN "user"' in compile_stmt(stmt).string
+
+
+def test_shared_association_join() -> None:
+    filter_ = BookFilter(author_ids=[uuid.uuid4()], author_user_id=uuid.uuid4())
+
+    sql = compile_stmt(filter_.apply(select(Book))).string
+
+    assert "JOIN book__author ON book.id = book__author.book_id " in sql
+    assert "JOIN author ON author.id = book__author.author_id" in sql
+    assert "book__author.author_id IN" in sql
+    assert "author.user_id = " in sql
+
+
+def test_aliased_association_join() -> None:
+    stmt = BookFilter(author_user_id=uuid.uuid4()).apply(select(Book))
+    stmt = BookFilter(author_ids=[uuid.uuid4()]).apply(stmt)
+
+    sql = compile_stmt(stmt).string
+
+    assert sql.count("JOIN book__author AS book__author_1") == 1
+    assert "author.id IN" in sql
+
+
+def test_same_rows_as_joins(engine: Engine) -> None:
+    users = [
+        User(id=uuid.uuid4(), last_name=str(index), is_deleted=False)
+        for index in range(2)
+    ]
+    authors = [Author(id=uuid.uuid4(), user=user) for user in users]
+    books = [
+        Book(id=uuid.uuid4(), created_at=datetime.now(tz=UTC), authors=book_authors)
+        for book_authors in ([], authors[:1], authors)
+    ]
+    with Session(engine) as session:
+        session.add_all(books)
+        session.commit()
+
+        values: list[dict[str, Any]] = [
+            {"author_ids": [authors[1].id]},
+            {"author_ids": [author.id for author in authors]},
+            {"author_user_id": users[0].id},
+            {"author_ids": [authors[0].id], "author_user_id": users[1].id},
+            {"author_ids": [authors[1].id], "author_user_id": users[1].id},
+        ]
+        for filter_ in values:
+            stmt = select(Book.id).order_by(Book.id).distinct()
+            expected = session.scalars(JoiningBookFilter(**filter_).apply(stmt)).all()
+            chained_stmt = stmt
+            for name, value in filter_.items():
+                chained_stmt = BookFilter(**{name: value}).apply(chained_stmt)
+
+            assert session.scalars(BookFilter(**filter_).apply(stmt)).all() == expected
+            assert session.scalars(chained_stmt).all() == expected
@@ -0,0 +1,254 @@
+import sys
+import uuid
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Dialect, Engine, Select, and_, func, select
+from sqlalchemy.dialects import mssql, mysql, postgresql, sqlite
+from sqlalchemy.exc import CompileError
+from sqlalchemy.orm import Session
+
+from sqla_filter import UNSET, BaseFilter, FilterField, RelationshipInfo, Unset
+from sqla_filter.operators import (
+    LargeInOperator,
+    iprefix_op,
+    large_in_op,
+    missing_prefix_indexes,
+    prefix_op,
+)
+from tests.sqla_filter.common.manual_filter import BookManualFilter
+from tests.sqla_filter.common.models import Author, Book, User, meta
+from tests.utils import compile_stmt
+
+
+class UserFilter(BaseFilter):
+    last_name_startswith: Annotated[
+        str | Unset,
+        FilterField(User.last_name, operator=prefix_op),
+    ] = UNSET
+    last_name_istartswith: Annotated[
+        str | Unset,
+        FilterField(User.last_name, operator=iprefix_op),
+    ] = UNSET
+    first_name_istartswith: Annotated[
+        str | Unset,
+        FilterField(User.first_name, operator=iprefix_op),
+    ] = UNSET
+    id_startswith: Annotated[
+        str | Unset,
+        FilterField(User.id, operator=prefix_op),
+    ] = UNSET
+    is_manual_filter_enabled: Annotated[bool | Unset, BookManualFilter()] = UNSET
+
+
+class AuthorFilter(BaseFilter):
+    alias_startswith: Annotated[
+        str | Unset,
+        FilterField(Author.alias, operator=prefix_op),
+    ] = UNSET
+
+
+@pytest.mark.parametrize(
+    ("value", "lower", "upper"),
+    [
+        ("Smi", "Smi", "Smj"),
+        ("a\U0010ffff", "a\U0010ffff", "b"),
+        ("a\ud7ff", "a\ud7ff", "a\ue000"),
+    ],
+)
+def test_prefix_op(value: str, lower: str, upper: str) -> None:
+    stmt = UserFilter(last_name_startswith=value).apply(select(User))
+
+    expected_stmt = select(User).where(
+        and_(User.last_name >= lower, User.last_name < upper),
+    )
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_prefix_op_without_upper_bound() -> None:
+    value = chr(sys.maxunicode)
+    stmt = UserFilter(last_name_startswith=value).apply(select(User))
+
+    expected_stmt = select(User).where(User.last_name >= value)
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_iprefix_op() -> None:
+    stmt = UserFilter(last_name_istartswith="SMi").apply(select(User))
+
+    expected_stmt = select(User).where(
+        and_(func.lower(User.last_name) >= "smi", func.lower(User.last_name) < "smj"),
+    )
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+def test_prefix_ops_execute(engine: Engine) -> None:
+    names = ["Smith", "smirnov", "Smj", "Sm", "Abbott"]
+    with Session(engine) as session:
+        session.add_all(
+            User(id=uuid.uuid4(), last_name=name, is_deleted=False) for name in names
+        )
+        session.commit()
+
+        startswith = UserFilter(last_name_startswith="Smi").apply(
+            select(User.last_name)
+        )
+        istartswith = UserFilter(last_name_istartswith="SMI").apply(
+            select(User.last_name),
+        )
+
+        assert set(session.scalars(startswith)) == {"Smith"}
+        assert set(session.scalars(istartswith)) == {"Smith", "smirnov"}
+
+
+def test_iprefix_op_non_ascii_postgresql() -> None:
+    stmt = UserFilter(last_name_istartswith="ÖL").apply(select(User))
+
+    expected_stmt = select(User).where(
+        and_(func.lower(User.last_name) >= "öl", func.lower(User.last_name) < "öm"),
+    )
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+@pytest.mark.parametrize("value", ["Öl", "ÖL"])
+def test_iprefix_op_non_ascii_sqlite(engine: Engine, value: str) -> None:
+    with Session(engine) as session:
+        session.add_all(
+            User(id=uuid.uuid4(), last_name=name, is_deleted=False)
+            for name in ["Ölberg", "Olberg"]
+        )
+        session.commit()
+
+        stmt = UserFilter(last_name_istartswith=value).apply(select(User.last_name))
+
+        assert list(session.scalars(stmt)) == ["Ölberg"]
+
+
+def test_missing_prefix_indexes() -> None:
+    assert missing_prefix_indexes(UserFilter) == [
+        "last_name_startswith",
+        "first_name_istartswith",
+    ]
+    assert missing_prefix_indexes(AuthorFilter) == ["alias_startswith"]
+
+
+def test_lower_index_declared_once() -> None:
+    indexes = [index.name for index in meta.tables["user"].indexes]
+
+    assert indexes == ["ix_user_last_name_lower"]
+
+
+class BookFilter(BaseFilter):
+    ids: Annotated[
+        Sequence[uuid.UUID] | Unset,
+        FilterField(Book.id, operator=LargeInOperator(threshold=2)),
+    ] = UNSET
+    ids_any: Annotated[
+        Sequence[uuid.UUID] | Unset,
+        FilterField(Book.id, operator=LargeInOperator(threshold=2, strategy="any")),
+    ] = UNSET
+    ids_json: Annotated[
+        Sequence[uuid.UUID] | Unset,
+        FilterField(Book.id, operator=LargeInOperator(threshold=2, strategy="json")),
+    ] = UNSET
+    ids_values: Annotated[
+        Sequence[uuid.UUID] | Unset,
+        FilterField(Book.id, operator=LargeInOperator(threshold=2, strategy="values")),
+    ] = UNSET
+    author_ids: Annotated[
+        Sequence[uuid.UUID] | Unset,
+        FilterField(
+            Author.id,
+            operator=large_in_op,
+            relationship=RelationshipInfo(field=Book.authors),
+        ),
+    ] = UNSET
+
+
+def _compile_postgresql(stmt: Select[tuple[uuid.UUID]]) -> str:
+    return stmt.compile(dialect=postgresql.dialect()).string  # type:ignore[no-untyped-call]
+
+
+def test_large_in_below_threshold() -> None:
+    ids = [uuid.uuid4() for _ in range(2)]
+    stmt = BookFilter(ids=ids).apply(select(Book.id))
+
+    expected_stmt = select(Book.id).where(Book.id.in_(ids))
+
+    assert compile_stmt(stmt).string == compile_stmt(expected_stmt).string
+
+
+@pytest.mark.parametrize(
+    ("filter_", "expected"),
+    [
+        (
+            BookFilter(ids=[uuid.uuid4() for _ in range(3)]),
+            "WHERE book.id = ANY (%(param_1)s::UUID[])",
+        ),
+        (
+            BookFilter(ids_any=[uuid.uuid4() for _ in range(3)]),
+            "WHERE book.id = ANY (%(param_1)s::UUID[])",
+        ),
+        (
+            BookFilter(ids_json=[uuid.uuid4() for _ in range(3)]),
+            "WHERE book.id IN (SELECT CAST(value AS UUID) AS value \n"
+            "FROM json_array_elements_text(CAST(%(param_1)s AS JSON)))",
+        ),
+        (
+            BookFilter(ids_values=[uuid.uuid4() for _ in range(3)]),
+            "WHERE book.id IN (SELECT in_values.value \n"
+            "FROM (VALUES (%(param_1)s::UUID), (%(param_2)s::UUID), (%(param_3)s::UUID)) "
+            "AS in_values (value))",
+        ),
+    ],
+)
+def test_large_in_postgresql(filter_: BookFilter, expected: str) -> None:
+    stmt = filter_.apply(select(Book.id))
+
+    assert _compile_postgresql(stmt).endswith(expected)
+
+
+def test_large_in_any_requires_postgresql() -> None:
+    stmt = BookFilter(ids_any=[uuid.uuid4() for _ in range(3)]).apply(select(Book.id))
+
+    with pytest.raises(CompileError, match="requires PostgreSQL"):
+        stmt.compile(dialect=sqlite.dialect())  # type:ignore[no-untyped-call]
+
+
+@pytest.mark.parametrize("dialect", [mysql.dialect(), mssql.dialect()])  # type:ignore[no-untyped-call]
+def test_large_in_auto_falls_back_to_in(dialect: Dialect) -> None:
+    stmt = BookFilter(ids=[uuid.uuid4() for _ in range(3)]).apply(select(Book.id))
+
+    compiled = stmt.compile(dialect=dialect)
+
+    assert "json_each" not in compiled.string
+    assert " IN (__[POSTCOMPILE_" in compiled.string
+
+
+def test_large_in_json_requires_postgresql_or_sqlite() -> None:
+    stmt = BookFilter(ids_json=[uuid.uuid4() for _ in range(3)]).apply(
+        select(Book.id),
+    )
+
+    with pytest.raises(CompileError, match="requires PostgreSQL or SQLite"):
+        stmt.compile(dialect=mysql.dialect())  # type:ignore[no-untyped-call]
+
+
+def test_large_in_sqlite(engine: Engine) -> None:
+    books = [Book(id=uuid.uuid4(), created_at=datetime.now(tz=UTC)) for _ in range(10)]
+    ids = [book.id for book in books[:5]]
+    ids += [uuid.uuid4() for _ in range(40_000)]
+
+    with Session(engine) as session:
+        session.add_all(books)
+        session.commit()
+
+        stmt = BookFilter(ids=ids).apply(select(Book.id))
+
+        assert set(session.scalars(stmt)) == set(ids[:5])
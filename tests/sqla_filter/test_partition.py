@@ -0,0 +1,198 @@
+import asyncio
+import uuid
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from sqla_filter import OrderingEnum
+from sqla_filter.partition import (
+    BoundariesMethod,
+    compute_boundaries,
+    iter_partitioned,
+    iter_partitioned_async,
+    partition_statements,
+)
+from tests.sqla_filter.common.filter import BookFilter
+from tests.sqla_filter.common.models import Author, Book, User
+from tests.sqla_filter.common.ordering import BookSorter
+
+_NOW = datetime(2025, 1, 1, tzinfo=UTC)
+_PARTITIONS = 4
+
+
+@pytest.fixture
+def books(engine: Engine) -> list[Book]:
+    books = [
+        Book(id=uuid.uuid4(), created_at=_NOW + timedelta(hours=index % 37))
+        for index in range(100)
+    ]
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all(books)
+        session.commit()
+
+    return books
+
+
+@pytest.mark.parametrize("method", ["quantiles", "range"])
+def test_compute_boundaries(
+    engine: Engine,
+    books: list[Book],  # noqa: ARG001
+    method: BoundariesMethod,
+) -> None:
+    with Session(engine) as session:
+        boundaries = compute_boundaries(
+            session,
+            select(Book),
+            column=Book.created_at,
+            partitions=_PARTITIONS,
+            method=method,
+        )
+
+    assert len(boundaries) == _PARTITIONS - 1
+    assert boundaries == sorted(boundaries)
+
+
+def test_compute_boundaries_empty(engine: Engine) -> None:
+    with Session(engine) as session:
+        boundaries = compute_boundaries(
+            session,
+            select(Book),
+            column=Book.created_at,
+            partitions=_PARTITIONS,
+            method="range",
+        )
+
+    assert boundaries == []
+
+
+def test_compute_boundaries_raises(engine: Engine) -> None:
+    with Session(engine) as session, pytest.raises(ValueError, match="positive"):
+        compute_boundaries(session, select(Book), column=Book.id, partitions=0)
+
+
+@pytest.mark.parametrize("method", ["quantiles", "range"])
+def test_iter_partitioned(
+    engine: Engine,
+    books: list[Book],
+    method: BoundariesMethod,
+) -> None:
+    filter_ = BookFilter(created_at_from=_NOW + timedelta(hours=5))
+    stmt = filter_.apply(select(Book.id))
+
+    rows = list(
+        iter_partitioned(
+            engine,
+            stmt,
+            column=Book.created_at,
+            partitions=_PARTITIONS,
+            method=method,
+            batch_size=7,
+        ),
+    )
+
+    expected = [
+        book.id for book in books if book.created_at >= _NOW + timedelta(hours=5)
+    ]
+    assert Counter(row[0] for row in rows) == Counter(expected)
+
+
+def test_iter_partitioned_sorted_entities(engine: Engine, books: list[Book]) -> None:
+    sorter = BookSorter(created_at=OrderingEnum.desc)
+
+    rows = list(
+        iter_partitioned(
+            engine,
+            select(Book),
+            column=Book.id,
+            partitions=3,
+            sorter=sorter,
+            batch_size=10,
+        ),
+    )
+
+    assert all(len(row) == 1 for row in rows)
+    assert [row[0].created_at for row in rows] == sorted(
+        (book.created_at.replace(tzinfo=None) for book in books),
+        reverse=True,
+    )
+
+
+def test_iter_partitioned_includes_nulls(engine: Engine) -> None:
+    users = [
+        User(id=uuid.uuid4(), first_name=name, last_name="Doe", is_deleted=False)
+        for name in ["a", "b", "c", None, None]
+    ]
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all(users)
+        session.commit()
+
+    rows = list(
+        iter_partitioned(
+            engine,
+            select(User.id),
+            column=User.first_name,
+            partitions=2,
+        ),
+    )
+
+    assert Counter(row[0] for row in rows) == Counter(user.id for user in users)
+
+
+def test_partition_statements_without_boundaries() -> None:
+    stmt = select(Author)
+
+    assert partition_statements(stmt, column=Author.alias, boundaries=[]) == [stmt]
+
+
+def test_iter_partitioned_stops_early(engine: Engine, books: list[Book]) -> None:  # noqa: ARG001
+    rows = iter_partitioned(
+        engine,
+        select(Book.id),
+        column=Book.id,
+        partitions=_PARTITIONS,
+        batch_size=1,
+    )
+
+    assert next(rows)
+    rows.close()  # type: ignore[attr-defined]
+
+
+def test_iter_partitioned_async(
+    tmp_path: Path,
+    engine: Engine,  # noqa: ARG001
+    books: list[Book],
+) -> None:
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine  # noqa: PLC0415
+
+    async def collect(*, sorted_: bool) -> list[tuple[Any, ...]]:
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}",
+        )
+        try:
+            return [
+                row
+                async for row in iter_partitioned_async(
+                    async_engine,
+                    select(Book),
+                    column=Book.id,
+                    partitions=_PARTITIONS,
+                    sorter=BookSorter(created_at=OrderingEnum.asc) if sorted_ else None,
+                    batch_size=10,
+                )
+            ]
+        finally:
+            await async_engine.dispose()
+
+    expected = sorted(book.created_at.replace(tzinfo=None) for book in books)
+
+    rows = asyncio.run(collect(sorted_=True))
+    assert [row[0].created_at for row in rows] == expected
+
+    rows = asyncio.run(collect(sorted_=False))
+    assert sorted(row[0].created_at for row in rows) == expected
@@ -0,0 +1,173 @@
+import asyncio
+import math
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated
+
+import pytest
+from sqlalchemy import and_, or_, select
+from sqlalchemy.sql.operators import eq, ge, le
+
+from sqla_filter import UNSET, FilterField, SupportsOrFilter, Unset
+from sqla_filter.selectivity import SelectivityStats
+from tests.sqla_filter.common.models import Book
+from tests.sqla_filter.test_async_manual_filter import BookAclFilter
+from tests.utils import compile_stmt
+
+_NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class HintedBookFilter(SupportsOrFilter):
+    created_at_from: Annotated[
+        datetime | Unset,
+        FilterField(Book.created_at, operator=ge, selectivity=0.5),
+    ] = UNSET
+    created_at_to: Annotated[
+        datetime | Unset,
+        FilterField(Book.created_at, operator=le),
+    ] = UNSET
+    ident: Annotated[
+        uuid.UUID | Unset,
+        FilterField(Book.id, operator=eq, selectivity=0.001),
+    ] = UNSET
+
+
+def _learned(stats: SelectivityStats) -> type[HintedBookFilter]:
+    class LearnedBookFilter(HintedBookFilter):
+        __sqla_filter_selectivity__ = stats
+
+    return LearnedBookFilter
+
+
+def test_most_selective_first() -> None:
+    ident = uuid.uuid4()
+    filter_ = HintedBookFilter(created_at_from=_NOW, created_at_to=_NOW, ident=ident)
+
+    expected = select(Book).where(
+        Book.id == ident, Book.created_at >= _NOW, Book.created_at <= _NOW
+    )
+    assert (
+        compile_stmt(filter_.apply(select(Book))).string
+        == compile_stmt(expected).string
+    )
+
+
+def test_invalid_hint() -> None:
+    with pytest.raises(ValueError, match="selectivity must be in"):
+        FilterField(Book.id, operator=eq, selectivity=0)
+
+
+def test_learned_estimates() -> None:
+    stats = SelectivityStats(min_observations=2)
+    filter_cls = _learned(stats)
+
+    stats.observe(filter_cls(created_at_to=_NOW), rows=1, total=1000)
+    assert stats.estimate(filter_cls, "created_at_to") is None
+
+    stats.observe(filter_cls(created_at_to=_NOW), rows=1, total=1000)
+    stats.observe(
+        filter_cls(created_at_to=_NOW, created_at_from=_NOW), rows=10, total=1000
+    )
+    stats.observe(
+        filter_cls(created_at_to=_NOW, or_=filter_cls(ident=uuid.uuid4())),
+        rows=1000,
+        total=1000,
+    )
+
+    estimate = stats.estimate(filter_cls, "created_at_to")
+    assert estimate is not None
+    assert math.isclose(estimate, 0.001**0.8 * 0.1**0.2)
+    assert stats.estimate(filter_cls, "created_at_from") is None
+    assert stats.estimate(HintedBookFilter, "created_at_to") is None
+
+    stmt = filter_cls(created_at_from=_NOW, created_at_to=_NOW).apply(select(Book))
+    expected = select(Book).where(Book.created_at <= _NOW, Book.created_at >= _NOW)
+    assert compile_stmt(stmt).string == compile_stmt(expected).string
+
+
+def test_or_branches_most_likely_first() -> None:
+    idents = [uuid.uuid4(), uuid.uuid4()]
+    filter_ = HintedBookFilter(
+        ident=idents[0],
+        or_=HintedBookFilter(
+            created_at_from=_NOW,
+            or_=HintedBookFilter(ident=idents[1], created_at_from=_NOW),
+        ),
+    )
+
+    expected = select(Book).where(
+        or_(
+            Book.created_at >= _NOW,
+            Book.id == idents[0],
+            and_(Book.id == idents[1], Book.created_at >= _NOW),
+        ),
+    )
+    assert (
+        compile_stmt(filter_.apply(select(Book))).string
+        == compile_stmt(expected).string
+    )
+    assert math.isclose(filter_.estimate_cost().selectivity, 1 - 0.5 * 0.999 * 0.9995)
+
+
+def test_or_branches_with_empty_branch_are_kept() -> None:
+    ident = uuid.uuid4()
+    filter_ = HintedBookFilter(
+        ident=ident,
+        or_=HintedBookFilter(created_at_from=_NOW, or_=HintedBookFilter()),
+    )
+
+    expected = select(Book).where(or_(Book.id == ident, Book.created_at >= _NOW))
+    assert (
+        compile_stmt(filter_.apply(select(Book))).string
+        == compile_stmt(expected).string
+    )
+
+
+def test_reordered_branches_keep_prefetched() -> None:
+    stats = SelectivityStats(min_observations=1)
+
+    class LearnedAclFilter(BookAclFilter):
+        __sqla_filter_selectivity__ = stats
+
+    ids = [uuid.uuid4() for _ in range(3)]
+    stats.observe(LearnedAclFilter(ident=ids[0]), rows=1, total=2)
+    stats.observe(LearnedAclFilter(other_ident=ids[0]), rows=1, total=2)
+    filter_ = LearnedAclFilter(
+        ident=ids[0],
+        other_ident=ids[1],
+        or_=LearnedAclFilter(ident=ids[2]),
+    )
+
+    stmt = asyncio.run(filter_.apply_async(select(Book)))
+
+    expected = select(Book).where(
+        or_(
+            Book.id.in_([ids[2]]),
+            and_(Book.id.in_([ids[0]]), Book.id.in_([ids[1]])),
+        ),
+    )
+    assert compile_stmt(stmt).string == compile_stmt(expected).string
+
+
+def test_expressions() -> None:
+    ident = uuid.uuid4()
+    first = HintedBookFilter(created_at_to=_NOW)
+    second = HintedBookFilter(ident=ident)
+
+    and_stmt = (first & second).apply(select(Book))
+    or_stmt = (second | first).apply(select(Book))
+
+    assert (
+        compile_stmt(and_stmt).string
+        == compile_stmt(
+            select(Book).where(and_(Book.id == ident, Book.created_at <= _NOW)),
+        ).string
+    )
+    assert (
+        compile_stmt(or_stmt).string
+        == compile_stmt(
+            select(Book).where(or_(Book.created_at <= _NOW, Book.id == ident)),
+        ).string
+    )
+    assert (~second).selectivity() == pytest.approx(0.999)
+    assert (first & second).selectivity() == pytest.approx(0.001)
@@ -0,0 +1,170 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, create_engine, event, select
+from sqlalchemy.orm import Session
+
+from sqla_filter import UNSET, BaseSorter, OrderingEnum, OrderingField, Unset
+from sqla_filter.sharding import iter_sharded, iter_sharded_async
+from tests.sqla_filter.common.filter import BookFilter
+from tests.sqla_filter.common.models import Author, Book, meta
+from tests.sqla_filter.common.ordering import BookSorter
+
+_NOW = datetime(2025, 1, 1)  # noqa: DTZ001
+_SHARDS = 3
+_ALIASES = ["a", "B", "c", "D", "e", "F"]
+
+
+@pytest.fixture
+def shard_paths(tmp_path: Path) -> list[Path]:
+    paths = [tmp_path / f"shard_{index}.sqlite3" for index in range(_SHARDS)]
+    engines = [create_engine(f"sqlite:///{path}") for path in paths]
+    for index, engine in enumerate(engines):
+        meta.create_all(engine)
+        with Session(engine) as session:
+            session.add_all(
+                Book(
+                    id=uuid.uuid4(),
+                    created_at=_NOW + timedelta(minutes=minute),
+                )
+                for minute in range(index, 30, _SHARDS)
+            )
+            session.commit()
+        engine.dispose()
+
+    return paths
+
+
+def _minutes(rows: list[tuple[datetime]]) -> list[int]:
+    return [int((created_at - _NOW).total_seconds()) // 60 for (created_at,) in rows]
+
+
+def test_iter_sharded(shard_paths: list[Path]) -> None:
+    engines = [create_engine(f"sqlite:///{path}") for path in shard_paths]
+    statements: list[str] = []
+    for engine in engines:
+        event.listen(
+            engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+    rows = list(
+        iter_sharded(
+            engines,
+            select(Book.created_at),
+            filter_=BookFilter(created_at_to=_NOW + timedelta(minutes=20)),
+            sorter=BookSorter(created_at=OrderingEnum.desc),
+            offset=2,
+            limit=5,
+            batch_size=2,
+        ),
+    )
+
+    assert _minutes(rows) == [18, 17, 16, 15, 14]
+    assert len(statements) == _SHARDS
+    assert all(statement.endswith("LIMIT ? OFFSET ?") for statement in statements)
+
+
+def test_iter_sharded_unbounded(shard_paths: list[Path]) -> None:
+    engines: list[Engine] = [create_engine(f"sqlite:///{path}") for path in shard_paths]
+
+    rows = list(
+        iter_sharded(
+            engines,
+            select(Book.created_at),
+            sorter=BookSorter(created_at=OrderingEnum.asc),
+        ),
+    )
+
+    assert _minutes(rows) == list(range(30))
+
+
+def test_iter_sharded_invalid() -> None:
+    with pytest.raises(ValueError, match="At least one shard engine"):
+        list(iter_sharded([], select(Book), sorter=BookSorter()))
+
+    with pytest.raises(ValueError, match="must not be negative"):
+        list(
+            iter_sharded(
+                [create_engine("sqlite://")],
+                select(Book),
+                sorter=BookSorter(),
+                limit=-1,
+            ),
+        )
+
+
+def test_iter_sharded_async(shard_paths: list[Path]) -> None:
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine  # noqa: PLC0415
+
+    async def collect() -> list[tuple[datetime]]:
+        engines = [
+            create_async_engine(f"sqlite+aiosqlite:///{path}") for path in shard_paths
+        ]
+        try:
+            return [
+                row
+                async for row in iter_sharded_async(
+                    engines,
+                    select(Book.created_at),
+                    sorter=BookSorter(created_at=OrderingEnum.asc),
+                    offset=3,
+                    limit=4,
+                )
+            ]
+        finally:
+            for engine in engines:
+                await engine.dispose()
+
+    assert _minutes(asyncio.run(collect())) == [3, 4, 5, 6]
+
+
+class AuthorSorter(BaseSorter):
+    alias: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(Author.alias.collate("NOCASE")),
+    ] = UNSET
+    casefold_alias: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(Author.alias.collate("NOCASE"), collation_key=str.casefold),
+    ] = UNSET
+
+
+def test_iter_sharded_collation(tmp_path: Path) -> None:
+    engines = [
+        create_engine(f"sqlite:///{tmp_path / f'authors_{index}.sqlite3'}")
+        for index in range(2)
+    ]
+    for index, engine in enumerate(engines):
+        meta.create_all(engine)
+        with Session(engine) as session:
+            session.add_all(
+                Author(id=uuid.uuid4(), alias=alias, user_id=uuid.uuid4())
+                for alias in _ALIASES[index::2]
+            )
+            session.commit()
+
+    with pytest.raises(ValueError, match="requires OrderingField\\(collation_key"):
+        list(
+            iter_sharded(
+                engines,
+                select(Author.alias),
+                sorter=AuthorSorter(alias=OrderingEnum.asc),
+            ),
+        )
+
+    rows = iter_sharded(
+        engines,
+        select(Author.alias),
+        sorter=AuthorSorter(casefold_alias=OrderingEnum.asc),
+    )
+
+    assert [alias.casefold() for (alias,) in rows] == sorted(
+        alias.casefold() for alias in _ALIASES
+    )
@@ -0,0 +1,103 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import eq, in_op
+
+from sqla_filter import (
+    UNSET,
+    BaseSorter,
+    FilterField,
+    OrderingEnum,
+    OrderingField,
+    SupportsOrFilter,
+    Unset,
+    slow_query,
+)
+from sqla_filter.slow_query import SIGNATURE_OPTION, SlowQueryLog
+from tests.sqla_filter.common.models import Book
+
+
+class BookFilter(SupportsOrFilter):
+    ident: Annotated[uuid.UUID | Unset, FilterField(Book.id, operator=eq)] = UNSET
+    ids: Annotated[list[uuid.UUID] | Unset, FilterField(Book.id, operator=in_op)] = (
+        UNSET
+    )
+
+
+class BookSorter(BaseSorter):
+    created_at: Annotated[OrderingEnum | Unset, OrderingField(Book.created_at)] = UNSET
+
+
+def _stmt() -> tuple[str, ...]:
+    stmt = BookSorter(created_at=OrderingEnum.desc).apply(
+        BookFilter(
+            ident=uuid.uuid4(),
+            or_=BookFilter(ids=[uuid.uuid4(), uuid.uuid4()]),
+        ).apply(select(Book.id)),
+    )
+    return stmt.get_execution_options()[SIGNATURE_OPTION]  # type:ignore[no-any-return]
+
+
+def test_signatures() -> None:
+    assert _stmt() == (
+        "BookFilter(ident) | BookFilter(ids)",
+        "BookSorter(created_at:desc)",
+    )
+
+
+def test_slow_query_log(engine: Engine) -> None:
+    log = SlowQueryLog(threshold_ms=0, capacity=2)
+    log.install(engine)
+    filter_ = BookFilter(ids=[uuid.uuid4(), uuid.uuid4()])
+
+    with Session(engine) as session:
+        session.add(Book(id=uuid.uuid4(), created_at=datetime.now(tz=UTC)))
+        session.commit()
+        for _ in range(3):
+            session.scalars(filter_.apply(select(Book.id))).all()
+        session.scalars(select(Book.id)).all()
+
+    log.remove(engine)
+    queries = log.export()
+    assert len(queries) == 2  # noqa: PLR2004
+    query = queries[-1]
+    assert query.signatures == ("BookFilter(ids)",)
+    assert query.parameter_shapes == ["str[32]", "str[32]"]
+    assert query.plan is not None
+    assert "book" in str(query.plan)
+
+
+def test_slow_query_log_failing_explain(
+    engine: Engine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setitem(slow_query._EXPLAIN_PREFIXES, "sqlite", "EXPLAIN NOTHING")  # noqa: SLF001
+    log = SlowQueryLog(threshold_ms=0)
+    log.install(engine)
+
+    with Session(engine) as session:
+        assert (
+            session.scalars(BookFilter(ident=uuid.uuid4()).apply(select(Book.id))).all()
+            == []
+        )
+
+    log.remove(engine)
+    (query,) = log.export()
+    assert query.plan is None
+
+
+def test_slow_query_log_threshold_and_sampling(engine: Engine) -> None:
+    slow = SlowQueryLog(threshold_ms=60_000)
+    unsampled = SlowQueryLog(threshold_ms=0, sample_rate=0)
+    slow.install(engine)
+    unsampled.install(engine)
+
+    with Session(engine) as session:
+        session.scalars(BookFilter(ident=uuid.uuid4()).apply(select(Book.id))).all()
+
+    assert slow.export() == []
+    assert unsampled.export() == []
@@ -0,0 +1,94 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Annotated
+
+from sqlalchemy import Engine, event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.operators import ge
+
+from sqla_filter import UNSET, BaseFilter, FilterField, OrderingEnum, Unset
+from sqla_filter.snapshot import ResultSnapshots
+from tests.sqla_filter.common.models import Book
+from tests.sqla_filter.common.ordering import BookSorter
+
+_NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+class BookFilter(BaseFilter):
+    created_at_from: Annotated[
+        datetime | Unset,
+        FilterField(Book.created_at, operator=ge),
+    ] = UNSET
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _count_statements(engine: Engine) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    return statements
+
+
+def test_paginate_from_snapshot(engine: Engine) -> None:
+    ids = [uuid.UUID(int=index) for index in range(5)]
+    clock = _Clock()
+    snapshots = ResultSnapshots(ttl=60, clock=clock)
+    with Session(engine) as session:
+        session.add_all(
+            Book(id=ident, created_at=_NOW + timedelta(minutes=index))
+            for index, ident in enumerate(ids)
+        )
+        session.commit()
+        statements = _count_statements(engine)
+
+        def page(offset: int) -> list[uuid.UUID]:
+            stmt = snapshots.paginate(
+                session,
+                select(Book.id),
+                filter_=BookFilter(created_at_from=_NOW + timedelta(minutes=1)),
+                sorter=BookSorter(created_at=OrderingEnum.desc),
+                offset=offset,
+                limit=2,
+            )
+            return list(session.scalars(stmt))
+
+        pages = [page(0), page(2), page(4)]
+        executed = len(statements)
+        clock.now = 61
+        page(0)
+
+    assert pages == [[ids[4], ids[3]], [ids[2], ids[1]], []]
+    assert executed == 4  # noqa: PLR2004
+    assert len(statements) == executed + 2
+
+
+def test_paginate_past_max_ids(engine: Engine) -> None:
+    ids = [uuid.UUID(int=index) for index in range(5)]
+    snapshots = ResultSnapshots(ttl=60, max_ids=2)
+    with Session(engine) as session:
+        session.add_all(
+            Book(id=ident, created_at=_NOW + timedelta(minutes=index))
+            for index, ident in enumerate(ids)
+        )
+        session.commit()
+
+        stmt = snapshots.paginate(
+            session,
+            select(Book.id),
+            filter_=BookFilter(),
+            sorter=BookSorter(created_at=OrderingEnum.asc),
+            offset=2,
+            limit=2,
+        )
+
+        assert list(session.scalars(stmt)) == ids[2:4]
@@ -0,0 +1,193 @@
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from sqla_filter import OrderingEnum
+from sqla_filter.template import clear_templates
+from tests.sqla_filter.common.filter import BookFilter, BookOrFilter, DateTimeInterval
+from tests.sqla_filter.common.models import Author, Book, User
+from tests.sqla_filter.common.ordering import BookSorter
+
+_NOW = datetime(2025, 1, 1)  # noqa: DTZ001
+_SQLITE = sqlite.dialect()  # type:ignore[no-untyped-call]
+
+
+@pytest.fixture(autouse=True)
+def _templates() -> Iterator[None]:
+    clear_templates()
+    yield
+    clear_templates()
+
+
+def test_positional_sql() -> None:
+    ident = uuid.uuid4()
+    filter_ = BookFilter(ident=ident, created_at_from=_NOW)
+
+    template = filter_.compile_template(select(Book.id).limit(5), dialect=_SQLITE)
+
+    assert template.sql == (
+        "SELECT book.id \nFROM book \n"
+        "WHERE book.id = ? AND book.created_at >= ?\n LIMIT ? OFFSET ?"
+    )
+    assert template.parameters == (
+        "sqla_filter_0_ident",
+        "sqla_filter_0_created_at_from",
+        "param_1",
+        "param_2",
+    )
+    assert template.bind(filter_) == [ident.hex, "2025-01-01 00:00:00.000000", 5, 0]
+
+
+def test_numeric_dollar_dialect() -> None:
+    ident = uuid.uuid4()
+    author_ids = [uuid.uuid4(), uuid.uuid4()]
+    filter_ = BookFilter(ident=ident, author_ids=author_ids)
+
+    template = filter_.compile_template(
+        select(Book.id),
+        dialect=postgresql.dialect(paramstyle="numeric_dollar"),  # type:ignore[no-untyped-call]
+    )
+
+    assert "book.id = $1::UUID" in template.sql
+    assert "book__author.author_id IN ($2::UUID, $3::UUID)" in template.sql
+    assert template.bind(filter_) == [ident, *author_ids]
+
+
+def test_cached_per_shape() -> None:
+    stmt = select(Book.id)
+    dialect = _SQLITE
+    template = BookFilter(author_ids=[uuid.uuid4()]).compile_template(
+        stmt, dialect=dialect
+    )
+
+    assert (
+        BookFilter(author_ids=[uuid.uuid4()]).compile_template(stmt, dialect=dialect)
+        is template
+    )
+    assert (
+        BookFilter(author_ids=[uuid.uuid4()] * 2).compile_template(
+            stmt, dialect=dialect
+        )
+        is not template
+    )
+    assert (
+        BookFilter(ident=uuid.uuid4()).compile_template(stmt, dialect=dialect)
+        is not template
+    )
+
+
+def test_cached_per_statement() -> None:
+    filter_ = BookFilter(ident=uuid.uuid4())
+    template = filter_.compile_template(select(Book.id).limit(5), dialect=_SQLITE)
+
+    assert (
+        filter_.compile_template(select(Book.id).limit(5), dialect=_SQLITE) is template
+    )
+    other = filter_.compile_template(select(Book.id).limit(10), dialect=_SQLITE)
+    assert other is not template
+    assert other.bind(filter_)[1:] == [10, 0]
+    assert (
+        filter_.compile_template(select(Book.created_at).limit(5), dialect=_SQLITE)
+        is not template
+    )
+
+
+def test_statement_with_in() -> None:
+    idents = [uuid.uuid4(), uuid.uuid4()]
+    filter_ = BookFilter(ident=idents[0])
+
+    template = filter_.compile_template(
+        select(Book.id).where(Book.id.in_(idents)), dialect=_SQLITE
+    )
+
+    assert template.sql == (
+        "SELECT book.id \nFROM book \nWHERE book.id IN (?, ?) AND book.id = ?"
+    )
+    assert template.parameters == ("id_1_1", "id_1_2", "sqla_filter_0_ident")
+    assert template.bind(filter_) == [idents[0].hex, idents[1].hex, idents[0].hex]
+
+
+def test_shape_mismatch() -> None:
+    template = BookFilter(author_ids=[uuid.uuid4()]).compile_template(
+        select(Book.id), dialect=_SQLITE
+    )
+
+    for filter_ in (
+        BookFilter(author_ids=[uuid.uuid4()] * 2),
+        BookFilter(ident=uuid.uuid4()),
+        None,
+    ):
+        with pytest.raises(ValueError, match="don't match the template"):
+            template.bind(filter_)
+
+
+def test_unsupported() -> None:
+    stmt = select(Book.id)
+    dialect = _SQLITE
+
+    for filter_ in (
+        BookFilter(is_manual_filter_enabled=True),
+        BookFilter(created_at_between=DateTimeInterval(_NOW, _NOW)),
+    ):
+        with pytest.raises(TypeError):
+            filter_.compile_template(stmt, dialect=dialect)
+
+    with pytest.raises(ValueError, match="positional paramstyle"):
+        BookFilter(ident=uuid.uuid4()).compile_template(
+            stmt,
+            dialect=postgresql.dialect(),  # type:ignore[no-untyped-call]
+        )
+
+
+def test_or_filter_and_sorter() -> None:
+    idents = [uuid.uuid4(), uuid.uuid4()]
+    filter_ = BookOrFilter(ident=idents[0], or_=BookOrFilter(ident=idents[1]))
+
+    template = filter_.compile_template(
+        select(Book.id),
+        dialect=_SQLITE,
+        sorter=BookSorter(created_at=OrderingEnum.desc),
+    )
+
+    assert template.sql == (
+        "SELECT book.id \nFROM book \n"
+        "WHERE book.id = ? OR book.id = ? ORDER BY book.created_at DESC"
+    )
+    assert template.bind(filter_) == [ident.hex for ident in idents]
+
+
+def test_same_rows_as_orm(engine: Engine) -> None:
+    user = User(id=uuid.uuid4(), last_name="Doe", is_deleted=False)
+    authors = [Author(id=uuid.uuid4(), user=user) for _ in range(2)]
+    books = [
+        Book(
+            id=uuid.uuid4(),
+            created_at=_NOW + timedelta(days=index),
+            authors=authors[:index],
+        )
+        for index in range(3)
+    ]
+    with Session(engine) as session:
+        session.add_all(books)
+        session.commit()
+
+        stmt = select(Book.id).distinct()
+        sorter = BookSorter(created_at=OrderingEnum.asc)
+        for filter_ in (
+            BookFilter(author_ids=[author.id for author in authors]),
+            BookFilter(author_ids=[authors[1].id], created_at_from=_NOW),
+            BookFilter(created_at_to=_NOW + timedelta(days=1)),
+        ):
+            expected = session.scalars(sorter.apply(filter_.apply(stmt))).all()
+            template = filter_.compile_template(
+                stmt, dialect=engine.dialect, sorter=sorter
+            )
+            cursor = session.connection().connection.cursor()
+            cursor.execute(template.sql, template.bind(filter_))
+
+            assert [uuid.UUID(hex=ident) for (ident,) in cursor.fetchall()] == expected
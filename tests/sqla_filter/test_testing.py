@@ -0,0 +1,76 @@
+import uuid
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+from sqla_filter import OrderingEnum
+from sqla_filter.testing import assert_shape_snapshot, sql_shape
+from tests.sqla_filter.common.filter import BookFilter
+from tests.sqla_filter.common.models import Book
+from tests.sqla_filter.common.ordering import BookSorter
+
+_SNAPSHOTS = Path(__file__).parent / "snapshots"
+
+
+def _filter() -> BookFilter:
+    return BookFilter(
+        author_user_id=uuid.uuid4(),
+        created_at_from=datetime.now(tz=UTC),
+    )
+
+
+def test_sql_shape() -> None:
+    shape = sql_shape(
+        select(Book),
+        _filter(),
+        BookSorter(created_at=OrderingEnum.desc),
+    )
+
+    assert shape.joins == ("JOIN book__author", "JOIN author")
+    assert shape.join_count == 2  # noqa: PLR2004
+    assert shape.predicates == (
+        "book.created_at >= :created_at_1",
+        "author.user_id = :user_id_1",
+    )
+    assert shape.order_by == ("book.created_at DESC",)
+    assert not shape.distinct
+    assert shape.subqueries == 0
+    assert shape.cache_key is not None
+    assert (
+        shape.cache_key
+        == sql_shape(
+            select(Book), _filter(), BookSorter(created_at=OrderingEnum.desc)
+        ).cache_key
+    )
+
+
+def test_sql_shape_snapshot() -> None:
+    shape = sql_shape(select(Book), _filter())
+
+    assert_shape_snapshot(shape, _SNAPSHOTS / "book_filter_author_user.json")
+
+
+def test_sql_shape_snapshot_mismatch(tmp_path: Path) -> None:
+    path = tmp_path / "shape.json"
+    with pytest.raises(AssertionError, match="doesn't exist"):
+        assert_shape_snapshot(sql_shape(select(Book), BookFilter()), path)
+
+    assert not path.exists()
+    assert_shape_snapshot(sql_shape(select(Book), BookFilter()), path, update=True)
+
+    with pytest.raises(AssertionError, match=r'\+    "JOIN author"'):
+        assert_shape_snapshot(sql_shape(select(Book), _filter()), path)
+
+    assert_shape_snapshot(sql_shape(select(Book), _filter()), path, update=True)
+    assert_shape_snapshot(sql_shape(select(Book), _filter()), path)
+
+
+def test_sql_shape_subqueries() -> None:
+    stmt = select(Book).where(Book.id.in_(select(Book.id).distinct())).distinct()
+
+    shape = sql_shape(stmt)
+
+    assert shape.subqueries == 1
+    assert shape.distinct
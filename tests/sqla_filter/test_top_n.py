@@ -0,0 +1,72 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Annotated
+
+import pytest
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from sqla_filter import UNSET, BaseSorter, OrderingEnum, OrderingField, Unset
+from sqla_filter.top_n import top_n_per_group
+from tests.sqla_filter.common.models import Book, Review, User
+from tests.utils import compile_stmt
+
+
+class ReviewSorter(BaseSorter):
+    content: Annotated[
+        OrderingEnum | Unset,
+        OrderingField(Review.content, nulls="last"),
+    ] = UNSET
+
+
+def test_top_n_per_group_stmt() -> None:
+    stmt = top_n_per_group(
+        select(Review),
+        sorter=ReviewSorter(content=OrderingEnum.desc),
+        partition_by=Review.book_id,
+        limit=2,
+    )
+
+    compiled = compile_stmt(stmt).string
+
+    assert (
+        "row_number() OVER (PARTITION BY review.book_id "
+        "ORDER BY review.content DESC NULLS LAST) AS _sqla_filter_rank"
+    ) in compiled
+    assert "WHERE anon_1._sqla_filter_rank <= 2" in compiled
+    assert compiled.endswith(
+        "ORDER BY review.book_id, review.content DESC NULLS LAST",
+    )
+
+
+def test_top_n_per_group_execute(engine: Engine) -> None:
+    user = User(id=uuid.uuid4(), last_name="Doe", is_deleted=False)
+    books = [Book(id=uuid.uuid4(), created_at=datetime.now(tz=UTC)) for _ in range(2)]
+    with Session(engine) as session:
+        session.add_all([user, *books])
+        session.add_all(
+            Review(content=f"{book_index}-{index}", book_id=book.id, user_id=user.id)
+            for book_index, book in enumerate(books)
+            for index in range(4)
+        )
+        session.commit()
+
+        stmt = top_n_per_group(
+            select(Review.content).where(Review.content != "0-3"),
+            sorter=ReviewSorter(content=OrderingEnum.desc),
+            partition_by=[Review.book_id],
+            limit=2,
+        )
+        contents = set(session.scalars(stmt))
+
+    assert contents == {"0-2", "0-1", "1-3", "1-2"}
+
+
+def test_top_n_per_group_invalid_limit() -> None:
+    with pytest.raises(ValueError, match="limit must be positive"):
+        top_n_per_group(
+            select(Review),
+            sorter=ReviewSorter(),
+            partition_by=Review.book_id,
+            limit=0,
+        )